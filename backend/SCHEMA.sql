@@ -36,6 +36,22 @@ CREATE TABLE IF NOT EXISTS products (
 
 CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
 CREATE INDEX IF NOT EXISTS idx_products_name ON products(name);
+-- Full-text search: weighted tsvector maintained by Postgres, plus trigram indexes
+-- for substring (ILIKE) and typo-tolerant matching
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_products_description_trgm ON products USING GIN (description gin_trgm_ops);
+-- Keyset pagination within a category: WHERE category = ? AND id > ? ORDER BY id
+CREATE INDEX IF NOT EXISTS idx_products_category_id ON products(category, id);
+-- Supplier SKU: the conflict key for bulk imports (NULL for products created one by one)
+ALTER TABLE products ADD COLUMN IF NOT EXISTS sku VARCHAR(100);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_products_sku ON products(sku);
 
 -- =============================================
 -- 3. ORDERS TABLE
@@ -53,6 +69,9 @@ CREATE TABLE IF NOT EXISTS orders (
 
 CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders(user_id);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+-- Keyset pagination: ORDER BY created_at DESC, id DESC (admin and per-user listings)
+CREATE INDEX IF NOT EXISTS idx_orders_created_at_id ON orders(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_user_created_at_id ON orders(user_id, created_at DESC, id DESC);
 
 -- =============================================
 -- 4. ORDER ITEMS TABLE
@@ -71,6 +90,44 @@ CREATE TABLE IF NOT EXISTS order_items (
 CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items(order_id);
 CREATE INDEX IF NOT EXISTS idx_order_items_product_id ON order_items(product_id);
 
+-- Product category at purchase time ('' for none), so sales summaries keep crediting the
+-- category an order was counted under after the product moves. Backfills older lines once.
+ALTER TABLE order_items ADD COLUMN IF NOT EXISTS category VARCHAR(100);
+UPDATE order_items oi SET category = COALESCE(p.category, '')
+FROM products p WHERE p.id = oi.product_id AND oi.category IS NULL;
+
+-- =============================================
+-- 5. DAILY SALES SUMMARIES
+-- Maintained with each order write (db/sales_db.py); rebuild with: python rebuild_sales.py
+-- =============================================
+CREATE TABLE IF NOT EXISTS sales_daily_status (
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    orders BIGINT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status)
+);
+
+-- Non-cancelled orders only
+CREATE TABLE IF NOT EXISTS sales_daily_product (
+    day DATE NOT NULL,
+    product_id INT NOT NULL,
+    units BIGINT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    orders BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, product_id)
+);
+
+-- Non-cancelled orders only; '' is "no category"
+CREATE TABLE IF NOT EXISTS sales_daily_category (
+    day DATE NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    units BIGINT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    orders BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, category)
+);
+
 -- =============================================
 -- END OF SCHEMA (PostgreSQL)
 -- =============================================
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Compare concurrent DB-backed requests per worker: blocking vs async data layer
+
+Run from the backend folder against a seeded database:
+
+    python -m benchmarks.async_db_bench --concurrency 50 --duration 5
+
+"before" calls ProductDB directly inside coroutines, the way the routes used
+to, so every query stalls the event loop. "after" awaits AsyncProductDB, which
+runs the same query in a DB worker thread.
+"""
+
+import argparse
+import asyncio
+import time
+from config.database import initialize_connection_pool, close_connection_pool
+from db.product_db import ProductDB
+from db.aio import AsyncProductDB
+
+async def _measure_loop_lag(stop: asyncio.Event, lags: list):
+    """Record how late the event loop wakes a 10ms sleeper"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+async def _worker(mode: str, product_id: int, deadline: float, counter: list):
+    while time.perf_counter() < deadline:
+        if mode == "before":
+            ProductDB.get_product_by_id(product_id)
+            await asyncio.sleep(0)
+        else:
+            await AsyncProductDB.get_product_by_id(product_id)
+        counter[0] += 1
+
+async def run_all(concurrency: int, duration: float, product_id: int) -> list:
+    return [await run_mode(mode, concurrency, duration, product_id) for mode in ("before", "after")]
+
+async def run_mode(mode: str, concurrency: int, duration: float, product_id: int) -> dict:
+    counter = [0]
+    lags = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop, lags))
+
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[_worker(mode, product_id, deadline, counter) for _ in range(concurrency)])
+    stop.set()
+    await lag_task
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "requests_per_sec": counter[0] / duration,
+        "loop_lag_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000 if lags else 0.0,
+        "loop_lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--product-id", type=int, default=1)
+    args = parser.parse_args()
+
+    initialize_connection_pool()
+    try:
+        print(f"{'mode':<8} {'req/s':>10} {'lag p99 ms':>12} {'lag max ms':>12}")
+        for result in asyncio.run(run_all(args.concurrency, args.duration, args.product_id)):
+            print(f"{result['mode']:<8} {result['requests_per_sec']:>10.1f} "
+                  f"{result['loop_lag_p99_ms']:>12.2f} {result['loop_lag_max_ms']:>12.2f}")
+    finally:
+        close_connection_pool()
+
+if __name__ == "__main__":
+    main()
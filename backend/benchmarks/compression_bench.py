@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Response compression: bytes saved and CPU cost per route and encoding
+
+Run from the backend folder:
+
+    python -m benchmarks.compression_bench                                   # synthetic bodies
+    python -m benchmarks.compression_bench --base-url http://localhost:8000  # real responses
+
+Bodies are serialized the way the routes serialize them. brotli and zstd rows
+appear only when their packages are installed.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from middleware.compression import build_compressors
+from models.order import OrderListResponse, OrderResponse
+from models.product import ProductListResponse, ProductResponse
+from utils.serialization import dump_json
+
+WORDS = ("wireless ergonomic stainless organic premium compact durable portable vintage smart cotton leather "
+         "bamboo ceramic waterproof lightweight adjustable rechargeable handmade classic deluxe modern kit set "
+         "for kitchen office travel outdoor kids home garden with without extra large small black white blue").split()
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 11), "zstd": (1, 3, 19)}
+PAGINATION = {"current_page": 1, "total_pages": 100, "total_items": 10000, "items_per_page": 100, "has_next": True}
+
+def _product(rng: random.Random, i: int, now: datetime) -> dict:
+    return {
+        "id": i, "sku": f"SKU-{i:07d}", "name": " ".join(rng.choices(WORDS, k=4)).title(),
+        "description": " ".join(rng.choices(WORDS, k=rng.randint(20, 60))).capitalize() + ".",
+        "price": Decimal(rng.randint(100, 99999)) / 100, "stock": rng.randint(0, 500),
+        "category": rng.choice(("Electronics", "Home", "Garden", "Toys", "Books")),
+        "image_url": f"https://cdn.example.com/products/{i}.jpg",
+        "created_at": now - timedelta(days=rng.randint(0, 900)), "updated_at": now,
+    }
+
+def _order(rng: random.Random, i: int, now: datetime) -> dict:
+    items = [
+        {"product_id": rng.randint(1, 10000), "product_name": " ".join(rng.choices(WORDS, k=4)).title(),
+         "quantity": rng.randint(1, 3), "price": rng.randint(100, 9999) / 100}
+        for _ in range(rng.randint(1, 5))
+    ]
+    return {
+        "id": i, "user_id": rng.randint(1, 1000), "total_amount": Decimal(sum(it["price"] * it["quantity"] for it in items)).quantize(Decimal("0.01")),
+        "status": rng.choice(("pending", "processing", "shipped", "delivered")),
+        "shipping_address": f"{rng.randint(1, 9999)} Main Street, Springfield, ST {rng.randint(10000, 99999)}",
+        "created_at": now - timedelta(minutes=i), "items": items,
+    }
+
+def synthetic_bodies(seed: int) -> dict:
+    rng = random.Random(seed)
+    now = datetime.now()
+    products = [_product(rng, i, now) for i in range(1, 101)]
+    orders = [_order(rng, i, now) for i in range(1, 101)]
+    return {
+        "GET /products?limit=100": dump_json(ProductListResponse, {"products": products, "pagination": PAGINATION}),
+        "GET /products?limit=10": dump_json(ProductListResponse, {"products": products[:10], "pagination": PAGINATION}),
+        "GET /products/{id}": dump_json(ProductResponse, products[0]),
+        "GET /orders/admin/all?limit=100": dump_json(OrderListResponse, {"orders": orders, "pagination": PAGINATION}),
+        "GET /orders/{id}": dump_json(OrderResponse, orders[0]),
+    }
+
+def live_bodies(base_url: str, token: str = None) -> dict:
+    import httpx
+    headers = {"Accept-Encoding": "identity"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    paths = ["/api/products/?limit=100", "/api/products/?limit=10", "/api/products/1",
+             "/api/products/search?q=a&limit=100"]
+    if token:
+        paths += ["/api/orders/admin/all?limit=100"]
+    bodies = {}
+    with httpx.Client(base_url=base_url, headers=headers, timeout=30) as client:
+        for path in paths:
+            response = client.get(path)
+            if response.status_code == 200:
+                bodies[f"GET {path.removeprefix('/api')}"] = response.content
+            else:
+                print(f"[ERROR] {path} returned {response.status_code}, skipped")
+    return bodies
+
+def measure(compress, body: bytes, rounds: int) -> tuple:
+    compressed = compress(body)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        compress(body)
+    return len(compressed), (time.perf_counter() - start) / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="fetch bodies from a running API instead of synthesizing them")
+    parser.add_argument("--token", help="admin JWT, to include the admin order listing with --base-url")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    bodies = live_bodies(args.base_url, args.token) if args.base_url else synthetic_bodies(args.seed)
+    print(f"{'route':<36} {'encoding':<9} {'bytes':>9} {'saved':>7} {'us/resp':>9} {'us/KB':>7}")
+    for route, body in bodies.items():
+        print(f"{route:<36} {'identity':<9} {len(body):>9}")
+        for encoding, levels in LEVELS.items():
+            for level in levels:
+                compressors = build_compressors(gzip_level=level, brotli_quality=level, zstd_level=level)
+                if encoding not in compressors:
+                    continue
+                size, seconds = measure(compressors[encoding], body, args.rounds)
+                print(f"{'':<36} {f'{encoding}-{level}':<9} {size:>9} {1 - size / len(body):>6.0%} "
+                      f"{seconds * 1e6:>9.1f} {seconds * 1e6 / (len(body) / 1024):>7.1f}")
+
+if __name__ == "__main__":
+    main()
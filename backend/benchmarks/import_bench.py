@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""Bulk product import throughput: COPY into staging + one INSERT ... ON CONFLICT merge
+
+Run from the backend folder:
+
+    python -m benchmarks.import_bench --rows 200000
+
+The first pass inserts every SKU, the second updates them all. Benchmark rows
+(SKUs starting with "bench-") are deleted afterwards.
+"""
+
+import argparse
+from config.database import initialize_connection_pool, close_connection_pool, get_db_connection, close_db_connection
+from db.product_import import import_products
+
+def feed(rows: int, price_shift: int):
+    yield "sku,name,description,price,stock,category\n"
+    for i in range(rows):
+        yield f"bench-{i},Bench Product {i},Imported by the benchmark,{(i % 500) + price_shift}.99,{i % 1000},Benchmark\n"
+
+def cleanup():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM products WHERE sku LIKE 'bench-%'")
+        conn.commit()
+    finally:
+        cursor.close()
+        close_db_connection(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    initialize_connection_pool()
+    try:
+        print(f"{'pass':<8} {'rows':>9} {'inserted':>9} {'updated':>9} {'seconds':>8} {'rows/s':>10}")
+        for label, shift in (("insert", 1), ("update", 2)):
+            report = import_products(feed(args.rows, shift), "csv")
+            print(f"{label:<8} {report['imported']:>9} {report['inserted']:>9} {report['updated']:>9} "
+                  f"{report['seconds']:>8.2f} {report['imported'] / report['seconds']:>10.0f}")
+    finally:
+        cleanup()
+        close_connection_pool()
+
+if __name__ == "__main__":
+    main()
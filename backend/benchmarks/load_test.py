@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+"""End-to-end HTTP load test: weighted scenarios against a running API
+
+Run from the backend folder against a seeded local database:
+
+    python -m benchmarks.load_test --duration 30 --concurrency 50
+    python -m benchmarks.load_test --mix browse=60,history=20,flash_sale=20 --app-workers 4
+    python -m benchmarks.load_test --base-url http://localhost:8000 --compare results/load_old.json
+
+Without --base-url the app is started with uvicorn on a free port and stopped
+at the end. Scenarios:
+
+    browse      anonymous: product listing, product detail, search
+    history     login, then order history and one order's detail
+    flash_sale  logged-in users all buying the same limited-stock product
+
+Per-route p50/p95/p99 latency, requests/second and error rates are printed and
+written as JSON. The flash-sale product's stock is checked against the order
+lines afterwards; the run fails (exit code 1) if it was oversold. Setup rows
+(load-test users, their orders and the flash-sale product) are deleted at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+import bcrypt
+import httpx
+import psycopg2.extras
+from config.database import initialize_connection_pool, close_connection_pool, get_db_connection, close_db_connection
+from db.product_db import ProductDB
+from db.order_db import OrderDB
+
+DEFAULT_MIX = "browse=70,history=20,flash_sale=10"
+PASSWORD = "loadtest123"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    def record(self, latency: float, status, error: bool):
+        self.latencies.append(latency)
+        self.statuses[str(status)] += 1
+        if error:
+            self.errors += 1
+
+    def summary(self, duration: float) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        return {
+            "requests": len(latencies),
+            "rps": len(latencies) / duration,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+            "errors": self.errors,
+            "error_rate": self.errors / len(latencies) if latencies else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, fixtures: dict):
+        self.client = client
+        self.fixtures = fixtures
+        self.routes = defaultdict(RouteStats)
+        self.iterations = Counter()
+
+    async def request(self, method: str, route: str, url: str, expected=(200,), **kwargs):
+        """Time one request; statuses outside ``expected`` count as errors"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.routes[f"{method} {route}"].record(time.perf_counter() - start, type(e).__name__, True)
+            return None
+        self.routes[f"{method} {route}"].record(
+            time.perf_counter() - start, response.status_code, response.status_code not in expected
+        )
+        return response
+
+    async def login(self, email: str):
+        response = await self.request("POST", "/auth/login", "/auth/login", json={"email": email, "password": PASSWORD})
+        if response is None or response.status_code != 200:
+            return None
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def browse(self):
+        response = await self.request("GET", "/products", "/products",
+                                      params={"page": random.randint(1, 5), "limit": 20})
+        if response is not None and response.status_code == 200:
+            products = response.json()["products"]
+            if products:
+                product_id = random.choice(products)["id"]
+                await self.request("GET", "/products/{id}", f"/products/{product_id}")
+        await self.request("GET", "/products/search", "/products/search",
+                           params={"q": random.choice(self.fixtures["search_terms"]), "limit": 20})
+
+    async def history(self):
+        headers = await self.login(random.choice(self.fixtures["emails"]))
+        if headers is None:
+            return
+        response = await self.request("GET", "/orders", "/orders", headers=headers, params={"limit": 10})
+        if response is not None and response.status_code == 200:
+            orders = response.json()["orders"]
+            if orders:
+                await self.request("GET", "/orders/{id}", f"/orders/{orders[0]['id']}", headers=headers)
+
+    async def flash_sale(self):
+        order = {
+            "items": [{"product_id": self.fixtures["flash_product_id"], "quantity": 1}],
+            "shipping_address": "1 Load Test Lane",
+        }
+        # 400 is the expected "sold out" answer once stock runs out
+        response = await self.request("POST", "/orders", "/orders", expected=(201, 400),
+                                      json=order, headers=random.choice(self.fixtures["tokens"]))
+        if response is not None and response.status_code == 201:
+            self.fixtures["flash_orders"] += 1
+
+    async def virtual_user(self, scenarios: list, weights: list, deadline: float):
+        while time.perf_counter() < deadline:
+            name = random.choices(scenarios, weights)[0]
+            await getattr(self, name)()
+            self.iterations[name] += 1
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("browse", "history", "flash_sale"):
+            raise SystemExit(f"[ERROR] Unknown scenario: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app(port: int, workers: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, "NODE_ENV": "production"}
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("[ERROR] The app exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("[ERROR] The app did not become healthy within 60s")
+
+def set_up(users: int, flash_stock: int) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    emails = [f"loadtest-{run_id}-{i}@example.com" for i in range(users)]
+    password_hash = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Inserted directly: one bcrypt hash for every account keeps setup fast
+        user_ids = [row[0] for row in psycopg2.extras.execute_values(
+            cursor,
+            "INSERT INTO users (name, email, password, role, created_at) VALUES %s RETURNING id",
+            [(f"Load Test {i}", email, password_hash, "user") for i, email in enumerate(emails)],
+            template="(%s, %s, %s, %s, NOW())", fetch=True
+        )]
+        conn.commit()
+    finally:
+        cursor.close()
+        close_db_connection(conn)
+    product = ProductDB.create_product(name=f"Flash Sale {run_id}", description="Load test flash sale item",
+                                       price=9.99, stock=flash_stock, category="LoadTest")
+
+    products, _ = ProductDB.get_all_products(limit=50, offset=0, count_strategy="none")
+    words = {word for p in products for word in p["name"].split() if len(word) > 3 and word.isalpha()}
+    return {
+        "emails": emails,
+        "user_ids": user_ids,
+        "flash_product_id": product["id"],
+        "flash_stock": flash_stock,
+        "flash_orders": 0,
+        "search_terms": sorted(words) or ["product"],
+    }
+
+def check_flash_sale(fixtures: dict) -> dict:
+    """Stock left plus units sold must equal the starting stock, and stock must never go negative"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT stock FROM products WHERE id = %s", (fixtures["flash_product_id"],))
+        final_stock = cursor.fetchone()[0]
+        cursor.execute("SELECT COALESCE(SUM(quantity), 0) FROM order_items WHERE product_id = %s",
+                       (fixtures["flash_product_id"],))
+        sold = int(cursor.fetchone()[0])
+        conn.commit()
+    finally:
+        cursor.close()
+        close_db_connection(conn)
+
+    return {
+        "initial_stock": fixtures["flash_stock"],
+        "final_stock": final_stock,
+        "units_sold": sold,
+        "successful_orders": fixtures["flash_orders"],
+        "oversold": final_stock < 0 or final_stock + sold != fixtures["flash_stock"],
+    }
+
+def clean_up(fixtures: dict):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Orders are deleted through OrderDB, so they leave the daily sales summaries too;
+        # a cascade from users or products would leave their figures behind
+        cursor.execute(
+            "SELECT id FROM orders o WHERE o.user_id = ANY(%s) "
+            "OR EXISTS (SELECT 1 FROM order_items oi WHERE oi.order_id = o.id AND oi.product_id = %s)",
+            (fixtures["user_ids"], fixtures["flash_product_id"])
+        )
+        order_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        for order_id in order_ids:
+            OrderDB.delete_order(order_id)
+        cursor.execute("DELETE FROM users WHERE id = ANY(%s)", (fixtures["user_ids"],))
+        cursor.execute("DELETE FROM products WHERE id = %s", (fixtures["flash_product_id"],))
+        conn.commit()
+    finally:
+        cursor.close()
+        close_db_connection(conn)
+
+async def run(base_url: str, fixtures: dict, mix: dict, concurrency: int, duration: float) -> LoadTest:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"{base_url}/api", limits=limits, timeout=30) as client:
+        test = LoadTest(client, fixtures)
+        if "flash_sale" in mix:
+            tokens = await asyncio.gather(*[test.login(email) for email in fixtures["emails"]])
+            fixtures["tokens"] = [t for t in tokens if t]
+            if not fixtures["tokens"]:
+                raise SystemExit("[ERROR] No load-test user could log in")
+        test.routes.clear()
+
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[
+            test.virtual_user(list(mix), list(mix.values()), deadline) for _ in range(concurrency)
+        ])
+        return test
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"\n{'route':<24} {'req':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err %':>6}"
+          + (f" {'p95 vs base':>12} {'rps vs base':>12}" if baseline else ""))
+    for route, stats in sorted(results["routes"].items()):
+        line = (f"{route:<24} {stats['requests']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+                f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['error_rate'] * 100:>6.2f}")
+        base = (baseline or {}).get("routes", {}).get(route)
+        if base:
+            p95 = (stats["p95_ms"] / base["p95_ms"] - 1) * 100 if base["p95_ms"] else 0.0
+            rps = (stats["rps"] / base["rps"] - 1) * 100 if base["rps"] else 0.0
+            line += f" {p95:>+11.1f}% {rps:>+11.1f}%"
+        print(line)
+    totals = results["totals"]
+    print(f"\n[INFO] {totals['requests']} requests, {totals['rps']:.1f} req/s, {totals['errors']} errors")
+    flash = results.get("flash_sale")
+    if flash:
+        state = "[ERROR] OVERSOLD" if flash["oversold"] else "[OK] not oversold"
+        print(f"{state}: stock {flash['initial_stock']} -> {flash['final_stock']}, "
+              f"{flash['units_sold']} units in order lines, {flash['successful_orders']} successful orders")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="test an already running server instead of starting one")
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn workers when starting the app")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights")
+    parser.add_argument("--users", type=int, default=20, help="load-test accounts to create")
+    parser.add_argument("--flash-stock", type=int, default=100, help="units of the flash-sale product")
+    parser.add_argument("--output", help="results JSON path (default: benchmarks/results/load_<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    initialize_connection_pool()
+    fixtures = set_up(args.users, args.flash_stock)
+    app = None
+    try:
+        base_url = args.base_url
+        if not base_url:
+            port = free_port()
+            app = start_app(port, args.app_workers)
+            base_url = f"http://127.0.0.1:{port}"
+
+        print(f"[INFO] {args.concurrency} virtual users for {args.duration:.0f}s against {base_url} ({args.mix})")
+        test = asyncio.run(run(base_url, fixtures, mix, args.concurrency, args.duration))
+
+        routes = {route: stats.summary(args.duration) for route, stats in test.routes.items()}
+        requests = sum(r["requests"] for r in routes.values())
+        results = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "config": {**vars(args), "base_url": base_url},
+            "totals": {
+                "requests": requests,
+                "rps": requests / args.duration,
+                "errors": sum(r["errors"] for r in routes.values()),
+            },
+            "scenarios": dict(test.iterations),
+            "routes": routes,
+        }
+        if "flash_sale" in mix:
+            results["flash_sale"] = check_flash_sale(fixtures)
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait(timeout=30)
+        clean_up(fixtures)
+        close_connection_pool()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"[OK] Results written to {output}")
+
+    if results.get("flash_sale", {}).get("oversold"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,601 @@
+#!/usr/bin/env python
+"""Micro-benchmarks for the data layer, JWT helpers and response models, with a baseline regression gate
+
+Run from the backend folder against a seeded database:
+
+    python -m benchmarks.micro run                      # compare with the baseline, exit 1 on regressions
+    python -m benchmarks.micro run --save-baseline      # record a new baseline
+    python -m benchmarks.micro run --no-db -k helpers   # CPU-only benchmarks matching "helpers"
+    python -m benchmarks.micro diff old.json new.json   # print a diff table between two result files
+
+Each benchmark is timed as the median of --rounds rounds. Per-call time is
+compared with the baseline. A benchmark is a regression when it is more than
+--threshold (a fraction, default 0.20) slower than its baseline. DB benchmarks
+read existing rows and create their own rows for the write paths; those rows
+are deleted afterwards (orders through OrderDB.delete_order, so the sales
+summaries lose them again). Benchmarks that rewrite shared data, such as the
+sales summary rebuild, only run with --destructive.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "micro_baseline.json")
+DEFAULT_THRESHOLD = float(os.getenv("MICROBENCH_THRESHOLD", 0.20))
+
+BENCHMARKS = {}   # name -> (group, calls per round, setup)
+DESTRUCTIVE = set()  # names that only run with --destructive
+
+def benchmark(name: str, group: str, calls: int, destructive: bool = False):
+    """Register ``setup(total_calls, ctx)``, which returns the function to time"""
+    def register(setup):
+        BENCHMARKS[name] = (group, calls, setup)
+        if destructive:
+            DESTRUCTIVE.add(name)
+        return setup
+    return register
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+class Context:
+    """Seeded ids to read, plus rows created by write benchmarks (deleted at the end)"""
+
+    def __init__(self):
+        self.tag = f"microbench-{uuid.uuid4().hex[:8]}"
+        self.product_ids = []
+        self.order_ids = []
+        self.user_ids = []
+        self.seed = None
+
+    def load_seed(self):
+        from config.database import get_db_connection, close_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT id, category, name FROM products ORDER BY id LIMIT 1")
+            product = cursor.fetchone()
+            cursor.execute("SELECT id, user_id, created_at FROM orders ORDER BY created_at DESC, id DESC LIMIT 1")
+            order = cursor.fetchone()
+            cursor.execute("SELECT id, email FROM users ORDER BY id LIMIT 1")
+            user = cursor.fetchone()
+            conn.commit()
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+        if not (product and order and user):
+            raise SystemExit("[ERROR] DB benchmarks need at least one product, order and user "
+                             "(python generate_data.py --scale 10k)")
+        self.seed = {
+            "product_id": product[0], "category": product[1], "term": product[2].split()[0],
+            "order_id": order[0], "order_user_id": order[1], "order_keyset": (order[2], order[0]),
+            "user_id": user[0], "email": user[1],
+        }
+
+    def new_product(self, stock: int = 1_000_000) -> int:
+        from db.product_db import ProductDB
+        product_id = ProductDB.create_product(name=f"{self.tag} product", price=9.99, stock=stock, category=self.tag)["id"]
+        self.product_ids.append(product_id)
+        return product_id
+
+    def new_order(self) -> int:
+        from db.order_db import OrderDB
+        order_id = OrderDB.create_order(user_id=self.seed["user_id"], total_amount=9.99, shipping_address=self.tag)["id"]
+        self.order_ids.append(order_id)
+        return order_id
+
+    def clean_up(self):
+        from config.database import get_db_connection, close_db_connection
+        from db.order_db import OrderDB
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            # Every order the benchmarks created, including ones that would cascade away with their
+            # products or users; deleted one by one so their sales summary contributions go too
+            cursor.execute(
+                "SELECT id FROM orders o WHERE o.id = ANY(%s) OR o.shipping_address = %s OR o.user_id = ANY(%s) "
+                "OR EXISTS (SELECT 1 FROM order_items oi JOIN products p ON p.id = oi.product_id "
+                "WHERE oi.order_id = o.id AND (p.id = ANY(%s) OR p.category = %s))",
+                (self.order_ids, self.tag, self.user_ids, self.product_ids, self.tag)
+            )
+            order_ids = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+            for order_id in order_ids:
+                OrderDB.delete_order(order_id)
+            cursor.execute("DELETE FROM products WHERE id = ANY(%s) OR category = %s", (self.product_ids, self.tag))
+            cursor.execute("DELETE FROM users WHERE id = ANY(%s) OR email LIKE %s", (self.user_ids, f"{self.tag}%"))
+            conn.commit()
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+# ---------------------------------------------------------------------------
+# ProductDB
+# ---------------------------------------------------------------------------
+
+@benchmark("ProductDB.create_product", "db", 50)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ctx.product_ids.append(
+        ProductDB.create_product(name=f"{ctx.tag} product", price=9.99, stock=10, category=ctx.tag)["id"])
+
+@benchmark("ProductDB.get_product_by_id", "db", 500)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.get_product_by_id(ctx.seed["product_id"])
+
+@benchmark("CachedProductDB.get_product_by_id", "db", 5000)
+def _(total_calls, ctx):
+    from db.product_db import CachedProductDB
+    CachedProductDB.get_product_by_id(ctx.seed["product_id"])
+    return lambda: CachedProductDB.get_product_by_id(ctx.seed["product_id"])
+
+@benchmark("ProductDB.get_products_by_ids", "db", 200)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    product_ids = list(range(ctx.seed["product_id"], ctx.seed["product_id"] + 50))
+    return lambda: ProductDB.get_products_by_ids(product_ids)
+
+@benchmark("ProductDB.get_all_products[exact]", "db", 200)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.get_all_products(limit=100, offset=0, count_strategy="exact")
+
+@benchmark("ProductDB.get_all_products[category,none]", "db", 200)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.get_all_products(limit=100, offset=0, category=ctx.seed["category"], count_strategy="none")
+
+@benchmark("ProductDB.get_products_after", "db", 200)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.get_products_after(ctx.seed["product_id"], limit=100)
+
+@benchmark("ProductDB.update_product", "db", 100)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    product_id = ctx.new_product()
+    return lambda: ProductDB.update_product(product_id, price=19.99, stock=5)
+
+@benchmark("ProductDB.delete_product", "db", 50)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    ids = [ctx.new_product() for _ in range(total_calls)]
+    return lambda: ProductDB.delete_product(ids.pop())
+
+@benchmark("ProductDB.search_products", "db", 100)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.search_products(ctx.seed["term"], limit=20, offset=0, count_strategy="none")
+
+@benchmark("ProductDB.search_products_fulltext", "db", 100)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.search_products_fulltext(ctx.seed["term"], limit=20, offset=0, count_strategy="none")
+
+@benchmark("ProductDB.search_products_ilike", "db", 100)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.search_products_ilike(ctx.seed["term"], limit=20, offset=0, count_strategy="none")
+
+@benchmark("ProductDB.search_products_after", "db", 100)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    return lambda: ProductDB.search_products_after(ctx.seed["term"], None, limit=20)
+
+@benchmark("ProductDB.decrease_stock", "db", 200)
+def _(total_calls, ctx):
+    from db.product_db import ProductDB
+    product_id = ctx.new_product()
+    return lambda: ProductDB.decrease_stock(product_id, 1)
+
+# ---------------------------------------------------------------------------
+# OrderDB
+# ---------------------------------------------------------------------------
+
+@benchmark("OrderDB.create_order", "db", 100)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    return lambda: ctx.order_ids.append(
+        OrderDB.create_order(user_id=ctx.seed["user_id"], total_amount=9.99, shipping_address=ctx.tag)["id"])
+
+@benchmark("OrderDB.place_order[5 items]", "db", 50)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    items = [(ctx.new_product(), 1) for _ in range(5)]
+    return lambda: ctx.order_ids.append(
+        OrderDB.place_order(user_id=ctx.seed["user_id"], items=items, shipping_address=ctx.tag)["id"])
+
+@benchmark("OrderDB.get_order_by_id", "db", 500)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    return lambda: OrderDB.get_order_by_id(ctx.seed["order_id"])
+
+@benchmark("OrderDB.get_user_orders", "db", 200)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    return lambda: OrderDB.get_user_orders(ctx.seed["order_user_id"], limit=100, offset=0)
+
+@benchmark("OrderDB.get_user_orders_after", "db", 200)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    return lambda: OrderDB.get_user_orders_after(ctx.seed["order_user_id"], None, limit=100)
+
+@benchmark("OrderDB.get_all_orders", "db", 100)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    return lambda: OrderDB.get_all_orders(limit=100, offset=0)
+
+@benchmark("OrderDB.get_all_orders_after", "db", 100)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    return lambda: OrderDB.get_all_orders_after(ctx.seed["order_keyset"], limit=100)
+
+@benchmark("OrderDB.update_order_status", "db", 100)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    order_id = ctx.new_order()
+    return lambda: OrderDB.update_order_status(order_id, "processing")
+
+@benchmark("OrderDB.delete_order", "db", 50)
+def _(total_calls, ctx):
+    from db.order_db import OrderDB
+    ids = [ctx.new_order() for _ in range(total_calls)]
+    return lambda: OrderDB.delete_order(ids.pop())
+
+@benchmark("StatsDB.get_admin_stats", "db", 20)
+def _(total_calls, ctx):
+    from db.stats_db import StatsDB
+    return StatsDB.get_admin_stats
+
+@benchmark("SalesDB.get_daily_sales", "db", 50)
+def _(total_calls, ctx):
+    from datetime import date, timedelta
+    from db.sales_db import SalesDB
+    return lambda: SalesDB.get_daily_sales(date.today() - timedelta(days=29), date.today())
+
+@benchmark("SalesDB.get_top_products", "db", 50)
+def _(total_calls, ctx):
+    from datetime import date, timedelta
+    from db.sales_db import SalesDB
+    return lambda: SalesDB.get_top_products(date.today() - timedelta(days=29), date.today(), limit=20)
+
+@benchmark("SalesDB.get_category_sales", "db", 50)
+def _(total_calls, ctx):
+    from datetime import date, timedelta
+    from db.sales_db import SalesDB
+    return lambda: SalesDB.get_category_sales(date.today() - timedelta(days=29), date.today())
+
+@benchmark("SalesDB.rebuild_summaries", "db", 1, destructive=True)
+def _(total_calls, ctx):
+    from db.sales_db import SalesDB
+    return SalesDB.rebuild_summaries
+
+# ---------------------------------------------------------------------------
+# UserDB
+# ---------------------------------------------------------------------------
+
+@benchmark("UserDB.create_user", "db", 10)
+def _(total_calls, ctx):
+    from db.user_db import UserDB
+    counter = iter(range(total_calls))
+    return lambda: ctx.user_ids.append(
+        UserDB.create_user(name="Micro Bench", email=f"{ctx.tag}-{next(counter)}@example.com", password="benchmark")["id"])
+
+@benchmark("UserDB.get_user_by_email", "db", 500)
+def _(total_calls, ctx):
+    from db.user_db import UserDB
+    return lambda: UserDB.get_user_by_email(ctx.seed["email"])
+
+@benchmark("UserDB.get_user_by_id", "db", 500)
+def _(total_calls, ctx):
+    from db.user_db import UserDB
+    return lambda: UserDB.get_user_by_id(ctx.seed["user_id"])
+
+@benchmark("UserDB.get_all_users", "db", 200)
+def _(total_calls, ctx):
+    from db.user_db import UserDB
+    return lambda: UserDB.get_all_users(limit=100, offset=0)
+
+@benchmark("UserDB.update_user", "db", 100)
+def _(total_calls, ctx):
+    from db.user_db import UserDB
+    return lambda: UserDB.update_user(ctx.seed["user_id"], name="Micro Bench")
+
+@benchmark("UserDB.verify_password", "cpu", 5)
+def _(total_calls, ctx):
+    import bcrypt
+    from db.user_db import UserDB
+    hashed = bcrypt.hashpw(b"benchmark", bcrypt.gensalt()).decode("utf-8")
+    return lambda: UserDB.verify_password("benchmark", hashed)
+
+# ---------------------------------------------------------------------------
+# utils/helpers and models
+# ---------------------------------------------------------------------------
+
+@benchmark("helpers.create_access_token", "cpu", 5000)
+def _(total_calls, ctx):
+    from utils.helpers import create_access_token
+    return lambda: create_access_token(42, "user")
+
+@benchmark("helpers.verify_token", "cpu", 5000)
+def _(total_calls, ctx):
+    from utils.helpers import create_access_token, verify_token
+    token = create_access_token(42, "user")
+    return lambda: verify_token(token)
+
+@benchmark("helpers.verify_token_cached[repeat]", "cpu", 5000)
+def _(total_calls, ctx):
+    from utils.helpers import create_access_token, verify_token_cached
+    token = create_access_token(42, "user")
+    return lambda: verify_token_cached(token)
+
+@benchmark("helpers.verify_token_cached[unique]", "cpu", 2000)
+def _(total_calls, ctx):
+    from utils.helpers import create_access_token, verify_token_cached
+    tokens = iter([create_access_token(i, "user") for i in range(total_calls)])
+    return lambda: verify_token_cached(next(tokens))
+
+@benchmark("SingleFlight.do", "cpu", 20000)
+def _(total_calls, ctx):
+    from utils.singleflight import SingleFlight
+    flight = SingleFlight("bench")
+    return lambda: flight.do(("get_product_by_id", (1,), ()), dict)
+
+def _product_rows(n: int) -> list:
+    now = datetime.now()
+    return [
+        {"id": i, "sku": f"SKU-{i}", "name": f"Product {i}", "description": "A product used for benchmarking " * 4,
+         "price": Decimal("19.99"), "stock": i, "category": "Benchmark", "image_url": f"https://example.com/{i}.png",
+         "created_at": now, "updated_at": now}
+        for i in range(n)
+    ]
+
+def _order_rows(n: int) -> list:
+    now = datetime.now()
+    return [
+        {"id": i, "user_id": 7, "total_amount": Decimal("59.97"), "status": "delivered",
+         "shipping_address": "123 Main Street, New York, NY 10001", "created_at": now, "updated_at": now,
+         "items": [{"product_id": p, "product_name": f"Product {p}", "quantity": 1, "price": 19.99} for p in range(3)]}
+        for i in range(n)
+    ]
+
+PAGINATION = {"current_page": 1, "total_pages": 10, "total_items": 1000, "items_per_page": 100}
+
+@benchmark("ProductListResponse[100].validate+dump", "cpu", 200)
+def _(total_calls, ctx):
+    from models.product import ProductListResponse
+    rows = _product_rows(100)
+    return lambda: ProductListResponse(products=rows, pagination=PAGINATION).model_dump_json()
+
+@benchmark("ProductListResponse[100].dump", "cpu", 500)
+def _(total_calls, ctx):
+    from models.product import ProductListResponse
+    response = ProductListResponse(products=_product_rows(100), pagination=PAGINATION)
+    return response.model_dump_json
+
+@benchmark("OrderListResponse[100].validate+dump", "cpu", 200)
+def _(total_calls, ctx):
+    from models.order import OrderListResponse
+    rows = _order_rows(100)
+    return lambda: OrderListResponse(orders=rows, pagination=PAGINATION).model_dump_json()
+
+@benchmark("OrderListResponse[100].dump", "cpu", 500)
+def _(total_calls, ctx):
+    from models.order import OrderListResponse
+    response = OrderListResponse(orders=_order_rows(100), pagination=PAGINATION)
+    return response.model_dump_json
+
+def _response_route(model):
+    """What a response_model route does with a returned model: validate, serialize, render"""
+    from fastapi.responses import ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    field = create_response_field(name="response", type_=model)
+
+    def render(content):
+        coro = serialize_response(field=field, response_content=content)
+        try:
+            coro.send(None)
+        except StopIteration as done:
+            return ORJSONResponse(done.value).body
+        raise RuntimeError("serialize_response suspended")
+    return render
+
+@benchmark("ProductListResponse[100].route", "cpu", 200)
+def _(total_calls, ctx):
+    from models.product import ProductListResponse
+    rows = _product_rows(100)
+    render = _response_route(ProductListResponse)
+    return lambda: render(ProductListResponse(products=rows, pagination=PAGINATION))
+
+@benchmark("ProductListResponse[100].fast", "cpu", 1000)
+def _(total_calls, ctx):
+    from models.product import ProductListResponse
+    from utils.serialization import dump_json
+    rows = _product_rows(100)
+    return lambda: dump_json(ProductListResponse, {"products": rows, "pagination": PAGINATION})
+
+@benchmark("OrderListResponse[100].route", "cpu", 200)
+def _(total_calls, ctx):
+    from models.order import OrderListResponse
+    rows = _order_rows(100)
+    render = _response_route(OrderListResponse)
+    return lambda: render(OrderListResponse(orders=rows, pagination=PAGINATION))
+
+@benchmark("OrderListResponse[100].fast", "cpu", 1000)
+def _(total_calls, ctx):
+    from models.order import OrderListResponse
+    from utils.serialization import dump_json
+    rows = _order_rows(100)
+    return lambda: dump_json(OrderListResponse, {"orders": rows, "pagination": PAGINATION})
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def uncovered_db_methods() -> list:
+    """Public DB methods that no benchmark exercises"""
+    from db.product_db import ProductDB
+    from db.order_db import OrderDB
+    from db.user_db import UserDB
+    from db.stats_db import StatsDB
+    from db.sales_db import SalesDB
+    names = {name.split("[")[0] for name in BENCHMARKS}
+    return [
+        f"{cls.__name__}.{method}"
+        for cls in (ProductDB, OrderDB, UserDB, StatsDB, SalesDB)
+        for method, _ in inspect.getmembers(cls, inspect.isfunction)
+        if not method.startswith("_") and f"{cls.__name__}.{method}" not in names
+    ]
+
+def time_benchmark(setup, calls: int, rounds: int, ctx: Context) -> float:
+    """Median seconds per call over ``rounds`` rounds of ``calls`` calls"""
+    func = setup(calls * (rounds + 1), ctx)
+    for _ in range(calls):   # warm-up round (connections, prepared statements, caches)
+        func()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        samples.append((time.perf_counter() - start) / calls)
+    return statistics.median(samples)
+
+def run(args) -> dict:
+    selected = {
+        name: spec for name, spec in BENCHMARKS.items()
+        if (not args.no_db or spec[0] != "db") and (not args.k or args.k.lower() in name.lower())
+        and (args.destructive or name not in DESTRUCTIVE)
+    }
+    ctx = Context()
+    uses_db = any(spec[0] == "db" for spec in selected.values())
+    if uses_db:
+        from config.database import initialize_connection_pool
+        initialize_connection_pool()
+        ctx.load_seed()
+        missing = uncovered_db_methods()
+        if missing:
+            print(f"[ERROR] DB methods without a benchmark: {', '.join(missing)}")
+
+    results = {}
+    errors = {}
+    try:
+        for name, (group, calls, setup) in selected.items():
+            try:
+                seconds = time_benchmark(setup, max(1, int(calls * args.scale)), args.rounds, ctx)
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+                print(f"  {name:<45} ERROR {errors[name]}")
+                continue
+            results[name] = {"group": group, "us_per_call": seconds * 1e6}
+            print(f"  {name:<45} {seconds * 1e6:>12.1f} us")
+    finally:
+        if uses_db:
+            from config.database import close_connection_pool
+            ctx.clean_up()
+            close_connection_pool()
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "rounds": args.rounds,
+        "benchmarks": results,
+        "errors": errors,
+    }
+
+def diff_table(baseline: dict, current: dict, threshold: float) -> list:
+    """Print per-benchmark changes; returns the names that regressed beyond threshold"""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline us':>12} {'current us':>12} {'change':>9}")
+    names = sorted(set(baseline["benchmarks"]) | set(current["benchmarks"]))
+    for name in names:
+        old = baseline["benchmarks"].get(name)
+        new = current["benchmarks"].get(name)
+        if old is None or new is None:
+            state = "new" if old is None else "missing"
+            old_us = f"{old['us_per_call']:.1f}" if old else "-"
+            new_us = f"{new['us_per_call']:.1f}" if new else "-"
+            print(f"{name:<45} {old_us:>12} {new_us:>12} {state:>9}")
+            continue
+        change = new["us_per_call"] / old["us_per_call"] - 1 if old["us_per_call"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<45} {old['us_per_call']:>12.1f} {new['us_per_call']:>12.1f} {change * 100:>+8.1f}%{flag}")
+    return regressions
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def save(path: str, results: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and compare with the baseline")
+    run_parser.add_argument("-k", help="only benchmarks whose name contains this text")
+    run_parser.add_argument("--no-db", action="store_true", help="skip benchmarks that need Postgres")
+    run_parser.add_argument("--destructive", action="store_true",
+                            help="also run benchmarks that rewrite shared data (e.g. the sales summary rebuild)")
+    run_parser.add_argument("--rounds", type=int, default=5)
+    run_parser.add_argument("--scale", type=float, default=1.0, help="multiply the calls per round")
+    run_parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="allowed slowdown as a fraction (0.2 = 20%%)")
+    run_parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    run_parser.add_argument("--output", help="also write the results to this file")
+
+    diff_parser = commands.add_parser("diff", help="print a diff table between two result files")
+    diff_parser.add_argument("baseline")
+    diff_parser.add_argument("current")
+    diff_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == "diff":
+        regressions = diff_table(load(args.baseline), load(args.current), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    print(f"[INFO] Running micro-benchmarks ({args.rounds} rounds each)")
+    results = run(args)
+    if args.output:
+        save(args.output, results)
+
+    if args.save_baseline:
+        save(args.baseline, results)
+        print(f"[OK] Baseline written to {args.baseline}")
+        sys.exit(1 if results["errors"] else 0)
+
+    if not os.path.exists(args.baseline):
+        print(f"[INFO] No baseline at {args.baseline}; run with --save-baseline to create one")
+        sys.exit(1 if results["errors"] else 0)
+
+    regressions = diff_table(load(args.baseline), results, args.threshold)
+    if regressions:
+        print(f"\n[ERROR] {len(regressions)} benchmark(s) slower than the baseline by more than "
+              f"{args.threshold:.0%}: {', '.join(regressions)}")
+    if results["errors"]:
+        print(f"[ERROR] {len(results['errors'])} benchmark(s) failed")
+    if regressions or results["errors"]:
+        sys.exit(1)
+    print(f"\n[OK] No regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Order placement throughput with 10-item orders: per-item calls vs one transaction
+
+Run from the backend folder against a database with at least one user:
+
+    python -m benchmarks.order_bench --orders 500 --threads 8
+
+"before" repeats the old route logic (get_product_by_id + decrease_stock per
+item, then create_order): 2N+1 separate transactions. "after" calls
+OrderDB.place_order. Benchmark products and orders are deleted afterwards.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.database import initialize_connection_pool, close_connection_pool, get_db_connection, close_db_connection
+from db.product_db import ProductDB
+from db.order_db import OrderDB
+
+ITEMS_PER_ORDER = 10
+
+def create_bench_products() -> list:
+    return [
+        ProductDB.create_product(name=f"Bench Product {i}", price=9.99, stock=10_000_000, category="Benchmark")["id"]
+        for i in range(ITEMS_PER_ORDER)
+    ]
+
+def pick_user_id() -> int:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id FROM users ORDER BY id LIMIT 1")
+        row = cursor.fetchone()
+        if row is None:
+            raise SystemExit("[ERROR] Benchmark needs at least one user")
+        return row[0]
+    finally:
+        cursor.close()
+        close_db_connection(conn)
+
+def cleanup(product_ids: list, order_ids: list):
+    # Through OrderDB so the orders leave the daily sales summaries too
+    for order_id in order_ids:
+        OrderDB.delete_order(order_id)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM products WHERE id = ANY(%s)", (product_ids,))
+        conn.commit()
+    finally:
+        cursor.close()
+        close_db_connection(conn)
+
+def place_before(user_id: int, items: list) -> int:
+    total = 0.0
+    for product_id, quantity in items:
+        product = ProductDB.get_product_by_id(product_id)
+        total += float(product["price"]) * quantity
+        ProductDB.decrease_stock(product_id, quantity)
+    return OrderDB.create_order(user_id=user_id, total_amount=total, shipping_address="Bench Street 1")["id"]
+
+def place_after(user_id: int, items: list) -> int:
+    return OrderDB.place_order(user_id=user_id, items=items, shipping_address="Bench Street 1")["id"]
+
+def run(place, user_id: int, items: list, orders: int, threads: int) -> tuple:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        order_ids = list(pool.map(lambda _: place(user_id, items), range(orders)))
+    return orders / (time.perf_counter() - start), order_ids
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    initialize_connection_pool()
+    product_ids = create_bench_products()
+    order_ids = []
+    try:
+        user_id = pick_user_id()
+        items = [(product_id, 1) for product_id in product_ids]
+        print(f"{'mode':<8} {'orders/s':>10}")
+        for mode, place in (("before", place_before), ("after", place_after)):
+            throughput, ids = run(place, user_id, items, args.orders, args.threads)
+            order_ids.extend(ids)
+            print(f"{mode:<8} {throughput:>10.1f}")
+    finally:
+        cleanup(product_ids, order_ids)
+        close_connection_pool()
+
+if __name__ == "__main__":
+    main()
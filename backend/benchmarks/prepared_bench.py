@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""Per-query latency of hot product/order reads with and without prepared statements
+
+Run from the backend folder against a seeded database:
+
+    python -m benchmarks.prepared_bench --iterations 2000
+"""
+
+import argparse
+import statistics
+import time
+import db.prepared
+from config.database import initialize_connection_pool, close_connection_pool
+from db.product_db import ProductDB
+from db.order_db import OrderDB
+
+CASES = {
+    "get_product_by_id": lambda: ProductDB.get_product_by_id(1),
+    "get_all_products": lambda: ProductDB.get_all_products(limit=20, offset=0),
+    "search_products": lambda: ProductDB.search_products("usb", limit=20, offset=0),
+    "get_user_orders": lambda: OrderDB.get_user_orders(1, limit=10, offset=0),
+}
+
+def time_case(func, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    initialize_connection_pool()
+    try:
+        print(f"{'case':<20} {'plain p50 ms':>13} {'prepared p50 ms':>16} {'change':>8}")
+        for name, func in CASES.items():
+            results = {}
+            for enabled in (False, True):
+                db.prepared.DB_PREPARED_STATEMENTS = enabled
+                func()  # warm up (and prepare)
+                results[enabled] = statistics.median(time_case(func, args.iterations))
+            change = (results[True] - results[False]) / results[False] * 100
+            print(f"{name:<20} {results[False]:>13.3f} {results[True]:>16.3f} {change:>7.1f}%")
+        print(db.prepared.get_prepared_stats())
+    finally:
+        close_connection_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Compare ILIKE and full-text/trigram product search at catalog scale
+
+Run from the backend folder (the database needs pg_trgm available):
+
+    python -m benchmarks.search_bench --sizes 100000,1000000
+
+Synthetic products are generated into a scratch schema (bench_search) that
+mirrors public.products, including the search column and indexes, so the real
+catalog is never touched. The schema is dropped afterwards unless --keep is given.
+"""
+
+import argparse
+import statistics
+import time
+import psycopg2
+from config.settings import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+from db.product_db import SEARCH_PAGE_COUNTED, FTS_PAGE_COUNTED, _fts_params
+
+SCHEMA = "bench_search"
+TERMS = ["wireless", "headphnes", "usb cable", "organizer", "stainless steel bottle"]
+
+GENERATE_SQL = f"""
+INSERT INTO {SCHEMA}.products (id, name, description, price, stock, category, created_at)
+SELECT g,
+       (ARRAY['Wireless','Portable','Premium','Compact','Smart','Classic','Ergonomic','Stainless'])[1 + floor(random() * 8)::int]
+       || ' ' ||
+       (ARRAY['Headphones','Speaker','Cable','Organizer','Lamp','Bottle','Backpack','Keyboard','Jacket','Guide'])[1 + floor(random() * 10)::int]
+       || ' ' || g,
+       'A ' || (ARRAY['durable','lightweight','waterproof','rechargeable','handmade','modern'])[1 + floor(random() * 6)::int]
+       || ' product with ' || (ARRAY['usb charging','steel frame','cotton lining','noise cancellation','led display','fast delivery'])[1 + floor(random() * 6)::int]
+       || ', ideal for ' || (ARRAY['travel','office','home','outdoor','students','gaming'])[1 + floor(random() * 6)::int],
+       (random() * 500 + 1)::numeric(10, 2),
+       floor(random() * 200)::int,
+       (ARRAY['Electronics','Clothing','Books','Home','Sports'])[1 + floor(random() * 5)::int],
+       NOW() - random() * interval '365 days'
+FROM generate_series(1, %s) g
+"""
+
+def setup(cursor, size: int):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    cursor.execute(f"CREATE TABLE {SCHEMA}.products (LIKE public.products INCLUDING ALL)")
+    cursor.execute(GENERATE_SQL, (size,))
+    cursor.execute(f"ANALYZE {SCHEMA}.products")
+    cursor.execute(f"SET search_path TO {SCHEMA}, public")
+
+def time_query(cursor, sql: str, params: tuple, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Keep the bench_search schema afterwards")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD, port=DB_PORT)
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    try:
+        for size in [int(s) for s in args.sizes.split(",")]:
+            print(f"[INFO] Generating {size:,} products...")
+            setup(cursor, size)
+            print(f"{'term':<24} {'ilike p50 ms':>13} {'fulltext p50 ms':>16} {'ilike hits':>11} {'fulltext hits':>14}")
+            for term in TERMS:
+                pattern = f"%{term}%"
+                ilike_params = (pattern, pattern, args.limit, 0)
+                fts_params = _fts_params(term, args.limit, 0)
+                ilike = time_query(cursor, SEARCH_PAGE_COUNTED.sql, ilike_params, args.iterations)
+                ilike_hits = cursor.rowcount
+                fulltext = time_query(cursor, FTS_PAGE_COUNTED.sql, fts_params, args.iterations)
+                fulltext_hits = cursor.rowcount
+                print(f"{term:<24} {statistics.median(ilike):>13.2f} {statistics.median(fulltext):>16.2f} "
+                      f"{ilike_hits:>11} {fulltext_hits:>14}")
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
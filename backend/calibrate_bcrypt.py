@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Pick the bcrypt cost factor for a target hash time on this machine
+
+    python calibrate_bcrypt.py --target-ms 250
+
+Run it on the deployment hardware and set BCRYPT_ROUNDS to the suggested value.
+Existing hashes keep working after a change because the cost is stored in each
+hash; users get the new cost the next time their password is set.
+"""
+
+import argparse
+import os
+import statistics
+import time
+import bcrypt
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """Median seconds for one hash at ``rounds``"""
+    salt = bcrypt.gensalt(rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", salt)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="longest acceptable time for one hash")
+    parser.add_argument("--min-rounds", type=int, default=10, help="never suggest a cost below this")
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    workers = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+    print(f"{'rounds':>6} {'ms/hash':>10} {'logins/s (' + str(workers) + ' workers)':>24}")
+    chosen = args.min_rounds
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        seconds = time_rounds(rounds, args.samples)
+        print(f"{rounds:>6} {seconds * 1000:>10.1f} {workers / seconds:>24.1f}")
+        if seconds * 1000 <= args.target_ms:
+            chosen = rounds
+        else:
+            # Each extra round doubles the cost, so later ones only get slower
+            break
+
+    if time_rounds(chosen, 1) * 1000 > args.target_ms:
+        print(f"\n[INFO] Even {chosen} rounds is slower than {args.target_ms:.0f}ms here; not going below --min-rounds")
+    print(f"\n[OK] Suggested setting for a {args.target_ms:.0f}ms target: BCRYPT_ROUNDS={chosen}")
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,87 @@
-import psycopg2
-from psycopg2 import Error, pool
-from config.settings import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+import functools
+import threading
+from psycopg2 import Error
+from anyio import CapacityLimiter, to_thread
+from config.pool import ConnectionPool
+from config.replicas import ReplicaRouter, parse_lsn, set_db_session
+from config.settings import (
+    DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT,
+    DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_PREPING_AFTER, DB_POOL_RECYCLE, DB_POOL_DRAIN_TIMEOUT,
+    DB_REPLICA_DSNS, DB_REPLICA_CHECK_INTERVAL, DB_READ_YOUR_WRITES_TTL
+)
 
 # Connection pool configuration
 _connection_pool = None
+_replica_router = None
+_pool_lock = threading.Lock()
+
+# Pool each checked-out connection belongs to, keyed by id(connection)
+_connection_owners = {}
+
+# Limits concurrent DB worker threads to the pool size
+_db_limiter = None
 
 def initialize_connection_pool():
     """Initialize connection pool"""
-    global _connection_pool
-    try:
-        _connection_pool = pool.SimpleConnectionPool(
-            1,
-            20,
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            port=DB_PORT
-        )
-        print("[OK] Connection pool initialized successfully")
-    except Error as e:
-        print(f"[ERROR] Failed to initialize connection pool: {e}")
-        raise e
+    global _connection_pool, _replica_router
+    with _pool_lock:
+        if _connection_pool is not None and not _connection_pool.closed:
+            return
+        pool_kwargs = {
+            "timeout": DB_POOL_TIMEOUT,
+            "preping_after": DB_POOL_PREPING_AFTER,
+            "recycle_after": DB_POOL_RECYCLE,
+        }
+        try:
+            _connection_pool = ConnectionPool(
+                DB_POOL_MIN,
+                DB_POOL_MAX,
+                host=DB_HOST,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                database=DB_NAME,
+                port=DB_PORT,
+                **pool_kwargs
+            )
+            print("[OK] Connection pool initialized successfully")
+        except Error as e:
+            print(f"[ERROR] Failed to initialize connection pool: {e}")
+            raise e
+
+        if DB_REPLICA_DSNS:
+            _replica_router = ReplicaRouter(
+                DB_REPLICA_DSNS,
+                DB_POOL_MIN,
+                DB_POOL_MAX,
+                check_interval=DB_REPLICA_CHECK_INTERVAL,
+                sticky_ttl=DB_READ_YOUR_WRITES_TTL,
+                **pool_kwargs
+            )
+            _replica_router.start()
+            print(f"[OK] Read replica routing enabled for {len(DB_REPLICA_DSNS)} replica(s)")
 
-def get_db_connection():
-    """Get a database connection from the pool"""
-    global _connection_pool
+def get_db_connection(read_only: bool = False):
+    """Get a database connection from the pool.
+
+    Read-only callers are routed to a healthy replica that has replayed the
+    session's latest write, falling back to the primary otherwise.
+    """
     if _connection_pool is None:
         initialize_connection_pool()
+
+    if read_only and _replica_router:
+        for replica in _replica_router.candidates():
+            try:
+                connection = replica.pool.getconn()
+                _connection_owners[id(connection)] = replica.pool
+                return connection
+            except Error as e:
+                print(f"[ERROR] {replica.name} unavailable, falling back: {e}")
+                replica.mark_unhealthy(e)
+
     try:
         connection = _connection_pool.getconn()
+        _connection_owners[id(connection)] = _connection_pool
         return connection
     except Error as e:
         print(f"[ERROR] Database connection failed: {e}")
@@ -37,6 +89,47 @@ def get_db_connection():
 
 def close_db_connection(connection):
     """Return connection to the pool"""
-    global _connection_pool
-    if connection and _connection_pool:
-        _connection_pool.putconn(connection)
+    if connection:
+        owner = _connection_owners.pop(id(connection), _connection_pool)
+        if owner:
+            owner.putconn(connection)
+
+def record_write(connection):
+    """Remember the primary's WAL position after a commit so the session's reads see it"""
+    if _replica_router is None:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT pg_current_wal_lsn()::text")
+        _replica_router.record_write(parse_lsn(cursor.fetchone()[0]))
+        connection.commit()
+    finally:
+        cursor.close()
+
+def close_connection_pool():
+    """Drain and close all pooled connections"""
+    global _connection_pool, _replica_router
+    with _pool_lock:
+        if _replica_router:
+            _replica_router.stop(drain_timeout=DB_POOL_DRAIN_TIMEOUT)
+            _replica_router = None
+        if _connection_pool:
+            _connection_pool.closeall(timeout=DB_POOL_DRAIN_TIMEOUT)
+            _connection_pool = None
+            print("[OK] Connection pool closed")
+
+def get_pool_stats() -> dict:
+    """Live connection pool statistics"""
+    if _connection_pool is None:
+        return {"initialized": False}
+    stats = {"initialized": True, **_connection_pool.stats()}
+    if _replica_router:
+        stats["replicas"] = _replica_router.stats()
+    return stats
+
+async def run_db_call(func, *args, **kwargs):
+    """Run a blocking DB call in a worker thread without blocking the event loop"""
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = CapacityLimiter(DB_POOL_MAX)
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_db_limiter)
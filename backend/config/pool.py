@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import deque
+import psycopg2
+from psycopg2 import extensions, pool
+
+# Upper bounds (ms) of the acquisition wait-time histogram buckets
+WAIT_TIME_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class PoolTimeoutError(pool.PoolError):
+    """No connection became available within the acquisition timeout"""
+
+class _Waiter:
+    """A thread queued for a connection; putconn hands over a connection or a free slot"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.conn = None
+        self.last_used = None
+        self.pool_closed = False
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with a FIFO wait queue.
+
+    Connections are handed to waiting threads in arrival order. Connections
+    idle longer than ``preping_after`` seconds are checked with ``SELECT 1``
+    before reuse, and connections older than ``recycle_after`` seconds are
+    replaced, so connections dropped by a managed Postgres are never handed out.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float = 30.0,
+                 preping_after: float = 30.0, recycle_after: float = 1800.0, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Pool sizes must satisfy 0 <= minconn <= maxconn and maxconn >= 1")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.preping_after = preping_after
+        self.recycle_after = recycle_after
+        self._connect_kwargs = connect_kwargs
+
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._idle = deque()        # (conn, last_used)
+        self._in_use = {}           # id(conn) -> conn
+        self._created_at = {}       # id(conn) -> monotonic creation time
+        self._waiters = deque()
+        self._size = 0
+        self._closed = False
+
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_buckets = [0] * (len(WAIT_TIME_BUCKETS_MS) + 1)
+
+        for _ in range(minconn):
+            self._size += 1
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _release_slot(self):
+        """Give up a reserved slot, passing it to the next waiter if there is one"""
+        with self._lock:
+            if self._waiters and not self._closed:
+                self._waiters.popleft().event.set()
+            else:
+                self._size -= 1
+                self._drained.notify_all()
+
+    def _record_wait(self, seconds: float):
+        self._acquired += 1
+        self._wait_total += seconds
+        wait_ms = seconds * 1000
+        for i, bound in enumerate(WAIT_TIME_BUCKETS_MS):
+            if wait_ms <= bound:
+                self._wait_buckets[i] += 1
+                return
+        self._wait_buckets[-1] += 1
+
+    def _ensure_alive(self, conn, last_used: float):
+        """Return a usable connection, replacing it if it is closed, too old or fails pre-ping"""
+        now = time.monotonic()
+        stale = conn.closed or now - self._created_at.get(id(conn), now) > self.recycle_after
+
+        if not stale and now - last_used > self.preping_after:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+                conn.rollback()
+            except psycopg2.Error:
+                stale = True
+
+        if not stale:
+            return conn
+
+        self._discard(conn)
+        return self._connect()
+
+    def getconn(self, timeout: float = None):
+        """Check out a connection, waiting in line up to ``timeout`` seconds"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        conn = None
+        last_used = None
+        waiter = None
+
+        with self._lock:
+            if self._closed:
+                raise pool.PoolError("connection pool is closed")
+            if self._waiters:
+                waiter = _Waiter()
+            elif self._idle:
+                conn, last_used = self._idle.pop()
+            elif self._size < self.maxconn:
+                self._size += 1
+            else:
+                waiter = _Waiter()
+            if waiter:
+                self._waiters.append(waiter)
+
+        if waiter:
+            if not waiter.event.wait(timeout):
+                with self._lock:
+                    if not waiter.event.is_set():
+                        self._waiters.remove(waiter)
+                        self._timeouts += 1
+                        raise PoolTimeoutError(f"Timed out after {timeout}s waiting for a database connection")
+            if waiter.pool_closed:
+                raise pool.PoolError("connection pool is closed")
+            conn, last_used = waiter.conn, waiter.last_used
+
+        try:
+            conn = self._connect() if conn is None else self._ensure_alive(conn, last_used)
+        except psycopg2.Error:
+            self._release_slot()
+            raise
+
+        with self._lock:
+            self._record_wait(time.monotonic() - start)
+            self._in_use[id(conn)] = conn
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection; rolls back any open transaction before reuse"""
+        if not close and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        with self._lock:
+            if self._in_use.pop(id(conn), None) is None:
+                raise pool.PoolError("trying to put unkeyed connection")
+
+            discard = close or conn.closed or self._closed
+            if not discard and self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.conn, waiter.last_used = conn, time.monotonic()
+                waiter.event.set()
+            elif not discard:
+                self._idle.append((conn, time.monotonic()))
+            elif self._waiters and not self._closed:
+                # The waiter inherits the slot and opens a fresh connection
+                self._waiters.popleft().event.set()
+            else:
+                self._size -= 1
+            self._drained.notify_all()
+
+        if discard:
+            self._discard(conn)
+
+    def closeall(self, timeout: float = 10.0):
+        """Drain the pool: refuse new checkouts, wait for in-use connections, then close everything"""
+        with self._lock:
+            self._closed = True
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.pool_closed = True
+                waiter.event.set()
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+
+        for conn in idle:
+            self._discard(conn)
+
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._in_use and time.monotonic() < deadline:
+                self._drained.wait(deadline - time.monotonic())
+            leftover = list(self._in_use.values())
+            self._in_use.clear()
+            self._size -= len(leftover)
+
+        for conn in leftover:
+            self._discard(conn)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> dict:
+        """Live pool usage and acquisition wait-time histogram"""
+        with self._lock:
+            buckets = {f"le_{bound}ms": count for bound, count in zip(WAIT_TIME_BUCKETS_MS, self._wait_buckets)}
+            buckets["gt_{}ms".format(WAIT_TIME_BUCKETS_MS[-1])] = self._wait_buckets[-1]
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "waiters": len(self._waiters),
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "wait_time_ms": {
+                    "avg": (self._wait_total / self._acquired * 1000) if self._acquired else 0.0,
+                    "buckets": buckets,
+                },
+            }
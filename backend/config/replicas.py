@@ -0,0 +1,151 @@
+import contextvars
+import itertools
+import threading
+import time
+from collections import OrderedDict
+import psycopg2
+from config.pool import ConnectionPool
+
+# Session (e.g. "user:42") whose reads must observe its own writes
+_session_key = contextvars.ContextVar("db_session_key", default=None)
+# Highest WAL position written in the current request context
+_context_lsn = contextvars.ContextVar("db_context_lsn", default=0)
+
+def parse_lsn(lsn: str) -> int:
+    """Convert a pg_lsn such as '16/B374D848' into a comparable integer"""
+    if not lsn:
+        return 0
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+class SessionLSNStore:
+    """Bounded map of session key -> last written LSN, expiring after ``ttl`` seconds"""
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 300.0):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def record(self, session_key: str, lsn: int):
+        with self._lock:
+            previous = self._entries.pop(session_key, (0, 0))[0]
+            self._entries[session_key] = (max(previous, lsn), time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def get(self, session_key: str) -> int:
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is None:
+                return 0
+            if entry[1] < time.monotonic():
+                del self._entries[session_key]
+                return 0
+            return entry[0]
+
+class Replica:
+    """One read replica: its connection pool plus the latest health-check result"""
+
+    def __init__(self, name: str, dsn: str, pool: ConnectionPool):
+        self.name = name
+        self.dsn = dsn
+        self.pool = pool
+        self.healthy = True
+        self.replay_lsn = 0
+        self.last_error = None
+        self.last_checked = None
+
+    def mark_unhealthy(self, error: Exception):
+        self.healthy = False
+        self.last_error = str(error)
+
+class ReplicaRouter:
+    """Route read-only work to healthy replicas that have replayed the caller's writes"""
+
+    def __init__(self, dsns: list, minconn: int, maxconn: int, check_interval: float = 5.0,
+                 sticky_ttl: float = 300.0, **pool_kwargs):
+        self.check_interval = check_interval
+        self.sessions = SessionLSNStore(ttl=sticky_ttl)
+        self.replicas = []
+        for i, dsn in enumerate(dsns):
+            # Replicas start empty so an unreachable one cannot block startup
+            pool = ConnectionPool(0, maxconn, dsn=dsn, **pool_kwargs)
+            self.replicas.append(Replica(f"replica-{i + 1}", dsn, pool))
+        self._round_robin = itertools.count()
+        self._stop = threading.Event()
+        self._checker = None
+
+    def start(self):
+        self.check_all()
+        self._checker = threading.Thread(target=self._check_loop, name="replica-health", daemon=True)
+        self._checker.start()
+
+    def stop(self, drain_timeout: float = 10.0):
+        self._stop.set()
+        if self._checker:
+            self._checker.join(timeout=self.check_interval)
+        for replica in self.replicas:
+            replica.pool.closeall(timeout=drain_timeout)
+
+    def _check_loop(self):
+        while not self._stop.wait(self.check_interval):
+            self.check_all()
+
+    def check_all(self):
+        for replica in self.replicas:
+            self.check(replica)
+
+    def check(self, replica: Replica):
+        """Health check on a dedicated connection so a busy pool is not mistaken for a dead replica"""
+        try:
+            conn = psycopg2.connect(dsn=replica.dsn, connect_timeout=3)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn()::text")
+                in_recovery, replay_lsn = cursor.fetchone()
+            finally:
+                conn.close()
+            replica.replay_lsn = parse_lsn(replay_lsn) if in_recovery else 0
+            replica.healthy = True
+            replica.last_error = None
+        except psycopg2.Error as e:
+            replica.mark_unhealthy(e)
+        replica.last_checked = time.time()
+
+    def required_lsn(self) -> int:
+        session_key = _session_key.get()
+        session_lsn = self.sessions.get(session_key) if session_key else 0
+        return max(session_lsn, _context_lsn.get())
+
+    def record_write(self, lsn: int):
+        _context_lsn.set(max(_context_lsn.get(), lsn))
+        session_key = _session_key.get()
+        if session_key:
+            self.sessions.record(session_key, lsn)
+
+    def candidates(self) -> list:
+        """Healthy replicas that have replayed the caller's writes, in round-robin order"""
+        required = self.required_lsn()
+        eligible = [r for r in self.replicas if r.healthy and r.replay_lsn >= required]
+        if not eligible:
+            return []
+        start = next(self._round_robin) % len(eligible)
+        return eligible[start:] + eligible[:start]
+
+    def stats(self) -> list:
+        return [
+            {
+                "name": r.name,
+                "healthy": r.healthy,
+                "replay_lsn": r.replay_lsn,
+                "last_error": r.last_error,
+                "last_checked": r.last_checked,
+                "pool": r.pool.stats(),
+            }
+            for r in self.replicas
+        ]
+
+def set_db_session(session_key: str):
+    """Bind the current request to a session for read-your-writes routing"""
+    _session_key.set(session_key)
@@ -0,0 +1,53 @@
+import functools
+from config.database import run_db_call
+from config.settings import PRODUCT_SINGLEFLIGHT_ENABLED
+from db.product_cache import product_reads
+from db.product_db import CachedProductDB
+from db.order_db import OrderDB
+from db.user_db import UserDB
+from db.stats_db import CachedStatsDB
+from db.sales_db import SalesDB
+
+class AsyncDB:
+    """Awaitable view of a DB class: every method runs in a DB worker thread.
+
+    Methods listed in ``coalesce`` go through the ``flight`` SingleFlight:
+    concurrent calls with equal (hashable) arguments share one worker-thread
+    call, and the rest wait on the event loop rather than in a worker.
+    """
+
+    def __init__(self, db_class, flight=None, coalesce=()):
+        self._db_class = db_class
+        self._flight = flight
+        self._coalesce = frozenset(coalesce) if flight is not None else frozenset()
+
+    def __getattr__(self, name):
+        attr = getattr(self._db_class, name)
+        if not callable(attr):
+            return attr
+
+        if name in self._coalesce:
+            flight = self._flight
+
+            @functools.wraps(attr)
+            async def method(*args, **kwargs):
+                key = (name, args, tuple(sorted(kwargs.items())))
+                return await flight.do_async(key, functools.partial(attr, *args, **kwargs), run_db_call)
+        else:
+            @functools.wraps(attr)
+            async def method(*args, **kwargs):
+                return await run_db_call(attr, *args, **kwargs)
+
+        setattr(self, name, method)
+        return method
+
+# Reads that bursts of identical requests hit; writes and per-caller batches are never shared
+PRODUCT_COALESCED_READS = (
+    "get_product_by_id", "get_all_products", "get_products_after", "search_products", "search_products_after",
+)
+
+AsyncProductDB = AsyncDB(CachedProductDB, product_reads if PRODUCT_SINGLEFLIGHT_ENABLED else None, PRODUCT_COALESCED_READS)
+AsyncOrderDB = AsyncDB(OrderDB)
+AsyncUserDB = AsyncDB(UserDB)
+AsyncStatsDB = AsyncDB(CachedStatsDB)
+AsyncSalesDB = AsyncDB(SalesDB)
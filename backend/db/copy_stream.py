@@ -0,0 +1,39 @@
+from typing import Iterator
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def copy_field(value) -> str:
+    """One field in COPY text format"""
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
+
+def copy_line(values) -> str:
+    return "\t".join(copy_field(value) for value in values) + "\n"
+
+class CopyStream:
+    """File-like object that feeds COPY ... FROM STDIN from an iterator of formatted lines.
+
+    psycopg2 pulls ``read(size)`` chunks as it sends them, so the rows are never
+    held in memory as a whole.
+    """
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = iter(lines)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Literal, Optional
+from config.settings import COUNT_CACHE_TTL
+from db.prepared import PreparedQuery, execute_prepared
+
+# exact:    COUNT(*) OVER () in the page query itself, no extra round trip
+# estimate: planner statistics (pg_class.reltuples) for unfiltered tables
+# cached:   exact per-filter counts kept for COUNT_CACHE_TTL seconds, dropped on writes
+# none:     no total at all; callers report has_next instead
+CountStrategy = Literal["exact", "estimate", "cached", "none"]
+
+TABLE_ESTIMATE = PreparedQuery("table_row_estimate", "SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = %s::regclass")
+
+class CountCache:
+    """Per-filter row counts with a TTL, invalidated per table on writes"""
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, table: str, filter_key) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get((table, filter_key))
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return entry[0]
+
+    def set(self, table: str, filter_key, total: int):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[(table, filter_key)] = (total, time.monotonic() + self.ttl)
+
+    def invalidate(self, table: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == table]:
+                del self._entries[key]
+
+count_cache = CountCache(COUNT_CACHE_TTL)
+
+def pop_window_total(rows: list) -> Optional[int]:
+    """Strip the COUNT(*) OVER () column from a page; None when the page is empty"""
+    if not rows:
+        return None
+    total = rows[0]["total_count"]
+    for row in rows:
+        del row["total_count"]
+    return total
+
+def count_rows(cursor, strategy: CountStrategy, table: str, count_query: PreparedQuery,
+               params: tuple = (), filter_key=None, filtered: bool = False) -> Optional[int]:
+    """Total rows for a listing under ``strategy``; ``cursor`` must be a RealDictCursor"""
+    if strategy == "none":
+        return None
+
+    if strategy == "estimate" and not filtered:
+        execute_prepared(cursor, TABLE_ESTIMATE, (table,))
+        estimate = cursor.fetchone()["estimate"]
+        # -1 (or 0) means the table has never been analyzed
+        if estimate > 0:
+            return estimate
+
+    # Statistics cannot estimate a filtered count, so "estimate" falls back to the cache
+    if strategy in ("cached", "estimate"):
+        total = count_cache.get(table, filter_key)
+        if total is not None:
+            return total
+
+    execute_prepared(cursor, count_query, params)
+    total = cursor.fetchone()["total"]
+    if strategy != "exact":
+        count_cache.set(table, filter_key, total)
+    return total
@@ -0,0 +1,104 @@
+import csv
+import io
+import uuid
+from datetime import datetime
+from typing import Optional
+from config.database import get_db_connection, close_db_connection
+from config.settings import EXPORT_BATCH_SIZE
+from db.order_db import ORDER_COLUMNS
+from db.product_db import PRODUCT_COLUMNS
+
+EXPORT_FORMATS = ("ndjson", "csv")
+ORDER_FIELDS = ("id", "user_id", "total_amount", "status", "shipping_address", "created_at", "updated_at")
+ORDER_ITEM_FIELDS = ("item_product_id", "item_product_name", "item_quantity", "item_price")
+
+class ExportStream:
+    """One query streamed through a named (server-side) cursor, EXPORT_BATCH_SIZE rows per chunk.
+
+    Only one batch is in memory at a time, whatever the table size. NDJSON rows
+    are rendered by Postgres (row_to_json); CSV rows are written here. Methods
+    block, so callers run them in a DB worker thread.
+    """
+
+    def __init__(self, query: str, params: list, fmt: str, columns: tuple = ()):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.fmt = fmt
+        self.columns = columns
+        self.query = f"SELECT row_to_json(x)::text FROM ({query}) x" if fmt == "ndjson" else query
+        self.params = params
+        self.rows = 0
+        self._conn = None
+        self._cursor = None
+
+    def _open(self):
+        self._conn = get_db_connection(read_only=True)
+        self._cursor = self._conn.cursor(name=f"export_{uuid.uuid4().hex[:12]}")
+        self._cursor.itersize = EXPORT_BATCH_SIZE
+        self._cursor.execute(self.query, self.params)
+
+    def next_chunk(self) -> Optional[bytes]:
+        """Encoded next batch (the CSV header comes with the first), or None when done"""
+        header = self._cursor is None and self.fmt == "csv"
+        if self._cursor is None:
+            self._open()
+        rows = self._cursor.fetchmany(EXPORT_BATCH_SIZE)
+        if not rows and not header:
+            return None
+        self.rows += len(rows)
+
+        if self.fmt == "ndjson":
+            return "".join(f"{row[0]}\n" for row in rows).encode()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(self.columns)
+        writer.writerows(rows)
+        return buffer.getvalue().encode()
+
+    def close(self):
+        try:
+            if self._cursor is not None:
+                self._cursor.close()
+            if self._conn is not None:
+                self._conn.rollback()
+        finally:
+            close_db_connection(self._conn)
+            self._cursor = self._conn = None
+
+def _order_filters(created_from: Optional[datetime], created_to: Optional[datetime], statuses: Optional[list]) -> tuple:
+    clauses, params = [], []
+    if created_from is not None:
+        clauses.append("o.created_at >= %s")
+        params.append(created_from)
+    if created_to is not None:
+        clauses.append("o.created_at < %s")
+        params.append(created_to)
+    if statuses:
+        clauses.append("o.status = ANY(%s)")
+        params.append(list(statuses))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def export_orders(fmt: str, created_from: datetime = None, created_to: datetime = None,
+                  statuses: list = None, include_items: bool = False) -> ExportStream:
+    """Orders in id order; with include_items, NDJSON nests an items array and CSV has one row per line item"""
+    where, params = _order_filters(created_from, created_to, statuses)
+    order_columns = ", ".join(f"o.{field}" for field in ORDER_FIELDS)
+
+    if not include_items:
+        query = f"SELECT {order_columns} FROM orders o{where} ORDER BY o.id"
+        return ExportStream(query, params, fmt, ORDER_FIELDS)
+    if fmt == "ndjson":
+        return ExportStream(f"SELECT {ORDER_COLUMNS} FROM orders o{where} ORDER BY o.id", params, fmt)
+    query = (
+        f"SELECT {order_columns}, oi.product_id, p.name, oi.quantity, oi.price "
+        f"FROM orders o LEFT JOIN order_items oi ON oi.order_id = o.id LEFT JOIN products p ON p.id = oi.product_id"
+        f"{where} ORDER BY o.id, oi.id"
+    )
+    return ExportStream(query, params, fmt, ORDER_FIELDS + ORDER_ITEM_FIELDS)
+
+def export_products(fmt: str, category: str = None) -> ExportStream:
+    """Products in id order, optionally for one category"""
+    where, params = ("", []) if category is None else (" WHERE category = %s", [category])
+    query = f"SELECT {PRODUCT_COLUMNS} FROM products{where} ORDER BY id"
+    return ExportStream(query, params, fmt, tuple(PRODUCT_COLUMNS.split(", ")))
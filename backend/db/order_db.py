@@ -1,7 +1,46 @@
 import psycopg2
 import psycopg2.extras
 from typing import Optional, Tuple
-from config.database import get_db_connection, close_db_connection
+from config.database import get_db_connection, close_db_connection, record_write
+from db.prepared import PreparedQuery, execute_prepared
+from db.counts import CountStrategy, count_cache, count_rows, pop_window_total
+from db.product_cache import invalidate_product_changed
+from db.search_index import product_search_index
+from db.sales_db import apply_order_sales
+
+# Order row plus its line items, aggregated per order so a page of orders is one query
+ORDER_COLUMNS = """o.*, COALESCE((
+    SELECT json_agg(json_build_object(
+        'product_id', oi.product_id, 'product_name', p.name, 'quantity', oi.quantity, 'price', oi.price
+    ) ORDER BY oi.id)
+    FROM order_items oi LEFT JOIN products p ON p.id = oi.product_id
+    WHERE oi.order_id = o.id
+), '[]'::json) AS items"""
+
+ORDER_BY_ID = PreparedQuery("order_by_id", f"SELECT {ORDER_COLUMNS} FROM orders o WHERE o.id = %s")
+USER_ORDERS_PAGE = PreparedQuery("user_orders_page", f"SELECT {ORDER_COLUMNS} FROM orders o WHERE o.user_id = %s ORDER BY o.created_at DESC LIMIT %s OFFSET %s")
+USER_ORDERS_COUNT = PreparedQuery("user_orders_count", "SELECT COUNT(*) as total FROM orders WHERE user_id = %s")
+USER_ORDERS_PAGE_COUNTED = PreparedQuery("user_orders_page_counted", f"SELECT {ORDER_COLUMNS}, COUNT(*) OVER () AS total_count FROM orders o WHERE o.user_id = %s ORDER BY o.created_at DESC LIMIT %s OFFSET %s")
+ALL_ORDERS_PAGE_COUNTED = PreparedQuery("all_orders_page_counted", f"SELECT {ORDER_COLUMNS}, COUNT(*) OVER () AS total_count FROM orders o ORDER BY o.created_at DESC LIMIT %s OFFSET %s")
+ALL_ORDERS_PAGE = PreparedQuery("all_orders_page", f"SELECT {ORDER_COLUMNS} FROM orders o ORDER BY o.created_at DESC LIMIT %s OFFSET %s")
+USER_ORDERS_FIRST = PreparedQuery("user_orders_first", f"SELECT {ORDER_COLUMNS} FROM orders o WHERE o.user_id = %s ORDER BY o.created_at DESC, o.id DESC LIMIT %s")
+USER_ORDERS_AFTER = PreparedQuery("user_orders_after", f"SELECT {ORDER_COLUMNS} FROM orders o WHERE o.user_id = %s AND (o.created_at, o.id) < (%s, %s) ORDER BY o.created_at DESC, o.id DESC LIMIT %s")
+ALL_ORDERS_FIRST = PreparedQuery("all_orders_first", f"SELECT {ORDER_COLUMNS} FROM orders o ORDER BY o.created_at DESC, o.id DESC LIMIT %s")
+ALL_ORDERS_AFTER = PreparedQuery("all_orders_after", f"SELECT {ORDER_COLUMNS} FROM orders o WHERE (o.created_at, o.id) < (%s, %s) ORDER BY o.created_at DESC, o.id DESC LIMIT %s")
+ALL_ORDERS_COUNT = PreparedQuery("all_orders_count", "SELECT COUNT(*) as total FROM orders")
+
+class ProductNotFoundError(LookupError):
+    """An order line references a product that does not exist"""
+
+class InsufficientStockError(ValueError):
+    """An order line asks for more units than are in stock"""
+
+def _merge_order_lines(items: list) -> dict:
+    """product_id -> total quantity, combining repeated lines for the same product"""
+    quantities = {}
+    for product_id, quantity in items:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
 
 class OrderDB:
     @staticmethod
@@ -13,9 +52,95 @@ class OrderDB:
         try:
             query = "INSERT INTO orders (user_id, total_amount, status, shipping_address, created_at) VALUES (%s, %s, %s, %s, NOW()) RETURNING id"
             cursor.execute(query, (user_id, total_amount, status, shipping_address))
-            conn.commit()
             order_id = cursor.fetchone()[0]
+            apply_order_sales(cursor, order_id, 1)
+            conn.commit()
+            record_write(conn)
+            count_cache.invalidate("orders")
             return {"id": order_id, "user_id": user_id, "total_amount": total_amount, "status": status}
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+    @staticmethod
+    def place_order(user_id: int, items: list, shipping_address: str, status: str = "pending") -> dict:
+        """Reserve stock and create an order in one transaction.
+
+        items is a list of (product_id, quantity). Products are locked in id
+        order (so concurrent orders cannot deadlock), stock for every line is
+        decremented by one set-based UPDATE, and the total is computed from the
+        prices in the database. Line items are written with one multi-row
+        INSERT that records the unit price paid. Any failure rolls back the
+        whole order.
+        """
+        quantities = _merge_order_lines(items)
+        product_ids = sorted(quantities)
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            cursor.execute(
+                "SELECT id, name, price, stock, category FROM products WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+                (product_ids,)
+            )
+            products = {row["id"]: row for row in cursor.fetchall()}
+
+            for product_id in product_ids:
+                product = products.get(product_id)
+                if product is None:
+                    raise ProductNotFoundError(f"Product {product_id} not found")
+                if product["stock"] < quantities[product_id]:
+                    raise InsufficientStockError(f"Insufficient stock for product {product['name']}")
+
+            cursor.execute(
+                """
+                UPDATE products p SET stock = p.stock - r.quantity, updated_at = NOW()
+                FROM unnest(%s::int[], %s::int[]) AS r(product_id, quantity)
+                WHERE p.id = r.product_id AND p.stock >= r.quantity
+                RETURNING p.id, p.stock, p.updated_at
+                """,
+                (product_ids, [quantities[pid] for pid in product_ids])
+            )
+            remaining_stock = {row["id"]: (row["stock"], row["updated_at"]) for row in cursor.fetchall()}
+            if len(remaining_stock) != len(product_ids):
+                raise InsufficientStockError("Insufficient stock for one or more products")
+
+            total_amount = sum(products[pid]["price"] * quantities[pid] for pid in product_ids)
+
+            cursor.execute(
+                "INSERT INTO orders (user_id, total_amount, status, shipping_address, created_at) "
+                "VALUES (%s, %s, %s, %s, NOW()) RETURNING *",
+                (user_id, total_amount, status, shipping_address)
+            )
+            order = cursor.fetchone()
+
+            line_items = psycopg2.extras.execute_values(
+                cursor,
+                "INSERT INTO order_items (order_id, product_id, quantity, price, category) VALUES %s "
+                "RETURNING product_id, quantity, price",
+                [(order["id"], pid, quantities[pid], products[pid]["price"], products[pid]["category"] or "")
+                 for pid in product_ids],
+                fetch=True
+            )
+            order["items"] = [
+                {**item, "product_name": products[item["product_id"]]["name"]} for item in line_items
+            ]
+            # Last, so the shared daily summary rows stay locked for as short a time as possible
+            apply_order_sales(cursor, order["id"], 1)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        else:
+            record_write(conn)
+            count_cache.invalidate("orders")
+            for product_id, (stock, updated_at) in remaining_stock.items():
+                product_search_index.set_stock(product_id, stock, updated_at)
+                invalidate_product_changed(product_id)
+            return order
         finally:
             cursor.close()
             close_db_connection(conn)
@@ -27,53 +152,97 @@ class OrderDB:
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            query = "SELECT * FROM orders WHERE id = %s"
-            cursor.execute(query, (order_id,))
+            execute_prepared(cursor, ORDER_BY_ID, (order_id,))
             return cursor.fetchone()
         finally:
             cursor.close()
             close_db_connection(conn)
 
     @staticmethod
-    def get_user_orders(user_id: int, limit: int = 10, offset: int = 0) -> Tuple[list, int]:
-        """Get orders by user ID"""
-        conn = get_db_connection()
+    def get_user_orders(user_id: int, limit: int = 10, offset: int = 0,
+                        count_strategy: CountStrategy = "exact") -> Tuple[list, Optional[int]]:
+        """Get orders by user ID (total is None when count_strategy is "none")"""
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            query = "SELECT * FROM orders WHERE user_id = %s ORDER BY created_at DESC LIMIT %s OFFSET %s"
-            cursor.execute(query, (user_id, limit, offset))
-            orders = cursor.fetchall()
-
-            count_query = "SELECT COUNT(*) as total FROM orders WHERE user_id = %s"
-            cursor.execute(count_query, (user_id,))
-            total = cursor.fetchone()["total"]
+            if count_strategy == "exact":
+                execute_prepared(cursor, USER_ORDERS_PAGE_COUNTED, (user_id, limit, offset))
+                orders = cursor.fetchall()
+                total = pop_window_total(orders)
+                if total is not None:
+                    return orders, total
+            else:
+                execute_prepared(cursor, USER_ORDERS_PAGE, (user_id, limit, offset))
+                orders = cursor.fetchall()
 
+            total = count_rows(cursor, count_strategy, "orders", USER_ORDERS_COUNT, (user_id,),
+                               filter_key=("user", user_id), filtered=True)
             return orders, total
         finally:
             cursor.close()
             close_db_connection(conn)
 
     @staticmethod
-    def get_all_orders(limit: int = 10, offset: int = 0) -> Tuple[list, int]:
-        """Get all orders (admin)"""
-        conn = get_db_connection()
+    def get_user_orders_after(user_id: int, after: Optional[tuple] = None, limit: int = 10) -> Tuple[list, bool]:
+        """Get user's orders older than the (created_at, id) position (keyset pagination)"""
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            query = "SELECT * FROM orders ORDER BY created_at DESC LIMIT %s OFFSET %s"
-            cursor.execute(query, (limit, offset))
+            if after:
+                execute_prepared(cursor, USER_ORDERS_AFTER, (user_id, after[0], after[1], limit + 1))
+            else:
+                execute_prepared(cursor, USER_ORDERS_FIRST, (user_id, limit + 1))
+
             orders = cursor.fetchall()
+            return orders[:limit], len(orders) > limit
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+    @staticmethod
+    def get_all_orders(limit: int = 10, offset: int = 0,
+                       count_strategy: CountStrategy = "exact") -> Tuple[list, Optional[int]]:
+        """Get all orders (admin; total is None when count_strategy is "none")"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
-            count_query = "SELECT COUNT(*) as total FROM orders"
-            cursor.execute(count_query)
-            total = cursor.fetchone()["total"]
+        try:
+            if count_strategy == "exact":
+                execute_prepared(cursor, ALL_ORDERS_PAGE_COUNTED, (limit, offset))
+                orders = cursor.fetchall()
+                total = pop_window_total(orders)
+                if total is not None:
+                    return orders, total
+            else:
+                execute_prepared(cursor, ALL_ORDERS_PAGE, (limit, offset))
+                orders = cursor.fetchall()
 
+            total = count_rows(cursor, count_strategy, "orders", ALL_ORDERS_COUNT)
             return orders, total
         finally:
             cursor.close()
             close_db_connection(conn)
 
+    @staticmethod
+    def get_all_orders_after(after: Optional[tuple] = None, limit: int = 10) -> Tuple[list, bool]:
+        """Get all orders older than the (created_at, id) position (admin, keyset pagination)"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            if after:
+                execute_prepared(cursor, ALL_ORDERS_AFTER, (after[0], after[1], limit + 1))
+            else:
+                execute_prepared(cursor, ALL_ORDERS_FIRST, (limit + 1,))
+
+            orders = cursor.fetchall()
+            return orders[:limit], len(orders) > limit
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
     @staticmethod
     def update_order_status(order_id: int, status: str) -> Optional[dict]:
         """Update order status"""
@@ -85,15 +254,28 @@ class OrderDB:
             if status not in valid_statuses:
                 raise ValueError(f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
 
-            query = "UPDATE orders SET status = %s WHERE id = %s"
+            # Lock the order so concurrent status changes move its sales figures one at a time
+            cursor.execute("SELECT status FROM orders WHERE id = %s FOR UPDATE", (order_id,))
+            row = cursor.fetchone()
+            if row is not None and row[0] != status:
+                apply_order_sales(cursor, order_id, -1)
+            query = "UPDATE orders SET status = %s, updated_at = NOW() WHERE id = %s"
             cursor.execute(query, (status, order_id))
+            if row is not None and row[0] != status:
+                apply_order_sales(cursor, order_id, 1)
             conn.commit()
-
-            return OrderDB.get_order_by_id(order_id)
+            record_write(conn)
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             cursor.close()
             close_db_connection(conn)
 
+        # Re-read after the connection is back in the pool: holding it while checking out
+        # another could starve the pool when every worker thread does the same
+        return OrderDB.get_order_by_id(order_id)
+
     @staticmethod
     def delete_order(order_id: int) -> bool:
         """Delete order"""
@@ -101,10 +283,20 @@ class OrderDB:
         cursor = conn.cursor()
 
         try:
+            cursor.execute("SELECT id FROM orders WHERE id = %s FOR UPDATE", (order_id,))
+            if cursor.fetchone() is None:
+                conn.rollback()
+                return False
+            apply_order_sales(cursor, order_id, -1)
             query = "DELETE FROM orders WHERE id = %s"
             cursor.execute(query, (order_id,))
             conn.commit()
+            record_write(conn)
+            count_cache.invalidate("orders")
             return cursor.rowcount > 0
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             cursor.close()
             close_db_connection(conn)
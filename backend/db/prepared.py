@@ -0,0 +1,94 @@
+import re
+import threading
+import weakref
+from psycopg2 import errors, extensions
+from config.settings import DB_PREPARED_STATEMENTS
+
+# Names of the statements already prepared on each live connection. Replaced or
+# recycled connections drop out automatically and are re-prepared on first use.
+_prepared_on = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_stats = {"hits": 0, "prepares": 0, "reprepares": 0}
+
+class PreparedQuery:
+    """A fixed query that is PREPAREd once per connection and then run by name"""
+
+    def __init__(self, name: str, sql: str):
+        self.name = f"ps_{name}"
+        self.sql = sql
+        self.param_count = len(re.findall(r"%s", sql.replace("%%", "")))
+
+        # %s becomes $1, $2, ...; a literal %% (e.g. the pg_trgm operator) becomes %
+        counter = iter(range(1, self.param_count + 1))
+        positional_sql = re.sub(r"%[s%]", lambda m: f"${next(counter)}" if m.group() == "%s" else "%", sql)
+        self.prepare_sql = f"PREPARE {self.name} AS {positional_sql}"
+        placeholders = ", ".join(["%s"] * self.param_count)
+        self.execute_sql = f"EXECUTE {self.name} ({placeholders})" if self.param_count else f"EXECUTE {self.name}"
+
+def _count(key: str):
+    with _lock:
+        _stats[key] += 1
+
+def _in_transaction(conn) -> bool:
+    """Whether the caller has statements in an open transaction that a rollback would discard"""
+    return conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE
+
+def _prepare(cursor, query: PreparedQuery, names: set):
+    conn = cursor.connection
+    # Inside the caller's transaction a failed PREPARE may only undo itself, hence the savepoint
+    savepoint = _in_transaction(conn)
+    if savepoint:
+        cursor.execute("SAVEPOINT ps_prepare")
+    try:
+        cursor.execute(query.prepare_sql)
+    except errors.DuplicatePreparedStatement:
+        # Prepared by an earlier holder of this session that we lost track of
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT ps_prepare")
+        else:
+            conn.rollback()
+    else:
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT ps_prepare")
+    names.add(query.name)
+
+def execute_prepared(cursor, query: PreparedQuery, params: tuple = ()):
+    """Execute ``query`` through its per-connection prepared statement"""
+    if not DB_PREPARED_STATEMENTS:
+        cursor.execute(query.sql, params)
+        return
+
+    conn = cursor.connection
+    with _lock:
+        names = _prepared_on.setdefault(conn, set())
+
+    if query.name in names:
+        _count("hits")
+    else:
+        _prepare(cursor, query, names)
+        _count("prepares")
+
+    in_transaction = _in_transaction(conn)
+    try:
+        cursor.execute(query.execute_sql, params)
+    except errors.InvalidSqlStatementName:
+        if in_transaction:
+            # Recovering would need a rollback that discards the caller's earlier statements
+            names.clear()
+            raise
+        # The server session lost its statements (e.g. DISCARD ALL); prepare again and retry once
+        conn.rollback()
+        names.clear()
+        _prepare(cursor, query, names)
+        _count("reprepares")
+        cursor.execute(query.execute_sql, params)
+
+def get_prepared_stats() -> dict:
+    """Prepared statement cache hit rate across all connections"""
+    with _lock:
+        lookups = _stats["hits"] + _stats["prepares"]
+        return {
+            "enabled": DB_PREPARED_STATEMENTS,
+            **_stats,
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,49 @@
+from config.settings import PRODUCT_CACHE_MAX_ENTRIES, PRODUCT_CACHE_TTL, PRODUCT_CACHE_STALE_TTL
+from utils.cache import LRUCache
+from utils.singleflight import SingleFlight
+
+# Product detail entries are tagged ("product", id). Listing pages are tagged with
+# every product id they contain plus ("category", name) or ("listing", None) for
+# unfiltered pages, so each write drops only the entries it can change.
+product_cache = LRUCache(
+    "product",
+    max_entries=PRODUCT_CACHE_MAX_ENTRIES,
+    ttl=PRODUCT_CACHE_TTL,
+    stale_ttl=PRODUCT_CACHE_STALE_TTL
+)
+
+# Concurrent identical product reads share one DB call (see db/aio.py). Writes make
+# later readers start a fresh call rather than join one that may predate the write.
+product_reads = SingleFlight("product-reads")
+
+def listing_tags(category: str, products: list) -> list:
+    tags = [("product", product["id"]) for product in products]
+    tags.append(("category", category) if category else ("listing", None))
+    return tags
+
+def invalidate_product_changed(product_id: int, *categories):
+    """A product's fields changed; categories lists old/new category when it moved"""
+    product_cache.invalidate_tags(("product", product_id), *[("category", c) for c in categories if c])
+    product_reads.forget()
+
+def invalidate_product_membership(product_id: int, category: str):
+    """A product was created or deleted, changing page membership and totals"""
+    product_cache.invalidate_tags(("product", product_id), ("listing", None), ("category", category))
+    product_reads.forget()
+
+def warm_product_cache(pages: int, limit: int = 10):
+    """Load the first listing pages and their product details before traffic arrives"""
+    from db.product_db import CachedProductDB
+    from config.settings import COUNT_STRATEGY_PRODUCTS
+
+    warmed = 0
+    for page in range(pages):
+        products, _ = CachedProductDB.get_all_products(
+            limit=limit, offset=page * limit, count_strategy=COUNT_STRATEGY_PRODUCTS
+        )
+        for product in products:
+            product_cache.put(("product", product["id"]), product, tags=[("product", product["id"])])
+        warmed += len(products)
+        if len(products) < limit:
+            break
+    print(f"[OK] Product cache warmed with {warmed} products")
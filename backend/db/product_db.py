@@ -1,9 +1,61 @@
 import psycopg2
 import psycopg2.extras
 from typing import Optional, Tuple
-from config.database import get_db_connection, close_db_connection
+from config.database import get_db_connection, close_db_connection, record_write
+from db.prepared import PreparedQuery, execute_prepared
+from db.counts import CountStrategy, count_cache, count_rows, pop_window_total
+from db.search_index import product_search_index
+from db.product_cache import product_cache, listing_tags, invalidate_product_changed, invalidate_product_membership
+from config.settings import PRODUCT_SEARCH_BACKEND, PRODUCT_CACHE_ENABLED
 from utils.validators import validate_price, validate_stock
 
+# Explicit columns keep the search_vector column out of API rows
+PRODUCT_COLUMNS = "id, sku, name, description, price, stock, category, image_url, created_at, updated_at"
+UPDATED_PRODUCT_COLUMNS = ", ".join(f"products.{column}" for column in PRODUCT_COLUMNS.split(", "))
+
+PRODUCT_BY_ID = PreparedQuery("product_by_id", f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = %s")
+PRODUCTS_BY_IDS = PreparedQuery("products_by_ids", f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = ANY(%s)")
+PRODUCTS_PAGE = PreparedQuery("products_page", f"SELECT {PRODUCT_COLUMNS} FROM products LIMIT %s OFFSET %s")
+PRODUCTS_COUNT = PreparedQuery("products_count", "SELECT COUNT(*) as total FROM products")
+CATEGORY_PAGE = PreparedQuery("products_category_page", f"SELECT {PRODUCT_COLUMNS} FROM products WHERE category = %s LIMIT %s OFFSET %s")
+CATEGORY_COUNT = PreparedQuery("products_category_count", "SELECT COUNT(*) as total FROM products WHERE category = %s")
+PRODUCTS_PAGE_COUNTED = PreparedQuery("products_page_counted", f"SELECT {PRODUCT_COLUMNS}, COUNT(*) OVER () AS total_count FROM products LIMIT %s OFFSET %s")
+CATEGORY_PAGE_COUNTED = PreparedQuery("products_category_page_counted", f"SELECT {PRODUCT_COLUMNS}, COUNT(*) OVER () AS total_count FROM products WHERE category = %s LIMIT %s OFFSET %s")
+SEARCH_PAGE_COUNTED = PreparedQuery("products_search_page_counted", f"SELECT {PRODUCT_COLUMNS}, COUNT(*) OVER () AS total_count FROM products WHERE name ILIKE %s OR description ILIKE %s LIMIT %s OFFSET %s")
+SEARCH_PAGE = PreparedQuery("products_search_page", f"SELECT {PRODUCT_COLUMNS} FROM products WHERE name ILIKE %s OR description ILIKE %s LIMIT %s OFFSET %s")
+PRODUCTS_AFTER = PreparedQuery("products_after", f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id > %s ORDER BY id LIMIT %s")
+CATEGORY_AFTER = PreparedQuery("products_category_after", f"SELECT {PRODUCT_COLUMNS} FROM products WHERE category = %s AND id > %s ORDER BY id LIMIT %s")
+SEARCH_AFTER = PreparedQuery("products_search_after", f"SELECT {PRODUCT_COLUMNS} FROM products WHERE (name ILIKE %s OR description ILIKE %s) AND id > %s ORDER BY id LIMIT %s")
+SEARCH_COUNT = PreparedQuery("products_search_count", "SELECT COUNT(*) as total FROM products WHERE name ILIKE %s OR description ILIKE %s")
+
+# Full-text + trigram search: matches the tsvector (stemmed words), fuzzy name words
+# (pg_trgm word similarity) and raw substrings (ILIKE, served by the trigram indexes)
+FTS_MATCH = "p.search_vector @@ websearch_to_tsquery('english', %s) OR %s <%% p.name OR p.name ILIKE %s OR p.description ILIKE %s"
+FTS_RANK = "ts_rank(p.search_vector, websearch_to_tsquery('english', %s)) + word_similarity(%s, p.name)"
+FTS_SNIPPET = ("ts_headline('english', coalesce(p.description, p.name), websearch_to_tsquery('english', %s), "
+               "'MaxFragments=1, MaxWords=25, MinWords=8, StartSel=<mark>, StopSel=</mark>') AS snippet")
+P_COLUMNS = ", ".join(f"p.{column}" for column in PRODUCT_COLUMNS.split(", "))
+
+def _fts_page_sql(counted: bool) -> str:
+    """Rank and page the matches first, then build snippets only for the rows returned"""
+    total = ", COUNT(*) OVER () AS total_count" if counted else ""
+    outer_total = ", r.total_count" if counted else ""
+    return (
+        f"SELECT {P_COLUMNS}, r.rank{outer_total}, {FTS_SNIPPET} "
+        f"FROM (SELECT p.id, {FTS_RANK} AS rank{total} FROM products p WHERE {FTS_MATCH} "
+        f"ORDER BY rank DESC, p.id LIMIT %s OFFSET %s) r "
+        f"JOIN products p ON p.id = r.id ORDER BY r.rank DESC, p.id"
+    )
+
+def _fts_params(search_term: str, limit: int, offset: int) -> tuple:
+    pattern = f"%{search_term}%"
+    return (search_term, search_term, search_term, search_term, search_term, pattern, pattern, limit, offset)
+
+FTS_PAGE = PreparedQuery("products_fts_page", _fts_page_sql(counted=False))
+FTS_PAGE_COUNTED = PreparedQuery("products_fts_page_counted", _fts_page_sql(counted=True))
+FTS_COUNT = PreparedQuery("products_fts_count", f"SELECT COUNT(*) as total FROM products p WHERE {FTS_MATCH}")
+FTS_AFTER = PreparedQuery("products_fts_after", f"SELECT {P_COLUMNS} FROM products p WHERE ({FTS_MATCH}) AND p.id > %s ORDER BY p.id LIMIT %s")
+
 class ProductDB:
     @staticmethod
     def create_product(name: str, description: str = None, price: float = None, 
@@ -19,10 +71,17 @@ class ProductDB:
         cursor = conn.cursor()
 
         try:
-            query = "INSERT INTO products (name, description, price, stock, category, image_url, created_at) VALUES (%s, %s, %s, %s, %s, %s, NOW()) RETURNING id"
+            query = "INSERT INTO products (name, description, price, stock, category, image_url, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, NOW(), NOW()) RETURNING id, created_at, updated_at"
             cursor.execute(query, (name, description, price, stock, category, image_url))
             conn.commit()
-            product_id = cursor.fetchone()[0]
+            record_write(conn)
+            count_cache.invalidate("products")
+            product_id, created_at, updated_at = cursor.fetchone()
+            invalidate_product_membership(product_id, category)
+            product_search_index.upsert({
+                "id": product_id, "name": name, "description": description, "price": price, "stock": stock,
+                "category": category, "image_url": image_url, "created_at": created_at, "updated_at": updated_at
+            })
             return {"id": product_id, "name": name, "price": price, "stock": stock}
         finally:
             cursor.close()
@@ -31,42 +90,80 @@ class ProductDB:
     @staticmethod
     def get_product_by_id(product_id: int) -> Optional[dict]:
         """Get product by ID"""
-        conn = get_db_connection()
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            query = "SELECT * FROM products WHERE id = %s"
-            cursor.execute(query, (product_id,))
+            execute_prepared(cursor, PRODUCT_BY_ID, (product_id,))
             return cursor.fetchone()
         finally:
             cursor.close()
             close_db_connection(conn)
 
     @staticmethod
-    def get_all_products(limit: int = 10, offset: int = 0, category: str = None) -> Tuple[list, int]:
-        """Get all products with pagination"""
-        conn = get_db_connection()
+    def get_products_by_ids(product_ids: list) -> dict:
+        """Get several products in one query; returns {id: product} for the ids that exist"""
+        if not product_ids:
+            return {}
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
+            execute_prepared(cursor, PRODUCTS_BY_IDS, (list(product_ids),))
+            return {product["id"]: product for product in cursor.fetchall()}
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+    @staticmethod
+    def get_all_products(limit: int = 10, offset: int = 0, category: str = None,
+                         count_strategy: CountStrategy = "exact") -> Tuple[list, Optional[int]]:
+        """Get all products with pagination (total is None when count_strategy is "none")"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            if count_strategy == "exact":
+                if category:
+                    execute_prepared(cursor, CATEGORY_PAGE_COUNTED, (category, limit, offset))
+                else:
+                    execute_prepared(cursor, PRODUCTS_PAGE_COUNTED, (limit, offset))
+                products = cursor.fetchall()
+                total = pop_window_total(products)
+                if total is not None:
+                    return products, total
+            elif category:
+                execute_prepared(cursor, CATEGORY_PAGE, (category, limit, offset))
+                products = cursor.fetchall()
+            else:
+                execute_prepared(cursor, PRODUCTS_PAGE, (limit, offset))
+                products = cursor.fetchall()
+
             if category:
-                query = "SELECT * FROM products WHERE category = %s LIMIT %s OFFSET %s"
-                cursor.execute(query, (category, limit, offset))
+                total = count_rows(cursor, count_strategy, "products", CATEGORY_COUNT, (category,),
+                                   filter_key=("category", category), filtered=True)
             else:
-                query = "SELECT * FROM products LIMIT %s OFFSET %s"
-                cursor.execute(query, (limit, offset))
+                total = count_rows(cursor, count_strategy, "products", PRODUCTS_COUNT)
+            return products, total
+        finally:
+            cursor.close()
+            close_db_connection(conn)
 
-            products = cursor.fetchall()
+    @staticmethod
+    def get_products_after(after_id: Optional[int] = None, limit: int = 10, category: str = None) -> Tuple[list, bool]:
+        """Get the page of products following after_id (keyset pagination)"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
+        try:
+            # Fetch one extra row to learn whether another page exists
             if category:
-                count_query = "SELECT COUNT(*) as total FROM products WHERE category = %s"
-                cursor.execute(count_query, (category,))
+                execute_prepared(cursor, CATEGORY_AFTER, (category, after_id or 0, limit + 1))
             else:
-                count_query = "SELECT COUNT(*) as total FROM products"
-                cursor.execute(count_query)
+                execute_prepared(cursor, PRODUCTS_AFTER, (after_id or 0, limit + 1))
 
-            total = cursor.fetchone()["total"]
-            return products, total
+            products = cursor.fetchall()
+            return products[:limit], len(products) > limit
         finally:
             cursor.close()
             close_db_connection(conn)
@@ -74,24 +171,41 @@ class ProductDB:
     @staticmethod
     def update_product(product_id: int, **kwargs) -> Optional[dict]:
         """Update product"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        allowed_fields = ["name", "description", "price", "stock", "category", "image_url"]
+        updates = {k: v for k, v in kwargs.items() if k in allowed_fields and v is not None}
 
-        try:
-            allowed_fields = ["name", "description", "price", "stock", "category", "image_url"]
-            updates = {k: v for k, v in kwargs.items() if k in allowed_fields and v is not None}
+        if not updates:
+            return ProductDB.get_product_by_id(product_id)
 
-            if not updates:
-                return ProductDB.get_product_by_id(product_id)
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
-            set_clause = ", ".join([f"{k} = %s" for k in updates.keys()])
+        try:
+            # updated_at drives the ETag / Last-Modified validators of the product routes
+            set_clause = ", ".join([f"{k} = %s" for k in updates.keys()] + ["updated_at = NOW()"])
             values = list(updates.values()) + [product_id]
 
-            query = f"UPDATE products SET {set_clause} WHERE id = %s"
+            # Self-join exposes the pre-update row so a category move can be invalidated precisely;
+            # the updated row comes back too, so no second connection is needed to re-read it
+            query = (
+                f"UPDATE products SET {set_clause} FROM products old WHERE products.id = old.id AND products.id = %s "
+                f"RETURNING {UPDATED_PRODUCT_COLUMNS}, old.category AS old_category"
+            )
             cursor.execute(query, values)
+            row = cursor.fetchone()
             conn.commit()
+            record_write(conn)
+            count_cache.invalidate("products")
+            if row is None:
+                return None
 
-            return ProductDB.get_product_by_id(product_id)
+            old_category = row.pop("old_category")
+            if "category" in updates and updates["category"] != old_category:
+                invalidate_product_changed(product_id, old_category, updates["category"])
+            else:
+                invalidate_product_changed(product_id)
+            product_search_index.upsert(row)
+            return row
         finally:
             cursor.close()
             close_db_connection(conn)
@@ -103,35 +217,102 @@ class ProductDB:
         cursor = conn.cursor()
 
         try:
-            query = "DELETE FROM products WHERE id = %s"
+            query = "DELETE FROM products WHERE id = %s RETURNING category"
             cursor.execute(query, (product_id,))
             conn.commit()
-            return cursor.rowcount > 0
+            record_write(conn)
+            count_cache.invalidate("products")
+            product_search_index.remove(product_id)
+            row = cursor.fetchone()
+            if row:
+                invalidate_product_membership(product_id, row[0])
+            return row is not None
         finally:
             cursor.close()
             close_db_connection(conn)
 
     @staticmethod
-    def search_products(search_term: str, limit: int = 10, offset: int = 0) -> Tuple[list, int]:
-        """Search products"""
-        conn = get_db_connection()
+    def search_products(search_term: str, limit: int = 10, offset: int = 0,
+                        count_strategy: CountStrategy = "exact") -> Tuple[list, Optional[int]]:
+        """Search products with the configured backend (total is None when count_strategy is "none")"""
+        if PRODUCT_SEARCH_BACKEND == "memory" and product_search_index.ready:
+            products, total = product_search_index.search(search_term, limit, offset)
+            return products, (None if count_strategy == "none" else total)
+        if PRODUCT_SEARCH_BACKEND == "ilike":
+            return ProductDB.search_products_ilike(search_term, limit, offset, count_strategy)
+        return ProductDB.search_products_fulltext(search_term, limit, offset, count_strategy)
+
+    @staticmethod
+    def search_products_fulltext(search_term: str, limit: int = 10, offset: int = 0,
+                                 count_strategy: CountStrategy = "exact") -> Tuple[list, Optional[int]]:
+        """Ranked full-text/trigram search; rows carry rank and a highlighted snippet"""
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            search_term = f"%{search_term}%"
-            query = "SELECT * FROM products WHERE name ILIKE %s OR description ILIKE %s LIMIT %s OFFSET %s"
-            cursor.execute(query, (search_term, search_term, limit, offset))
-            products = cursor.fetchall()
+            params = _fts_params(search_term, limit, offset)
+            if count_strategy == "exact":
+                execute_prepared(cursor, FTS_PAGE_COUNTED, params)
+                products = cursor.fetchall()
+                total = pop_window_total(products)
+                if total is not None:
+                    return products, total
+            else:
+                execute_prepared(cursor, FTS_PAGE, params)
+                products = cursor.fetchall()
+
+            total = count_rows(cursor, count_strategy, "products", FTS_COUNT, params[3:7],
+                               filter_key=("search", search_term), filtered=True)
+            return products, total
+        finally:
+            cursor.close()
+            close_db_connection(conn)
 
-            count_query = "SELECT COUNT(*) as total FROM products WHERE name ILIKE %s OR description ILIKE %s"
-            cursor.execute(count_query, (search_term, search_term))
-            total = cursor.fetchone()["total"]
+    @staticmethod
+    def search_products_ilike(search_term: str, limit: int = 10, offset: int = 0,
+                              count_strategy: CountStrategy = "exact") -> Tuple[list, Optional[int]]:
+        """Substring search on name and description (total is None when count_strategy is "none")"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
+        try:
+            pattern = f"%{search_term}%"
+            if count_strategy == "exact":
+                execute_prepared(cursor, SEARCH_PAGE_COUNTED, (pattern, pattern, limit, offset))
+                products = cursor.fetchall()
+                total = pop_window_total(products)
+                if total is not None:
+                    return products, total
+            else:
+                execute_prepared(cursor, SEARCH_PAGE, (pattern, pattern, limit, offset))
+                products = cursor.fetchall()
+
+            total = count_rows(cursor, count_strategy, "products", SEARCH_COUNT, (pattern, pattern),
+                               filter_key=("search", search_term), filtered=True)
             return products, total
         finally:
             cursor.close()
             close_db_connection(conn)
 
+    @staticmethod
+    def search_products_after(search_term: str, after_id: Optional[int] = None, limit: int = 10) -> Tuple[list, bool]:
+        """Search products following after_id (keyset pagination, id order)"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            pattern = f"%{search_term}%"
+            if PRODUCT_SEARCH_BACKEND == "ilike":
+                execute_prepared(cursor, SEARCH_AFTER, (pattern, pattern, after_id or 0, limit + 1))
+            else:
+                params = (search_term, search_term, pattern, pattern, after_id or 0, limit + 1)
+                execute_prepared(cursor, FTS_AFTER, params)
+            products = cursor.fetchall()
+            return products[:limit], len(products) > limit
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
     @staticmethod
     def decrease_stock(product_id: int, quantity: int) -> bool:
         """Decrease product stock"""
@@ -139,10 +320,57 @@ class ProductDB:
         cursor = conn.cursor()
 
         try:
-            query = "UPDATE products SET stock = stock - %s WHERE id = %s AND stock >= %s"
+            query = "UPDATE products SET stock = stock - %s, updated_at = NOW() WHERE id = %s AND stock >= %s RETURNING stock, updated_at"
             cursor.execute(query, (quantity, product_id, quantity))
             conn.commit()
-            return cursor.rowcount > 0
+            record_write(conn)
+            row = cursor.fetchone()
+            if row:
+                product_search_index.set_stock(product_id, row[0], row[1])
+                invalidate_product_changed(product_id)
+            return row is not None
         finally:
             cursor.close()
             close_db_connection(conn)
+
+class CachedProductDB(ProductDB):
+    """ProductDB with read-through caching of product details and listing pages"""
+
+    @staticmethod
+    def get_product_by_id(product_id: int) -> Optional[dict]:
+        """Get product by ID (cached)"""
+        if not PRODUCT_CACHE_ENABLED:
+            return ProductDB.get_product_by_id(product_id)
+        return product_cache.get_or_load(
+            ("product", product_id),
+            lambda: ProductDB.get_product_by_id(product_id),
+            tags=[("product", product_id)]
+        )
+
+    @staticmethod
+    def get_products_by_ids(product_ids: list) -> dict:
+        """Get several products; cached details are reused and only the rest are queried"""
+        if not PRODUCT_CACHE_ENABLED:
+            return ProductDB.get_products_by_ids(product_ids)
+        found = {}
+        for product_id in product_ids:
+            product = product_cache.get(("product", product_id))
+            if product is not None:
+                found[product_id] = product
+        missing = [product_id for product_id in product_ids if product_id not in found]
+        if missing:
+            # Not written back: a batch read cannot tell whether a write invalidated it meanwhile
+            found.update(ProductDB.get_products_by_ids(missing))
+        return found
+
+    @staticmethod
+    def get_all_products(limit: int = 10, offset: int = 0, category: str = None,
+                         count_strategy: CountStrategy = "exact") -> Tuple[list, Optional[int]]:
+        """Get all products with pagination (cached per page, limit, category and count strategy)"""
+        if not PRODUCT_CACHE_ENABLED:
+            return ProductDB.get_all_products(limit, offset, category, count_strategy)
+        return product_cache.get_or_load(
+            ("products", limit, offset, category, count_strategy),
+            lambda: ProductDB.get_all_products(limit, offset, category, count_strategy),
+            tags=lambda page: listing_tags(category, page[0])
+        )
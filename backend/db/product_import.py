@@ -0,0 +1,181 @@
+import csv
+import json
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import Iterable
+from config.database import get_db_connection, close_db_connection, record_write
+from config.settings import PRODUCT_IMPORT_MAX_ERRORS
+from db.counts import count_cache
+from db.copy_stream import CopyStream, copy_line
+from db.product_cache import product_cache, product_reads
+from db.search_index import product_search_index
+from utils.validators import validate_price, validate_stock
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_COLUMNS = ("sku", "name", "description", "price", "stock", "category", "image_url")
+REQUIRED_COLUMNS = ("sku", "name", "price", "stock")
+
+# Column limits from SCHEMA.sql, checked up front so one bad row cannot abort the COPY
+MAX_LENGTHS = {"sku": 100, "name": 255, "category": 100, "image_url": 500}
+MAX_PRICE = Decimal("99999999.99")   # DECIMAL(10, 2)
+MAX_STOCK = 2 ** 31 - 1              # INT
+
+def validate_import_row(raw: dict) -> tuple:
+    """Normalize one feed row; returns (row, errors)"""
+    row = {}
+    errors = []
+    for column in IMPORT_COLUMNS:
+        value = raw.get(column)
+        if isinstance(value, str):
+            value = value.strip() or None
+        row[column] = value
+
+    for column in REQUIRED_COLUMNS:
+        if row[column] is None:
+            errors.append(f"{column} is required")
+    for column, max_length in MAX_LENGTHS.items():
+        if row[column] is not None and len(str(row[column])) > max_length:
+            errors.append(f"{column} is longer than {max_length} characters")
+
+    if row["price"] is not None:
+        if not validate_price(row["price"]):
+            errors.append("Price must be a positive number")
+        else:
+            try:
+                row["price"] = Decimal(str(row["price"])).quantize(Decimal("0.01"))
+                if row["price"] > MAX_PRICE:
+                    errors.append(f"Price must be at most {MAX_PRICE}")
+            except InvalidOperation:
+                errors.append("Price must be a positive number")
+
+    if row["stock"] is not None:
+        if not validate_stock(row["stock"]) or int(row["stock"]) != float(row["stock"]):
+            errors.append("Stock must be a non-negative integer")
+        elif int(row["stock"]) > MAX_STOCK:
+            errors.append(f"Stock must be at most {MAX_STOCK}")
+        else:
+            row["stock"] = int(row["stock"])
+
+    return row, errors
+
+def _read_csv(lines: Iterable[str]):
+    reader = csv.DictReader(lines)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+    for raw in reader:
+        yield reader.line_num, raw, []
+
+def _read_ndjson(lines: Iterable[str]):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except ValueError as e:
+            yield line_number, {}, [f"Invalid JSON: {e}"]
+            continue
+        if not isinstance(raw, dict):
+            yield line_number, {}, ["Expected a JSON object"]
+            continue
+        yield line_number, raw, []
+
+class ProductImport:
+    """One bulk upsert: validate a CSV/NDJSON feed, COPY it into an unlogged
+    staging table, then merge into products with a single INSERT ... ON CONFLICT (sku)
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self.received = 0
+        self.rejected = 0
+        self.errors = []
+
+    def _reject(self, line: int, errors: list):
+        self.rejected += 1
+        if len(self.errors) < PRODUCT_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def _copy_lines(self, lines: Iterable[str]):
+        rows = _read_csv(lines) if self.fmt == "csv" else _read_ndjson(lines)
+        for line, raw, errors in rows:
+            self.received += 1
+            if not errors:
+                row, errors = validate_import_row(raw)
+            if errors:
+                self._reject(line, errors)
+                continue
+            yield copy_line([line] + [row[c] for c in IMPORT_COLUMNS])
+
+    def run(self, lines: Iterable[str]) -> dict:
+        start = time.perf_counter()
+        staging = f"product_import_{uuid.uuid4().hex[:12]}"
+        columns = ", ".join(IMPORT_COLUMNS)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                f"CREATE UNLOGGED TABLE {staging} ("
+                "line INT, sku VARCHAR(100), name VARCHAR(255), description TEXT, price DECIMAL(10, 2), "
+                "stock INT, category VARCHAR(100), image_url VARCHAR(500))"
+            )
+            cursor.copy_expert(f"COPY {staging} (line, {columns}) FROM STDIN", CopyStream(self._copy_lines(lines)))
+
+            # The last row wins when a SKU repeats; ON CONFLICT cannot touch a row twice
+            cursor.execute(
+                f"""
+                WITH merged AS (
+                    INSERT INTO products ({columns}, created_at, updated_at)
+                    SELECT DISTINCT ON (sku) {columns}, NOW(), NOW()
+                    FROM {staging} ORDER BY sku, line DESC
+                    ON CONFLICT (sku) DO UPDATE SET
+                        name = EXCLUDED.name, description = EXCLUDED.description, price = EXCLUDED.price,
+                        stock = EXCLUDED.stock, category = EXCLUDED.category, image_url = EXCLUDED.image_url,
+                        updated_at = NOW()
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM merged
+                """
+            )
+            inserted, updated = cursor.fetchone()
+            cursor.execute(f"DROP TABLE {staging}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        else:
+            record_write(conn)
+            count_cache.invalidate("products")
+            product_cache.clear()
+            product_reads.forget()
+            try:
+                # Refresh planner statistics for the new row count and value distribution
+                cursor.execute("ANALYZE products")
+                conn.commit()
+            except Exception as e:
+                print(f"[ERROR] ANALYZE after product import failed: {e}")
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+        if product_search_index.ready:
+            product_search_index.rebuild()
+
+        return {
+            "received": self.received,
+            "imported": self.received - self.rejected,
+            "inserted": inserted,
+            "updated": updated,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+def import_products(lines: Iterable[str], fmt: str) -> dict:
+    """Bulk upsert products from CSV or NDJSON text lines"""
+    return ProductImport(fmt).run(lines)
@@ -0,0 +1,170 @@
+import time
+import psycopg2
+import psycopg2.extras
+from datetime import date
+from config.database import get_db_connection, close_db_connection
+from db.prepared import PreparedQuery, execute_prepared
+
+# Daily summaries kept in step with orders by apply_order_sales(), so sales reports read
+# (days in range x products) rows instead of grouping the whole order history.
+# Product and category rows leave out cancelled orders; status rows count every order.
+# Category is the one recorded on the order line at purchase ('' for none), so removing
+# a contribution hits the same row that adding it did; lines written before
+# order_items.category existed fall back to the product's current category.
+
+_APPLY_STATUS = """
+    INSERT INTO sales_daily_status (day, status, orders, revenue)
+    SELECT created_at::date, status, %(sign)s, %(sign)s * total_amount
+    FROM orders WHERE id = %(order_id)s AND created_at IS NOT NULL
+    ON CONFLICT (day, status) DO UPDATE SET
+        orders = sales_daily_status.orders + EXCLUDED.orders,
+        revenue = sales_daily_status.revenue + EXCLUDED.revenue
+"""
+
+_APPLY_PRODUCT = """
+    INSERT INTO sales_daily_product (day, product_id, units, revenue, orders)
+    SELECT o.created_at::date, oi.product_id, %(sign)s * SUM(oi.quantity), %(sign)s * SUM(oi.quantity * oi.price), %(sign)s
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.id = %(order_id)s AND o.status <> 'cancelled' AND o.created_at IS NOT NULL
+    GROUP BY 1, 2 ORDER BY 2
+    ON CONFLICT (day, product_id) DO UPDATE SET
+        units = sales_daily_product.units + EXCLUDED.units,
+        revenue = sales_daily_product.revenue + EXCLUDED.revenue,
+        orders = sales_daily_product.orders + EXCLUDED.orders
+"""
+
+_APPLY_CATEGORY = """
+    INSERT INTO sales_daily_category (day, category, units, revenue, orders)
+    SELECT o.created_at::date, COALESCE(oi.category, p.category, ''), %(sign)s * SUM(oi.quantity), %(sign)s * SUM(oi.quantity * oi.price), %(sign)s
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id LEFT JOIN products p ON p.id = oi.product_id
+    WHERE o.id = %(order_id)s AND o.status <> 'cancelled' AND o.created_at IS NOT NULL
+    GROUP BY 1, 2 ORDER BY 2
+    ON CONFLICT (day, category) DO UPDATE SET
+        units = sales_daily_category.units + EXCLUDED.units,
+        revenue = sales_daily_category.revenue + EXCLUDED.revenue,
+        orders = sales_daily_category.orders + EXCLUDED.orders
+"""
+
+REBUILD_SQL = (
+    "TRUNCATE sales_daily_status, sales_daily_product, sales_daily_category",
+    """
+    INSERT INTO sales_daily_status (day, status, orders, revenue)
+    SELECT created_at::date, status, COUNT(*), SUM(total_amount)
+    FROM orders WHERE created_at IS NOT NULL GROUP BY 1, 2
+    """,
+    """
+    INSERT INTO sales_daily_product (day, product_id, units, revenue, orders)
+    SELECT o.created_at::date, oi.product_id, SUM(oi.quantity), SUM(oi.quantity * oi.price), COUNT(DISTINCT o.id)
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.status <> 'cancelled' AND o.created_at IS NOT NULL GROUP BY 1, 2
+    """,
+    """
+    INSERT INTO sales_daily_category (day, category, units, revenue, orders)
+    SELECT o.created_at::date, COALESCE(oi.category, p.category, ''), SUM(oi.quantity), SUM(oi.quantity * oi.price), COUNT(DISTINCT o.id)
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id LEFT JOIN products p ON p.id = oi.product_id
+    WHERE o.status <> 'cancelled' AND o.created_at IS NOT NULL GROUP BY 1, 2
+    """,
+    "ANALYZE sales_daily_status, sales_daily_product, sales_daily_category",
+)
+
+SALES_DAILY = PreparedQuery("sales_daily", """
+    SELECT day, SUM(orders) AS orders, COALESCE(SUM(revenue) FILTER (WHERE status <> 'cancelled'), 0) AS revenue,
+           json_object_agg(status, orders) AS orders_by_status
+    FROM sales_daily_status WHERE day BETWEEN %s AND %s GROUP BY day HAVING SUM(orders) > 0 ORDER BY day
+""")
+SALES_PRODUCTS = {
+    sort: PreparedQuery(f"sales_products_by_{sort}", f"""
+        SELECT s.product_id, p.name, p.sku, p.category, s.units, s.revenue, s.orders
+        FROM (
+            SELECT product_id, SUM(units) AS units, SUM(revenue) AS revenue, SUM(orders) AS orders
+            FROM sales_daily_product WHERE day BETWEEN %s AND %s
+            GROUP BY product_id HAVING SUM(units) > 0 ORDER BY {sort} DESC, product_id LIMIT %s
+        ) s LEFT JOIN products p ON p.id = s.product_id
+        ORDER BY s.{sort} DESC, s.product_id
+    """)
+    for sort in ("revenue", "units")
+}
+SALES_CATEGORIES = PreparedQuery("sales_categories", """
+    SELECT NULLIF(category, '') AS category, SUM(units) AS units, SUM(revenue) AS revenue, SUM(orders) AS orders
+    FROM sales_daily_category WHERE day BETWEEN %s AND %s
+    GROUP BY category HAVING SUM(units) > 0 ORDER BY revenue DESC, category
+""")
+
+def apply_order_sales(cursor, order_id: int, sign: int):
+    """Add (sign=1) or remove (sign=-1) an order's contribution to the daily summaries.
+
+    Runs inside the caller's transaction, with the order row already locked, and
+    reads the order as it stands: remove before changing or deleting an order,
+    add after creating or changing it.
+    """
+    params = {"order_id": order_id, "sign": sign}
+    cursor.execute(_APPLY_STATUS, params)
+    cursor.execute(_APPLY_PRODUCT, params)
+    cursor.execute(_APPLY_CATEGORY, params)
+
+def rebuild_sales_summaries(cursor):
+    """Recompute every summary row from orders (the caller commits)"""
+    for statement in REBUILD_SQL:
+        cursor.execute(statement)
+
+class SalesDB:
+    @staticmethod
+    def get_daily_sales(date_from: date, date_to: date) -> list:
+        """Orders and revenue per day (cancelled orders excluded from revenue), with a per-status breakdown"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            execute_prepared(cursor, SALES_DAILY, (date_from, date_to))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+    @staticmethod
+    def get_top_products(date_from: date, date_to: date, limit: int = 20, sort: str = "revenue") -> list:
+        """Best sellers over a date range by revenue or units"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            execute_prepared(cursor, SALES_PRODUCTS[sort], (date_from, date_to, limit))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+    @staticmethod
+    def get_category_sales(date_from: date, date_to: date) -> list:
+        """Units, revenue and orders per category over a date range"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            execute_prepared(cursor, SALES_CATEGORIES, (date_from, date_to))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+    @staticmethod
+    def rebuild_summaries() -> dict:
+        """Recompute the summaries from scratch in one transaction; writers wait on it briefly"""
+        start = time.perf_counter()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            rebuild_sales_summaries(cursor)
+            conn.commit()
+            counts = {}
+            for table in ("sales_daily_status", "sales_daily_product", "sales_daily_category"):
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = cursor.fetchone()[0]
+            return {"rows": counts, "seconds": round(time.perf_counter() - start, 3)}
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            close_db_connection(conn)
@@ -0,0 +1,292 @@
+import math
+import re
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left
+import psycopg2.extras
+from config.database import get_db_connection, close_db_connection
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or the to with".split())
+
+# BM25 parameters and per-field term weights
+BM25_K1 = 1.2
+BM25_B = 0.75
+FIELD_WEIGHTS = {"name": 2, "category": 1, "description": 1}
+
+# Prefix expansions considered for the last (still being typed) query token
+MAX_PREFIX_EXPANSIONS = 32
+
+def tokenize(text: str) -> list:
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+def _document_terms(product: dict) -> dict:
+    """Weighted term frequencies for one product"""
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(product.get(field)):
+            terms[token] = terms.get(token, 0) + weight
+    return terms
+
+class InvertedIndex:
+    """Token -> sorted posting list of product ids (int arrays) with BM25 scoring.
+
+    copy() gives a writable snapshot that shares posting arrays with the
+    original; add/remove copy a shared array before changing it, so the
+    original stays intact for searches still running on it.
+    """
+
+    def __init__(self):
+        self.postings = {}      # term -> array('i') of product ids, ascending
+        self.frequencies = {}   # term -> array('H') of term frequencies, parallel to postings
+        self.vocabulary = []    # sorted terms, for prefix lookups
+        self.doc_terms = {}     # product id -> {term: tf}, needed to remove a document
+        self.doc_lengths = {}
+        self.total_length = 0
+        self.products = {}      # product id -> row returned to callers
+        self._owned = None      # terms whose arrays this copy may change in place (None: all)
+
+    def __len__(self):
+        return len(self.products)
+
+    def copy(self) -> "InvertedIndex":
+        clone = InvertedIndex()
+        clone.postings = dict(self.postings)
+        clone.frequencies = dict(self.frequencies)
+        clone.vocabulary = list(self.vocabulary)
+        clone.doc_terms = dict(self.doc_terms)
+        clone.doc_lengths = dict(self.doc_lengths)
+        clone.total_length = self.total_length
+        clone.products = dict(self.products)
+        clone._owned = set()
+        return clone
+
+    def _writable(self, term: str) -> tuple:
+        """(ids, frequencies) arrays for term that are safe to change in place"""
+        if self._owned is not None and term not in self._owned:
+            self.postings[term] = array("i", self.postings[term])
+            self.frequencies[term] = array("H", self.frequencies[term])
+            self._owned.add(term)
+        return self.postings[term], self.frequencies[term]
+
+    def add(self, product: dict):
+        product_id = product["id"]
+        if product_id in self.products:
+            self.remove(product_id)
+
+        terms = _document_terms(product)
+        for term, tf in terms.items():
+            if term in self.postings:
+                ids, frequencies = self._writable(term)
+            else:
+                ids = self.postings[term] = array("i")
+                frequencies = self.frequencies[term] = array("H")
+                self.vocabulary.insert(bisect_left(self.vocabulary, term), term)
+                if self._owned is not None:
+                    self._owned.add(term)
+            position = bisect_left(ids, product_id)
+            ids.insert(position, product_id)
+            frequencies.insert(position, min(tf, 65535))
+
+        length = sum(terms.values())
+        self.doc_terms[product_id] = terms
+        self.doc_lengths[product_id] = length
+        self.total_length += length
+        self.products[product_id] = dict(product)
+
+    def remove(self, product_id: int) -> bool:
+        terms = self.doc_terms.pop(product_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            ids, frequencies = self._writable(term)
+            position = bisect_left(ids, product_id)
+            del ids[position]
+            del frequencies[position]
+            if not ids:
+                del self.postings[term]
+                del self.frequencies[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+        self.total_length -= self.doc_lengths.pop(product_id)
+        del self.products[product_id]
+        return True
+
+    def _expand(self, token: str, prefix: bool) -> list:
+        if not prefix:
+            return [token] if token in self.postings else []
+        start = bisect_left(self.vocabulary, token)
+        expansions = []
+        for term in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            expansions.append(term)
+        return expansions
+
+    def search(self, query: str, limit: int, offset: int = 0) -> tuple:
+        """Products matching every query token (the last one as a prefix), best BM25 score first"""
+        tokens = tokenize(query)
+        if not tokens or not self.products:
+            return [], 0
+
+        doc_count = len(self.products)
+        avg_length = self.total_length / doc_count
+        scores = None
+
+        for i, token in enumerate(tokens):
+            token_scores = {}
+            for term in self._expand(token, prefix=(i == len(tokens) - 1)):
+                ids = self.postings[term]
+                idf = math.log(1 + (doc_count - len(ids) + 0.5) / (len(ids) + 0.5))
+                for product_id, tf in zip(ids, self.frequencies[term]):
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[product_id] / avg_length)
+                    score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    if score > token_scores.get(product_id, 0.0):
+                        token_scores[product_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {pid: s + token_scores[pid] for pid, s in scores.items() if pid in token_scores}
+            if not scores:
+                return [], 0
+
+        top = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        results = []
+        for product_id, score in top[offset:]:
+            row = dict(self.products[product_id])
+            row["rank"] = score
+            results.append(row)
+        return results, len(scores)
+
+class ProductSearchIndex:
+    """The live index plus double-buffered rebuilds and incremental write hooks.
+
+    The published index is never changed in place while searches may be
+    using it: writes apply to a copy (see InvertedIndex.copy) that then
+    replaces it, so searches take the current reference and score without
+    any lock. Rebuilds load into a fresh InvertedIndex while queries keep
+    using the old one; writes that land mid-rebuild are replayed on the new
+    index before it is swapped in, so queries never see a half-built index.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.RLock()
+        self._pending = None
+        self._stop = threading.Event()
+        self._refresher = None
+        self.last_built = None
+        self.last_build_seconds = None
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    def rebuild(self):
+        start = time.perf_counter()
+        with self._lock:
+            self._pending = []
+
+        fresh = InvertedIndex()
+        try:
+            for product in _load_products():
+                fresh.add(product)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for apply in self._pending:
+                apply(fresh)
+            self._pending = None
+            self._index = fresh
+
+        self.last_built = time.time()
+        self.last_build_seconds = time.perf_counter() - start
+        print(f"[OK] Product search index built: {len(fresh)} products in {self.last_build_seconds:.2f}s")
+
+    def start(self, refresh_interval: float):
+        """Build now and rebuild every refresh_interval seconds to pick up writes from other workers"""
+        self.rebuild()
+        if refresh_interval > 0:
+            self._stop.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, args=(refresh_interval,),
+                                               name="search-index-refresh", daemon=True)
+            self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"[ERROR] Product search index rebuild failed: {e}")
+
+    def _apply(self, change, copy: bool = True):
+        """Run change(index) on the live index (on a copy that replaces it, unless copy=False) and queue
+        it for a rebuild in progress; the lock only orders writers"""
+        with self._lock:
+            if self._index is not None:
+                index = self._index.copy() if copy else self._index
+                change(index)
+                self._index = index
+            if self._pending is not None:
+                self._pending.append(change)
+
+    def upsert(self, product: dict):
+        if product:
+            self._apply(lambda index: index.add(product))
+
+    def remove(self, product_id: int):
+        self._apply(lambda index: index.remove(product_id))
+
+    def set_stock(self, product_id: int, stock: int, updated_at=None):
+        # Runs on every order line, so no index copy: swapping in a new row is a single dict store,
+        # and a search sees either the old row or the new one
+        def change(index):
+            product = index.products.get(product_id)
+            if product is not None:
+                product = {**product, "stock": stock}
+                if updated_at is not None:
+                    product["updated_at"] = updated_at
+                index.products[product_id] = product
+        self._apply(change, copy=False)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> tuple:
+        # No lock: the published index is never modified, only replaced
+        return self._index.search(query, limit, offset)
+
+    def stats(self) -> dict:
+        with self._lock:
+            index = self._index
+            return {
+                "ready": index is not None,
+                "products": len(index) if index else 0,
+                "terms": len(index.postings) if index else 0,
+                "last_built": self.last_built,
+                "last_build_seconds": self.last_build_seconds,
+            }
+
+def _load_products():
+    """Stream every product through a server-side cursor"""
+    from db.product_db import PRODUCT_COLUMNS
+
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor(name="search_index_load", cursor_factory=psycopg2.extras.RealDictCursor)
+    cursor.itersize = 5000
+    try:
+        cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products")
+        for row in cursor:
+            yield dict(row)
+        conn.commit()
+    finally:
+        cursor.close()
+        close_db_connection(conn)
+
+product_search_index = ProductSearchIndex()
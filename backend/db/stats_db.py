@@ -0,0 +1,55 @@
+import psycopg2
+import psycopg2.extras
+from config.database import get_db_connection, close_db_connection
+from config.settings import ADMIN_STATS_TTL, ADMIN_LOW_STOCK_THRESHOLD, ADMIN_LOW_STOCK_LIMIT
+from db.prepared import PreparedQuery, execute_prepared
+from utils.cache import LRUCache
+
+# Every dashboard figure in one round trip; orders are scanned once, grouped by status.
+# Revenue leaves out cancelled orders.
+ADMIN_STATS = PreparedQuery("admin_stats", """
+    WITH by_status AS (
+        SELECT status, COUNT(*) AS orders, COALESCE(SUM(total_amount), 0) AS revenue FROM orders GROUP BY status
+    ), low_stock AS (
+        SELECT id, sku, name, stock FROM products WHERE stock <= %s ORDER BY stock, id LIMIT %s
+    )
+    SELECT
+        (SELECT COUNT(*) FROM products) AS total_products,
+        (SELECT COUNT(*) FROM users) AS total_users,
+        (SELECT COALESCE(SUM(orders), 0) FROM by_status) AS total_orders,
+        (SELECT COALESCE(SUM(revenue), 0) FROM by_status WHERE status <> 'cancelled') AS revenue,
+        (SELECT COALESCE(json_object_agg(status, json_build_object('orders', orders, 'revenue', revenue)), '{}'::json)
+         FROM by_status) AS orders_by_status,
+        (SELECT COUNT(*) FROM products WHERE stock <= %s) AS low_stock_count,
+        (SELECT COALESCE(json_agg(l ORDER BY l.stock, l.id), '[]'::json) FROM low_stock l) AS low_stock_products,
+        NOW() AS generated_at
+""")
+
+stats_cache = LRUCache("admin-stats", max_entries=16, ttl=ADMIN_STATS_TTL)
+
+class StatsDB:
+    @staticmethod
+    def get_admin_stats(low_stock_threshold: int = ADMIN_LOW_STOCK_THRESHOLD,
+                        low_stock_limit: int = ADMIN_LOW_STOCK_LIMIT) -> dict:
+        """Counts, revenue, orders by status and low-stock products for the admin dashboard"""
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        try:
+            execute_prepared(cursor, ADMIN_STATS, (low_stock_threshold, low_stock_limit, low_stock_threshold))
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+            close_db_connection(conn)
+
+class CachedStatsDB(StatsDB):
+    """StatsDB with the dashboard figures kept for ADMIN_STATS_TTL seconds"""
+
+    @staticmethod
+    def get_admin_stats(low_stock_threshold: int = ADMIN_LOW_STOCK_THRESHOLD,
+                        low_stock_limit: int = ADMIN_LOW_STOCK_LIMIT) -> dict:
+        """Admin dashboard figures (cached)"""
+        return stats_cache.get_or_load(
+            ("admin", low_stock_threshold, low_stock_limit),
+            lambda: StatsDB.get_admin_stats(low_stock_threshold, low_stock_limit)
+        )
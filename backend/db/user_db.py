@@ -1,36 +1,39 @@
 import psycopg2
 import psycopg2.extras
 from typing import Optional, Tuple
-from config.database import get_db_connection, close_db_connection
-from utils.validators import validate_user_email, validate_password
-import bcrypt
+from config.database import get_db_connection, close_db_connection, record_write
+from db.prepared import PreparedQuery, execute_prepared
+from utils.validators import check_new_user
+from utils.passwords import hash_password_sync, check_password_sync
+
+USER_BY_EMAIL = PreparedQuery("user_by_email", "SELECT * FROM users WHERE email = %s")
 
 class UserDB:
     @staticmethod
-    def create_user(name: str, email: str, password: str, phone: str = None, role: str = "user") -> dict:
-        """Create a new user"""
-        if not validate_user_email(email):
-            raise ValueError("Invalid email format")
-        
-        if not validate_password(password):
-            raise ValueError("Password must be at least 6 characters")
-
-        # Check if email exists
-        if UserDB.get_user_by_email(email):
-            raise ValueError("Email already registered")
+    def create_user(name: str, email: str, password: str, phone: str = None, role: str = "user",
+                    password_hash: str = None) -> dict:
+        """Create a new user (pass password_hash when it was computed by the password hasher pool)"""
+        check_new_user(email, password)
 
         # Hash password
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed_password = password_hash or hash_password_sync(password)
 
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            query = "INSERT INTO users (name, email, password, phone, role, created_at) VALUES (%s, %s, %s, %s, %s, NOW()) RETURNING id"
-            cursor.execute(query, (name, email, hashed_password.decode('utf-8'), phone, role))
+            # One round trip: the unique email index rejects duplicates, no SELECT beforehand
+            cursor.execute(
+                "INSERT INTO users (name, email, password, phone, role, created_at) VALUES (%s, %s, %s, %s, %s, NOW()) "
+                "ON CONFLICT (email) DO NOTHING RETURNING id, name, email, phone, role, created_at",
+                (name, email, hashed_password, phone, role)
+            )
+            user = cursor.fetchone()
             conn.commit()
-            user_id = cursor.fetchone()[0]
-            return {"id": user_id, "name": name, "email": email, "phone": phone, "role": role}
+            if user is None:
+                raise ValueError("Email already registered")
+            record_write(conn)
+            return user
         finally:
             cursor.close()
             close_db_connection(conn)
@@ -42,8 +45,7 @@ class UserDB:
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            query = "SELECT * FROM users WHERE email = %s"
-            cursor.execute(query, (email,))
+            execute_prepared(cursor, USER_BY_EMAIL, (email,))
             return cursor.fetchone()
         finally:
             cursor.close()
@@ -86,20 +88,23 @@ class UserDB:
     @staticmethod
     def update_user(user_id: int, name: str = None, phone: str = None) -> Optional[dict]:
         """Update user profile"""
+        updates = {field: value for field, value in (("name", name), ("phone", phone)) if value}
+        if not updates:
+            return UserDB.get_user_by_id(user_id)
+
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
         try:
-            if name:
-                query = "UPDATE users SET name = %s WHERE id = %s"
-                cursor.execute(query, (name, user_id))
-            
-            if phone:
-                query = "UPDATE users SET phone = %s WHERE id = %s"
-                cursor.execute(query, (phone, user_id))
-
+            # RETURNING hands back the updated profile without checking out a second connection
+            set_clause = ", ".join(f"{field} = %s" for field in updates)
+            query = f"UPDATE users SET {set_clause} WHERE id = %s RETURNING id, name, email, phone, role, created_at"
+            cursor.execute(query, (*updates.values(), user_id))
+            user = cursor.fetchone()
             conn.commit()
-            return UserDB.get_user_by_id(user_id)
+
+            record_write(conn)
+            return user
         finally:
             cursor.close()
             close_db_connection(conn)
@@ -107,4 +112,4 @@ class UserDB:
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
         """Verify password"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+        return check_password_sync(password, hashed_password)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+"""Generate a synthetic dataset at production scale and load it with COPY
+
+    python generate_data.py --scale 10k --truncate
+    python generate_data.py --scale 1m --workers 8 --truncate
+    python generate_data.py --orders 250000 --users 40000 --products 5000
+
+Users, products, orders and order_items are generated deterministically from
+--seed, so the same arguments give the same dataset whatever --workers is.
+Popularity is skewed (a few products and customers account for most order
+lines), order volume grows towards the present and follows a daily curve, and
+order status depends on order age. Every generated user's password is
+"password123"; the first generated user is an admin.
+
+Secondary indexes and foreign keys on the four tables are dropped before
+loading and rebuilt in parallel afterwards, followed by ANALYZE and a
+rebuild of the daily sales summaries.
+"""
+
+import argparse
+import bisect
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+import bcrypt
+import psycopg2
+from config.settings import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+from db.copy_stream import CopyStream, copy_line
+from db.sales_db import rebuild_sales_summaries
+
+SCALE_TIERS = {
+    "10k": {"orders": 10_000, "users": 2_000, "products": 1_000},
+    "1m": {"orders": 1_000_000, "users": 100_000, "products": 20_000},
+    "10m": {"orders": 10_000_000, "users": 1_000_000, "products": 100_000},
+}
+TABLES = ("users", "products", "orders", "order_items")
+CHUNK_SIZE = 50_000
+PASSWORD = "password123"
+
+# Skew: index = floor(n * u ** exponent). Higher exponents concentrate more of
+# the traffic on the first (most popular) items.
+PRODUCT_POPULARITY_EXPONENT = 3.0
+USER_ACTIVITY_EXPONENT = 1.5
+
+# Relative order volume per hour of day (UTC)
+HOURLY_WEIGHTS = [2, 1, 1, 1, 1, 2, 3, 5, 7, 8, 9, 9, 10, 10, 9, 9, 9, 10, 12, 14, 14, 12, 8, 4]
+HOURLY_CUMULATIVE = [sum(HOURLY_WEIGHTS[:i + 1]) for i in range(24)]
+
+CATEGORIES = {
+    "Electronics": (["Wireless", "Portable", "Smart", "Compact", "Pro", "Ultra"],
+                    ["Headphones", "Speaker", "Charger", "Keyboard", "Mouse", "Monitor", "Webcam", "Power Bank"], 45.0),
+    "Clothing": (["Cotton", "Classic", "Slim", "Outdoor", "Wool", "Summer"],
+                 ["T-Shirt", "Jeans", "Jacket", "Sneakers", "Hoodie", "Socks", "Dress", "Cap"], 30.0),
+    "Books": (["Practical", "Modern", "Essential", "Complete", "Illustrated", "Pocket"],
+              ["Python Guide", "Cookbook", "Novel", "Atlas", "Handbook", "Biography", "Workbook"], 20.0),
+    "Home": (["LED", "Ceramic", "Bamboo", "Minimal", "Vintage", "Foldable"],
+             ["Desk Lamp", "Wall Clock", "Cushion Set", "Door Mat", "Storage Box", "Vase", "Shelf"], 25.0),
+    "Sports": (["Lightweight", "Adjustable", "Pro", "Training", "Trail", "Indoor"],
+               ["Yoga Mat", "Dumbbells", "Water Bottle", "Backpack", "Tennis Racket", "Jump Rope"], 35.0),
+}
+CATEGORY_NAMES = list(CATEGORIES)
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "Aarav", "Priya", "Wei", "Mei", "Carlos", "Sofia", "Ahmed", "Fatima", "Yuki", "Olga"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Sharma", "Patel",
+              "Wang", "Li", "Kim", "Nguyen", "Silva", "Khan", "Tanaka", "Ivanova", "Martin", "Lopez"]
+STREETS = ["Main Street", "Oak Avenue", "Pine Road", "Elm Street", "Maple Drive", "Cedar Lane", "Park Avenue"]
+CITIES = ["New York, NY 10001", "Los Angeles, CA 90028", "Chicago, IL 60601", "Houston, TX 77001",
+          "Seattle, WA 98101", "Austin, TX 73301", "Boston, MA 02108", "Denver, CO 80202"]
+
+def connect():
+    return psycopg2.connect(host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD,
+                            port=DB_PORT, connect_timeout=15)
+
+def scatter(rank: int, n: int, stride: int) -> int:
+    """Map a popularity rank onto an id offset, so popular rows are spread across the table"""
+    return (rank * stride) % n
+
+def coprime_stride(n: int, start: int = 1_000_003) -> int:
+    stride = start
+    while math.gcd(stride, n) != 1:
+        stride += 2
+    return stride
+
+def skewed_index(rng: random.Random, n: int, exponent: float) -> int:
+    return min(n - 1, int(n * rng.random() ** exponent))
+
+def money(cents: int) -> str:
+    return f"{cents // 100}.{cents % 100:02d}"
+
+# ---------------------------------------------------------------------------
+# Row generators
+# ---------------------------------------------------------------------------
+
+def product_rows(seed: int, first_id: int, count: int, now: datetime):
+    """(copy lines, price in cents per product) for products first_id .. first_id + count - 1"""
+    rng = random.Random(f"{seed}:products")
+    lines = []
+    prices = []
+    for i in range(count):
+        product_id = first_id + i
+        category = CATEGORY_NAMES[i % len(CATEGORY_NAMES)]
+        adjectives, nouns, median_price = CATEGORIES[category]
+        name = f"{rng.choice(adjectives)} {rng.choice(nouns)} {product_id}"
+        cents = max(99, int(rng.lognormvariate(math.log(median_price), 0.6) * 100))
+        prices.append(cents)
+        created_at = now - timedelta(days=rng.uniform(30, 1500))
+        lines.append(copy_line((
+            product_id, f"GEN-{product_id}", name,
+            f"{name} in the {category.lower()} range. Generated catalogue item for load testing.",
+            money(cents), rng.randint(0, 1000), category,
+            f"https://via.placeholder.com/300?text={name.replace(' ', '+')}", created_at, created_at,
+        )))
+    return lines, prices
+
+def user_lines(seed: int, chunk: int, first_id: int, count: int, admin_id: int, password_hash: str,
+               now: datetime, span_days: int):
+    rng = random.Random(f"{seed}:users:{chunk}")
+    for i in range(count):
+        user_id = first_id + i
+        created_at = now - timedelta(days=rng.uniform(0, span_days + 365))
+        yield copy_line((
+            user_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"user{user_id}@example.com",
+            password_hash, f"{rng.randint(2_000_000_000, 9_999_999_999)}",
+            "admin" if user_id == admin_id else "user", created_at, created_at,
+        ))
+
+def order_time(rng: random.Random, now: datetime, span_days: int) -> datetime:
+    # sqrt(u) has density 2x on [0, 1]: volume grows linearly towards the present
+    age_days = span_days * (1 - math.sqrt(rng.random()))
+    day = (now - timedelta(days=age_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    hour = bisect.bisect_right(HOURLY_CUMULATIVE, rng.random() * HOURLY_CUMULATIVE[-1])
+    return min(now, day + timedelta(hours=min(hour, 23), seconds=rng.randrange(3600)))
+
+def order_status(rng: random.Random, age: timedelta) -> str:
+    if rng.random() < 0.04:
+        return "cancelled"
+    if age < timedelta(days=1):
+        return rng.choice(("pending", "pending", "processing"))
+    if age < timedelta(days=4):
+        return rng.choice(("processing", "shipped"))
+    if age < timedelta(days=8):
+        return rng.choice(("shipped", "delivered"))
+    return "delivered"
+
+# Worker state, set once per process by _init_order_worker
+_worker = {}
+
+def _init_order_worker(config: dict):
+    _worker.update(config)
+    _worker["user_stride"] = coprime_stride(config["users"])
+    _worker["product_stride"] = coprime_stride(config["products"])
+
+def order_chunk_lines(chunk: int, first_order_id: int, count: int) -> tuple:
+    """Copy lines for one chunk of orders and their items"""
+    w = _worker
+    rng = random.Random(f"{w['seed']}:orders:{chunk}")
+    now = w["now"]
+    order_lines = []
+    item_lines = []
+    for i in range(count):
+        order_id = first_order_id + i
+        user_id = w["first_user_id"] + scatter(
+            skewed_index(rng, w["users"], USER_ACTIVITY_EXPONENT), w["users"], w["user_stride"])
+        created_at = order_time(rng, now, w["span_days"])
+
+        lines = 1
+        while lines < 8 and rng.random() < 0.45:
+            lines += 1
+        products = set()
+        for _ in range(lines):
+            products.add(scatter(skewed_index(rng, w["products"], PRODUCT_POPULARITY_EXPONENT),
+                                 w["products"], w["product_stride"]))
+
+        total = 0
+        for offset in sorted(products):
+            quantity = 1 + (rng.random() < 0.2) + (rng.random() < 0.05)
+            cents = w["prices"][offset]
+            total += cents * quantity
+            category = CATEGORY_NAMES[offset % len(CATEGORY_NAMES)]  # as product_rows assigns it
+            item_lines.append(copy_line((order_id, w["first_product_id"] + offset, quantity, money(cents),
+                                         category, created_at)))
+
+        status = order_status(rng, now - created_at)
+        address = f"{rng.randint(1, 9999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+        updated_at = created_at if status == "pending" else created_at + timedelta(hours=rng.uniform(1, 96))
+        order_lines.append(copy_line((order_id, user_id, money(total), status, address, created_at, min(updated_at, now))))
+    return order_lines, item_lines
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+USER_COLUMNS = "id, name, email, password, phone, role, created_at, updated_at"
+PRODUCT_COLUMNS = "id, sku, name, description, price, stock, category, image_url, created_at, updated_at"
+ORDER_COLUMNS = "id, user_id, total_amount, status, shipping_address, created_at, updated_at"
+ORDER_ITEM_COLUMNS = "order_id, product_id, quantity, price, category, created_at"
+
+def _fast_session(cursor):
+    # Losing the last few commits on a crash is fine for generated data
+    cursor.execute("SET synchronous_commit = off")
+
+def _copy(table: str, columns: str, lines) -> int:
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        _fast_session(cursor)
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", CopyStream(lines))
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+        conn.close()
+
+def _load_user_chunk(args: tuple) -> int:
+    return _copy("users", USER_COLUMNS, user_lines(*args))
+
+def _load_order_chunk(args: tuple) -> int:
+    order_lines, item_lines = order_chunk_lines(*args)
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        _fast_session(cursor)
+        cursor.copy_expert(f"COPY orders ({ORDER_COLUMNS}) FROM STDIN", CopyStream(order_lines))
+        cursor.copy_expert(f"COPY order_items ({ORDER_ITEM_COLUMNS}) FROM STDIN", CopyStream(item_lines))
+        conn.commit()
+        return len(item_lines)
+    finally:
+        cursor.close()
+        conn.close()
+
+def _run_sql(statement: str) -> str:
+    conn = connect()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET maintenance_work_mem = '512MB'")
+        cursor.execute(statement)
+        return statement
+    finally:
+        cursor.close()
+        conn.close()
+
+def drop_secondary_indexes(cursor) -> tuple:
+    """Drop foreign keys and non-constraint indexes on the loaded tables; returns the SQL to recreate them"""
+    cursor.execute(
+        """
+        SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid)
+        FROM pg_constraint c
+        WHERE c.contype = 'f' AND c.conrelid::regclass::text = ANY(%s)
+        """,
+        (list(TABLES),)
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid::regclass::text = ANY(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        """,
+        (list(TABLES),)
+    )
+    indexes = cursor.fetchall()
+
+    for table, name, _ in foreign_keys:
+        cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+
+    return ([definition for _, definition in indexes],
+            [f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}' for table, name, definition in foreign_keys])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALE_TIERS, default="10k", help="dataset size tier (by order count)")
+    parser.add_argument("--orders", type=int, help="override the tier's order count")
+    parser.add_argument("--users", type=int, help="override the tier's user count")
+    parser.add_argument("--products", type=int, help="override the tier's product count")
+    parser.add_argument("--days", type=int, default=730, help="order history length in days")
+    parser.add_argument("--workers", type=int, default=4, help="parallel loader processes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="empty the four tables first")
+    args = parser.parse_args()
+
+    tier = SCALE_TIERS[args.scale]
+    orders = args.orders or tier["orders"]
+    users = args.users or tier["users"]
+    products = args.products or tier["products"]
+    now = datetime.utcnow().replace(microsecond=0)
+    start = time.perf_counter()
+
+    conn = connect()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        if args.truncate:
+            print("[INFO] Truncating users, products, orders and order_items...")
+            cursor.execute("TRUNCATE TABLE order_items, orders, products, users RESTART IDENTITY CASCADE")
+
+        first_ids = {}
+        for table in ("users", "products", "orders"):
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+            first_ids[table] = cursor.fetchone()[0]
+
+        print("[INFO] Dropping secondary indexes and foreign keys for the load...")
+        index_sql, foreign_key_sql = drop_secondary_indexes(cursor)
+
+        password_hash = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        product_lines, prices = product_rows(args.seed, first_ids["products"], products, now)
+        config = {
+            "seed": args.seed, "now": now, "span_days": args.days, "prices": prices,
+            "users": users, "first_user_id": first_ids["users"],
+            "products": products, "first_product_id": first_ids["products"],
+        }
+
+        restored = set()   # index / foreign key statements that have been re-run successfully
+        try:
+            with Pool(args.workers, initializer=_init_order_worker, initargs=(config,)) as pool:
+                print(f"[INFO] Loading {products} products and {users} users...")
+                _copy("products", PRODUCT_COLUMNS, product_lines)
+                user_chunks = [
+                    (args.seed, n, first_ids["users"] + offset, min(CHUNK_SIZE, users - offset),
+                     first_ids["users"], password_hash, now, args.days)
+                    for n, offset in enumerate(range(0, users, CHUNK_SIZE))
+                ]
+                for _ in pool.imap_unordered(_load_user_chunk, user_chunks):
+                    pass
+
+                print(f"[INFO] Loading {orders} orders with {args.workers} workers...")
+                order_chunks = [
+                    (n, first_ids["orders"] + offset, min(CHUNK_SIZE, orders - offset))
+                    for n, offset in enumerate(range(0, orders, CHUNK_SIZE))
+                ]
+                loaded = items = 0
+                for chunk_items in pool.imap_unordered(_load_order_chunk, order_chunks):
+                    loaded += 1
+                    items += chunk_items
+                    print(f"       {min(loaded * CHUNK_SIZE, orders)}/{orders} orders, {items} items "
+                          f"({time.perf_counter() - start:.0f}s)")
+
+                print(f"[INFO] Rebuilding {len(index_sql)} indexes and {len(foreign_key_sql)} foreign keys...")
+                for statement in pool.imap_unordered(_run_sql, index_sql):
+                    restored.add(statement)
+                    print(f"       {statement.split(' ON ')[0]}")
+                for statement in foreign_key_sql:
+                    restored.add(_run_sql(statement))
+        finally:
+            pending = [statement for statement in index_sql + foreign_key_sql if statement not in restored]
+            if pending:
+                print(f"[ERROR] Load failed; restoring {len(pending)} dropped indexes and foreign keys")
+                # Only what the rebuild phase had not finished, and each on its own, so one failure
+                # does not leave the rest missing
+                for statement in pending:
+                    try:
+                        # An index a worker finished just before the failure may exist already
+                        _run_sql(statement.replace(" INDEX ", " INDEX IF NOT EXISTS ", 1))
+                    except psycopg2.Error as e:
+                        print(f"[ERROR] Could not restore: {statement}\n        {e}")
+
+        for table in ("users", "products", "orders"):
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+        print("[INFO] Analyzing tables...")
+        cursor.execute(f"ANALYZE {', '.join(TABLES)}")
+        print("[INFO] Rebuilding daily sales summaries...")
+        rebuild_sales_summaries(cursor)
+
+        print(f"[OK] Loaded {users} users, {products} products, {orders} orders and {items} order items "
+              f"in {time.perf_counter() - start:.0f}s")
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
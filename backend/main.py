@@ -1,15 +1,29 @@
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from config.settings import FRONTEND_URL, HOST, PORT, NODE_ENV
-from config.database import initialize_connection_pool
+from config.settings import (
+    FRONTEND_URL, HOST, PORT, NODE_ENV, PRODUCT_SEARCH_BACKEND, SEARCH_INDEX_REFRESH_SECONDS,
+    PRODUCT_CACHE_ENABLED, PRODUCT_CACHE_WARM_PAGES, COMPRESSION_ENABLED
+)
+from config.database import initialize_connection_pool, close_connection_pool, get_pool_stats, run_db_call
+from db.prepared import get_prepared_stats
+from db.search_index import product_search_index
+from db.product_cache import product_cache, product_reads, warm_product_cache
+from db.stats_db import stats_cache
+from utils.passwords import password_hasher
+from utils.token_cache import token_cache
+from utils.email_domains import email_domain_checker
+from middleware.compression import CompressionMiddleware
 
 # Import routes
-from routes import auth, products, orders
+from routes import auth, products, orders, admin
 
 app = FastAPI(
     title="E-Commerce API",
     description="Modern E-Commerce API with FastAPI",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS Middleware
@@ -21,6 +35,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression (gzip, plus brotli/zstd when installed) for large non-streaming responses
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # Initialize database connection pool on startup
 @app.on_event("startup")
 async def startup_event():
@@ -28,6 +46,26 @@ async def startup_event():
     initialize_connection_pool()
     print("[OK] Database connection pool initialized")
 
+    if PRODUCT_SEARCH_BACKEND == "memory":
+        try:
+            await run_db_call(product_search_index.start, SEARCH_INDEX_REFRESH_SECONDS)
+        except Exception as e:
+            # Searches fall back to Postgres until a rebuild succeeds
+            print(f"[ERROR] Product search index build failed: {e}")
+
+    if PRODUCT_CACHE_ENABLED and PRODUCT_CACHE_WARM_PAGES > 0:
+        try:
+            await run_db_call(warm_product_cache, PRODUCT_CACHE_WARM_PAGES)
+        except Exception as e:
+            print(f"[ERROR] Product cache warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close database connections on app shutdown"""
+    product_search_index.stop()
+    # Draining waits up to DB_POOL_DRAIN_TIMEOUT for checked-out connections; keep the loop free meanwhile
+    await to_thread.run_sync(close_connection_pool)
+
 # Health check route
 @app.get("/api/health")
 async def health_check():
@@ -36,10 +74,38 @@ async def health_check():
         "environment": NODE_ENV
     }
 
+# Connection pool statistics
+@app.get("/api/health/db")
+async def db_pool_health():
+    return {
+        **get_pool_stats(),
+        "prepared_statements": get_prepared_stats(),
+        "search_index": product_search_index.stats(),
+    }
+
+# Cache statistics
+@app.get("/api/health/cache")
+async def cache_health():
+    return {
+        "product_cache": product_cache.stats(),
+        "product_reads": product_reads.stats(),
+        "admin_stats_cache": stats_cache.stats(),
+    }
+
+# Authentication statistics
+@app.get("/api/health/auth")
+async def auth_health():
+    return {
+        "password_hasher": password_hasher.stats(),
+        "token_cache": token_cache.stats(),
+        "email_domain_cache": email_domain_checker.stats(),
+    }
+
 # Include routes
 app.include_router(auth.router, prefix="/api")
 app.include_router(products.router, prefix="/api")
 app.include_router(orders.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 # 404 handler
 @app.get("/api")
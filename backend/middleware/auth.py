@@ -1,13 +1,14 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer
-from utils.helpers import verify_token as verify_jwt_token
+from utils.helpers import verify_token_cached
+from config.database import set_db_session
 
 security = HTTPBearer()
 
 async def verify_token(credentials = Depends(security)) -> dict:
     """Verify JWT token from Authorization header"""
     token = credentials.credentials
-    payload = verify_jwt_token(token)
+    payload = verify_token_cached(token)
     
     if not payload:
         raise HTTPException(
@@ -15,6 +16,8 @@ async def verify_token(credentials = Depends(security)) -> dict:
             detail="Invalid or expired token"
         )
     
+    # Pin this user's reads to replicas that have caught up with their writes
+    set_db_session(f"user:{payload['user_id']}")
     return payload
 
 async def require_admin(current_user: dict) -> dict:
@@ -0,0 +1,156 @@
+import gzip
+import threading
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.settings import (
+    COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY, COMPRESSION_ZSTD_LEVEL
+)
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+# Types worth compressing; everything else (images, archives, already-encoded data) is passed through
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript",
+                      "application/xml", "application/problem+json", "image/svg+xml")
+
+# Bodies this large are compressed in a worker thread (zlib, brotli and zstd release the GIL)
+# rather than holding up the event loop for milliseconds
+OFFLOAD_SIZE = 32 * 1024
+
+def build_compressors(gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+                      zstd_level: int = COMPRESSION_ZSTD_LEVEL) -> dict:
+    """encoding -> compress(body) for every encoding this process can produce"""
+    compressors = {"gzip": lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    if zstandard is not None:
+        compressors["zstd"] = _zstd_compress(zstd_level)
+    return compressors
+
+def _zstd_compress(level: int):
+    """ZstdCompressor is not thread-safe and large bodies are compressed in worker threads: one per thread"""
+    local = threading.local()
+
+    def compress(body: bytes) -> bytes:
+        compressor = getattr(local, "compressor", None)
+        if compressor is None:
+            compressor = local.compressor = zstandard.ZstdCompressor(level=level)
+        return compressor.compress(body)
+    return compress
+
+def parse_accept_encoding(header: str) -> dict:
+    """Accept-Encoding -> {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def choose_encoding(header: str, preference: tuple) -> str:
+    """Highest-q coding the client accepts, ties broken by server preference; None for identity"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in preference:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+def _sent_weak(request_headers: Headers, etag: str) -> bool:
+    """Whether the client revalidates with the weakened ETag, i.e. its 200 had been compressed"""
+    weak = f"W/{etag}"
+    return any(tag.strip() == weak for tag in request_headers.get("if-none-match", "").split(","))
+
+def _weaken_etag(headers: MutableHeaders):
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+class CompressionMiddleware:
+    """gzip / brotli / zstd for complete, compressible responses above a size threshold.
+
+    Streaming responses (a first body chunk with more_body) go out untouched so
+    exports keep their flow control, as do responses that already carry a
+    Content-Encoding. Strong ETags are weakened on compressed responses, since
+    the bytes differ from the identity representation.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 encodings: tuple = COMPRESSION_ENCODINGS, compressors: dict = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = compressors or build_compressors()
+        self.preference = tuple(coding for coding in encodings if coding in self.compressors)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), self.preference)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        compress = self.compressors[encoding]
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            # First body chunk: decide once, then send the held-back start message
+            passthrough = True
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            compressible = is_compressible(headers.get("content-type", ""))
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if (compressible and not message.get("more_body", False) and "content-encoding" not in headers
+                    and start_message["status"] not in (204, 206, 304) and len(body) >= self.minimum_size):
+                body = await anyio.to_thread.run_sync(compress, body) if len(body) >= OFFLOAD_SIZE else compress(body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                message = {**message, "body": body}
+                _weaken_etag(headers)
+            elif start_message["status"] == 304:
+                # The 304 has no body to size, so repeat the ETag in the form the client's 200 carried:
+                # weak only when the client revalidates with the weakened tag
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and _sent_weak(request_headers, etag):
+                    _weaken_etag(headers)
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
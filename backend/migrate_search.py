@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Add full-text/trigram search to an existing products table.
+
+Same objects as the search section of SCHEMA.sql, but the indexes are built
+CONCURRENTLY so a populated catalog keeps serving reads and writes. Adding the
+generated search_vector column rewrites the table once; run it off-peak on
+large catalogs. Safe to re-run.
+"""
+
+import time
+import psycopg2
+from config.settings import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+
+STEPS = [
+    ("Enable pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    ("Add and backfill search_vector", """
+        ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            ) STORED
+    """),
+    ("Build GIN index on search_vector",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_search_vector ON products USING GIN (search_vector)"),
+    ("Build trigram index on name",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_name_trgm ON products USING GIN (name gin_trgm_ops)"),
+    ("Build trigram index on description",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_description_trgm ON products USING GIN (description gin_trgm_ops)"),
+    ("Analyze products", "ANALYZE products"),
+]
+
+print('[INFO] Connecting to PostgreSQL database...')
+conn = psycopg2.connect(
+    host=DB_HOST,
+    database=DB_NAME,
+    user=DB_USER,
+    password=DB_PASSWORD,
+    port=DB_PORT,
+    connect_timeout=15
+)
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+conn.autocommit = True
+cursor = conn.cursor()
+
+try:
+    for label, statement in STEPS:
+        print(f'[INFO] {label}...')
+        start = time.perf_counter()
+        cursor.execute(statement)
+        print(f'[OK] {label} ({time.perf_counter() - start:.1f}s)')
+    print('[OK] Product search migration complete')
+except Exception as e:
+    print(f'[ERROR] {str(e)}')
+    raise
+finally:
+    cursor.close()
+    conn.close()
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+
+class StatusStats(BaseModel):
+    orders: int
+    revenue: float
+
+class LowStockProduct(BaseModel):
+    id: int
+    sku: Optional[str] = None
+    name: str
+    stock: int
+
+class AdminStatsResponse(BaseModel):
+    total_products: int
+    total_users: int
+    total_orders: int
+    # Sum of order totals, cancelled orders excluded
+    revenue: float
+    orders_by_status: Dict[str, StatusStats]
+    low_stock_threshold: int
+    low_stock_count: int
+    low_stock_products: list[LowStockProduct]
+    generated_at: datetime
@@ -5,13 +5,22 @@ from datetime import datetime
 class OrderItem(BaseModel):
     product_id: int
     quantity: int = Field(..., gt=0)
-    price: float = Field(..., gt=0)
+    # Accepted for compatibility; the current product price is used
+    price: Optional[float] = Field(None, gt=0)
 
 class OrderCreate(BaseModel):
-    items: List[OrderItem]
-    total_amount: float = Field(..., gt=0)
+    items: List[OrderItem] = Field(..., min_length=1)
+    # Accepted for compatibility; the total is computed server-side
+    total_amount: Optional[float] = Field(None, gt=0)
     shipping_address: str = Field(..., min_length=1)
 
+class OrderLineItem(BaseModel):
+    product_id: int
+    product_name: Optional[str] = None
+    quantity: int
+    # Unit price at the time of purchase
+    price: float
+
 class OrderUpdate(BaseModel):
     status: Optional[str] = None
 
@@ -22,6 +31,7 @@ class OrderResponse(BaseModel):
     status: str
     shipping_address: str
     created_at: datetime
+    items: List[OrderLineItem] = []
 
     class Config:
         from_attributes = True
@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
-from decimal import Decimal
 
 class ProductBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -11,12 +10,6 @@ class ProductBase(BaseModel):
     category: Optional[str] = None
     image_url: Optional[str] = None
 
-    class Config:
-        json_encoders = {
-            Decimal: lambda v: float(v),
-            datetime: lambda v: v.isoformat() if v else None
-        }
-
 class ProductCreate(ProductBase):
     pass
 
@@ -30,15 +23,40 @@ class ProductUpdate(BaseModel):
 
 class ProductResponse(ProductBase):
     id: int
+    sku: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        }
 
 class ProductListResponse(BaseModel):
     products: list[ProductResponse]
     pagination: dict
+
+class ProductBatchResponse(BaseModel):
+    # In the order the ids were requested, duplicates removed
+    products: list[ProductResponse]
+    missing: list[int]
+
+class ProductSearchResult(ProductResponse):
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
+
+class ProductSearchResponse(BaseModel):
+    products: list[ProductSearchResult]
+    pagination: dict
+
+class ProductImportError(BaseModel):
+    line: int
+    errors: list[str]
+
+class ProductImportResponse(BaseModel):
+    received: int
+    imported: int
+    inserted: int
+    updated: int
+    rejected: int
+    errors: list[ProductImportError]
+    errors_truncated: bool
+    seconds: float
@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import date
+
+class DailySales(BaseModel):
+    day: date
+    orders: int
+    # Cancelled orders excluded
+    revenue: float
+    orders_by_status: Dict[str, int]
+
+class ProductSales(BaseModel):
+    product_id: int
+    name: Optional[str] = None
+    sku: Optional[str] = None
+    category: Optional[str] = None
+    units: int
+    revenue: float
+    orders: int
+
+class CategorySales(BaseModel):
+    category: Optional[str] = None
+    units: int
+    revenue: float
+    orders: int
+
+class DailySalesResponse(BaseModel):
+    date_from: date
+    date_to: date
+    days: list[DailySales]
+
+class ProductSalesResponse(BaseModel):
+    date_from: date
+    date_to: date
+    products: list[ProductSales]
+
+class CategorySalesResponse(BaseModel):
+    date_from: date
+    date_to: date
+    categories: list[CategorySales]
+
+class SalesRebuildResponse(BaseModel):
+    rows: Dict[str, int]
+    seconds: float
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""Recompute the daily sales summary tables from orders and order_items
+
+    python rebuild_sales.py
+
+Run it once after creating the tables on an existing database, after bulk
+loads that bypass OrderDB (generate_data.py calls it itself), or whenever the
+summaries may have drifted, e.g. after products or users were deleted and
+their order lines cascaded away.
+"""
+
+from config.database import initialize_connection_pool, close_connection_pool
+from db.sales_db import SalesDB
+
+def main():
+    initialize_connection_pool()
+    try:
+        print("[INFO] Rebuilding daily sales summaries...")
+        report = SalesDB.rebuild_summaries()
+        for table, rows in report["rows"].items():
+            print(f"       {table}: {rows} rows")
+        print(f"[OK] Sales summaries rebuilt in {report['seconds']:.1f}s")
+    finally:
+        close_connection_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import anyio
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Literal, Union
+from config.database import run_db_call
+from config.settings import EXPORT_MAX_CONCURRENT, ADMIN_LOW_STOCK_THRESHOLD, ADMIN_LOW_STOCK_LIMIT
+from db.aio import AsyncStatsDB, AsyncSalesDB
+from db.exports import ExportStream, export_orders, export_products
+from models.admin import AdminStatsResponse
+from models.sales import DailySalesResponse, ProductSalesResponse, CategorySalesResponse, SalesRebuildResponse
+from middleware.auth import verify_token, require_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+ORDER_STATUSES = Literal["pending", "processing", "shipped", "delivered", "cancelled"]
+FORMAT_QUERY = Query("ndjson", alias="format", description="ndjson or csv")
+
+_export_limiter = None
+
+@router.get("/stats", response_model=AdminStatsResponse)
+async def get_admin_stats(low_stock_threshold: int = Query(ADMIN_LOW_STOCK_THRESHOLD, ge=0),
+                          low_stock_limit: int = Query(ADMIN_LOW_STOCK_LIMIT, ge=1, le=100),
+                          current_user = Depends(verify_token)):
+    """Dashboard figures from one aggregate query, cached for a few seconds (admin only)"""
+    try:
+        await require_admin(current_user)
+        stats = await AsyncStatsDB.get_admin_stats(low_stock_threshold, low_stock_limit)
+        return AdminStatsResponse(**stats, low_stock_threshold=low_stock_threshold)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to load statistics")
+
+async def _stream(export: ExportStream):
+    """Chunks of an export; each batch is fetched only after the client took the previous one"""
+    global _export_limiter
+    if _export_limiter is None:
+        _export_limiter = anyio.CapacityLimiter(EXPORT_MAX_CONCURRENT)
+    async with _export_limiter:
+        try:
+            while True:
+                chunk = await run_db_call(export.next_chunk)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Also runs when the client disconnects mid-stream: give the connection back
+            with anyio.CancelScope(shield=True):
+                await run_db_call(export.close)
+
+def _as_datetime(value):
+    """A bare date means midnight at its start"""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.min)
+    return value
+
+def _export_response(export: ExportStream, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.now():%Y%m%d-%H%M%S}.{export.fmt}"
+    return StreamingResponse(
+        _stream(export),
+        media_type=EXPORT_MEDIA_TYPES[export.fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
+
+@router.get("/export/orders")
+async def export_all_orders(fmt: Literal["ndjson", "csv"] = FORMAT_QUERY,
+                            created_from: Optional[Union[datetime, date]] = Query(None, description="Orders created at or after (date or datetime)"),
+                            created_to: Optional[Union[datetime, date]] = Query(None, description="Orders created before (exclusive)"),
+                            order_status: Optional[List[ORDER_STATUSES]] = Query(None, alias="status"),
+                            include_items: bool = Query(False),
+                            current_user = Depends(verify_token)):
+    """Stream every matching order as NDJSON or CSV (admin only)"""
+    await require_admin(current_user)
+    created_from, created_to = _as_datetime(created_from), _as_datetime(created_to)
+    if created_from and created_to and created_from >= created_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="created_from must be before created_to")
+    export = export_orders(fmt, created_from, created_to, order_status, include_items)
+    return _export_response(export, "orders")
+
+@router.get("/export/products")
+async def export_all_products(fmt: Literal["ndjson", "csv"] = FORMAT_QUERY, category: Optional[str] = None,
+                              current_user = Depends(verify_token)):
+    """Stream every product as NDJSON or CSV (admin only)"""
+    await require_admin(current_user)
+    return _export_response(export_products(fmt, category), "products")
+
+SALES_DEFAULT_DAYS = 30
+SALES_MAX_DAYS = 366 * 3
+
+def _sales_range(date_from: Optional[date], date_to: Optional[date]) -> tuple:
+    """Inclusive day range, defaulting to the last SALES_DEFAULT_DAYS days"""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=SALES_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= SALES_MAX_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Date range is limited to {SALES_MAX_DAYS} days")
+    return date_from, date_to
+
+@router.get("/sales/daily", response_model=DailySalesResponse)
+async def get_daily_sales(date_from: Optional[date] = None, date_to: Optional[date] = None,
+                          current_user = Depends(verify_token)):
+    """Orders and revenue per day from the daily summaries (admin only)"""
+    try:
+        await require_admin(current_user)
+        date_from, date_to = _sales_range(date_from, date_to)
+        days = await AsyncSalesDB.get_daily_sales(date_from, date_to)
+        return DailySalesResponse(date_from=date_from, date_to=date_to, days=days)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch sales")
+
+@router.get("/sales/products", response_model=ProductSalesResponse)
+async def get_top_products(date_from: Optional[date] = None, date_to: Optional[date] = None,
+                           sort: Literal["revenue", "units"] = "revenue", limit: int = Query(20, ge=1, le=100),
+                           current_user = Depends(verify_token)):
+    """Best-selling products over a date range (admin only)"""
+    try:
+        await require_admin(current_user)
+        date_from, date_to = _sales_range(date_from, date_to)
+        products = await AsyncSalesDB.get_top_products(date_from, date_to, limit=limit, sort=sort)
+        return ProductSalesResponse(date_from=date_from, date_to=date_to, products=products)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch sales")
+
+@router.get("/sales/categories", response_model=CategorySalesResponse)
+async def get_category_sales(date_from: Optional[date] = None, date_to: Optional[date] = None,
+                             current_user = Depends(verify_token)):
+    """Sales per category over a date range (admin only)"""
+    try:
+        await require_admin(current_user)
+        date_from, date_to = _sales_range(date_from, date_to)
+        categories = await AsyncSalesDB.get_category_sales(date_from, date_to)
+        return CategorySalesResponse(date_from=date_from, date_to=date_to, categories=categories)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch sales")
+
+@router.post("/sales/rebuild", response_model=SalesRebuildResponse)
+async def rebuild_sales(current_user = Depends(verify_token)):
+    """Recompute the daily sales summaries from orders (admin only)"""
+    try:
+        await require_admin(current_user)
+        return SalesRebuildResponse(**await AsyncSalesDB.rebuild_summaries())
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to rebuild sales summaries")
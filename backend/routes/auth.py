@@ -1,21 +1,42 @@
 from fastapi import APIRouter, HTTPException, status
 from models.user import UserCreate, UserLogin, UserResponse, TokenResponse
-from db.user_db import UserDB
+from db.aio import AsyncUserDB
 from utils.helpers import create_access_token
+from utils.passwords import password_hasher, PasswordHasherBusy
+from utils.email_domains import email_domain_checker
+from config.settings import EMAIL_DELIVERABILITY_CHECK
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _hasher_busy(error: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts right now, please retry shortly",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user: UserCreate):
     """Register a new user"""
     try:
-        new_user = UserDB.create_user(
+        # UserCreate has already rejected bad emails (EmailStr) and short passwords with a 422, so
+        # only valid signups reach the hasher; duplicates are detected by the INSERT's ON CONFLICT.
+        # The DNS check is opt-in and cached per domain
+        if EMAIL_DELIVERABILITY_CHECK and not await email_domain_checker.is_deliverable(user.email):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email domain does not accept mail")
+
+        new_user = await AsyncUserDB.create_user(
             name=user.name,
             email=user.email,
             password=user.password,
-            phone=user.phone
+            phone=user.phone,
+            password_hash=await password_hasher.hash(user.password)
         )
-        return UserResponse(**new_user, created_at=None)
+        return UserResponse(**new_user)
+    except HTTPException:
+        raise
+    except PasswordHasherBusy as e:
+        raise _hasher_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -25,8 +46,8 @@ async def register(user: UserCreate):
 async def login(credentials: UserLogin):
     """Login user"""
     try:
-        user = UserDB.get_user_by_email(credentials.email)
-        if not user or not UserDB.verify_password(credentials.password, user["password"]):
+        user = await AsyncUserDB.get_user_by_email(credentials.email)
+        if not user or not await password_hasher.check(credentials.password, user["password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -39,5 +60,7 @@ async def login(credentials: UserLogin):
         )
     except HTTPException:
         raise
+    except PasswordHasherBusy as e:
+        raise _hasher_busy(e)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Login failed")
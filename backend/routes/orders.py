@@ -1,8 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Query
+from typing import Optional
 from models.order import OrderCreate, OrderUpdate, OrderResponse, OrderListResponse
-from db.order_db import OrderDB
-from db.product_db import ProductDB
-from utils.helpers import get_pagination_params, get_pagination_response
+from db.aio import AsyncOrderDB
+from db.order_db import ProductNotFoundError, InsufficientStockError
+from db.counts import CountStrategy
+from config.settings import COUNT_STRATEGY_USER_ORDERS, COUNT_STRATEGY_ALL_ORDERS
+from utils.serialization import model_response
+from utils.helpers import (
+    get_pagination_params, get_pagination_response,
+    encode_cursor, decode_cursor, get_cursor_pagination_response, split_has_next, InvalidCursorError
+)
 from middleware.auth import verify_token, require_admin
 
 router = APIRouter(prefix="/orders", tags=["orders"])
@@ -11,47 +18,66 @@ router = APIRouter(prefix="/orders", tags=["orders"])
 async def create_order(order: OrderCreate, current_user = Depends(verify_token)):
     """Create a new order"""
     try:
-        # Validate items and check stock
-        for item in order.items:
-            product = ProductDB.get_product_by_id(item.product_id)
-            if not product:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Product {item.product_id} not found"
-                )
-            
-            if product["stock"] < item.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for product {product['name']}"
-                )
-            
-            # Decrease stock
-            ProductDB.decrease_stock(item.product_id, item.quantity)
-
-        # Create order
-        new_order = OrderDB.create_order(
+        # Stock checks, stock decrements and the order insert run in one transaction;
+        # the total is computed from current product prices, not taken from the client
+        new_order = await AsyncOrderDB.place_order(
             user_id=current_user["user_id"],
-            total_amount=order.total_amount,
+            items=[(item.product_id, item.quantity) for item in order.items],
             shipping_address=order.shipping_address
         )
-        return OrderResponse(**new_order, created_at=None)
-    except HTTPException:
-        raise
+        return OrderResponse(**new_order)
+    except ProductNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create order")
 
+CURSOR_QUERY = Query(None, description="Keyset cursor; pass an empty value for the first page")
+COUNT_QUERY = Query(None, description="How total_items is computed: exact, estimate, cached or none (has_next only)")
+
+def _order_keyset(cursor: str) -> Optional[tuple]:
+    """(created_at, id) position encoded in an order cursor"""
+    if not cursor:
+        return None
+    values = decode_cursor(cursor, ("created_at", "id"))
+    return values["created_at"], values["id"]
+
+def _next_order_cursor(orders: list, has_next: bool) -> Optional[str]:
+    if not has_next:
+        return None
+    last = orders[-1]
+    return encode_cursor({"created_at": last["created_at"], "id": last["id"]})
+
 @router.get("/", response_model=OrderListResponse)
-async def get_user_orders(page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100), current_user = Depends(verify_token)):
+async def get_user_orders(page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100),
+                          cursor: Optional[str] = CURSOR_QUERY, count: Optional[CountStrategy] = COUNT_QUERY,
+                          current_user = Depends(verify_token)):
     """Get user's orders"""
     try:
+        if cursor is not None:
+            orders, has_next = await AsyncOrderDB.get_user_orders_after(
+                current_user["user_id"], _order_keyset(cursor), limit=limit
+            )
+            return model_response(OrderListResponse, {
+                "orders": orders,
+                "pagination": get_cursor_pagination_response(limit, _next_order_cursor(orders, has_next))
+            })
+
         _, limit, offset = get_pagination_params(page, limit)
-        orders, total = OrderDB.get_user_orders(current_user["user_id"], limit=limit, offset=offset)
-        
-        return OrderListResponse(
-            orders=orders,
-            pagination=get_pagination_response(page, limit, total)
+        count = count or COUNT_STRATEGY_USER_ORDERS
+        fetch_limit = limit + 1 if count == "none" else limit
+        orders, total = await AsyncOrderDB.get_user_orders(
+            current_user["user_id"], limit=fetch_limit, offset=offset, count_strategy=count
         )
+        orders, has_next = split_has_next(orders, limit)
+        
+        return model_response(OrderListResponse, {
+            "orders": orders,
+            "pagination": get_pagination_response(page, limit, total, has_next=has_next)
+        })
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch orders")
 
@@ -59,7 +85,7 @@ async def get_user_orders(page: int = Query(1, ge=1), limit: int = Query(10, ge=
 async def get_order(order_id: int, current_user = Depends(verify_token)):
     """Get order by ID"""
     try:
-        order = OrderDB.get_order_by_id(order_id)
+        order = await AsyncOrderDB.get_order_by_id(order_id)
         if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
         
@@ -67,26 +93,40 @@ async def get_order(order_id: int, current_user = Depends(verify_token)):
         if order["user_id"] != current_user["user_id"] and current_user["role"] != "admin":
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Unauthorized")
         
-        return OrderResponse(**order)
+        return model_response(OrderResponse, order)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch order")
 
 @router.get("/admin/all", response_model=OrderListResponse)
-async def get_all_orders(page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100), current_user = Depends(verify_token)):
+async def get_all_orders(page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100),
+                         cursor: Optional[str] = CURSOR_QUERY, count: Optional[CountStrategy] = COUNT_QUERY,
+                         current_user = Depends(verify_token)):
     """Get all orders (admin only)"""
     try:
         await require_admin(current_user)
+        if cursor is not None:
+            orders, has_next = await AsyncOrderDB.get_all_orders_after(_order_keyset(cursor), limit=limit)
+            return model_response(OrderListResponse, {
+                "orders": orders,
+                "pagination": get_cursor_pagination_response(limit, _next_order_cursor(orders, has_next))
+            })
+
         _, limit, offset = get_pagination_params(page, limit)
-        orders, total = OrderDB.get_all_orders(limit=limit, offset=offset)
+        count = count or COUNT_STRATEGY_ALL_ORDERS
+        fetch_limit = limit + 1 if count == "none" else limit
+        orders, total = await AsyncOrderDB.get_all_orders(limit=fetch_limit, offset=offset, count_strategy=count)
+        orders, has_next = split_has_next(orders, limit)
         
-        return OrderListResponse(
-            orders=orders,
-            pagination=get_pagination_response(page, limit, total)
-        )
+        return model_response(OrderListResponse, {
+            "orders": orders,
+            "pagination": get_pagination_response(page, limit, total, has_next=has_next, estimated=(count == "estimate"))
+        })
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch orders")
 
@@ -96,11 +136,11 @@ async def update_order_status(order_id: int, order: OrderUpdate, current_user =
     try:
         await require_admin(current_user)
         
-        existing_order = OrderDB.get_order_by_id(order_id)
+        existing_order = await AsyncOrderDB.get_order_by_id(order_id)
         if not existing_order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
         
-        updated_order = OrderDB.update_order_status(order_id, order.status)
+        updated_order = await AsyncOrderDB.update_order_status(order_id, order.status)
         return OrderResponse(**updated_order)
     except HTTPException:
         raise
@@ -113,11 +153,11 @@ async def delete_order(order_id: int, current_user = Depends(verify_token)):
     try:
         await require_admin(current_user)
         
-        existing_order = OrderDB.get_order_by_id(order_id)
+        existing_order = await AsyncOrderDB.get_order_by_id(order_id)
         if not existing_order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
         
-        OrderDB.delete_order(order_id)
+        await AsyncOrderDB.delete_order(order_id)
     except HTTPException:
         raise
     except Exception as e:
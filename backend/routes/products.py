@@ -1,56 +1,137 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from models.product import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
-from db.product_db import ProductDB
-from utils.helpers import get_pagination_params, get_pagination_response
+import anyio
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request
+from typing import Optional, Literal
+from models.product import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductSearchResponse, ProductImportResponse,
+    ProductBatchResponse
+)
+from db.aio import AsyncProductDB
+from db.counts import CountStrategy
+from db.product_import import import_products
+from config.database import run_db_call
+from config.settings import (
+    COUNT_STRATEGY_PRODUCTS, COUNT_STRATEGY_SEARCH,
+    CACHE_CONTROL_PRODUCT, CACHE_CONTROL_PRODUCT_LIST, CACHE_CONTROL_PRODUCT_SEARCH, PRODUCT_BATCH_MAX_IDS
+)
+from utils.http_cache import conditional_response
+from utils.helpers import (
+    get_pagination_params, get_pagination_response,
+    encode_cursor, decode_cursor, get_cursor_pagination_response, split_has_next, iter_text_lines,
+    InvalidCursorError
+)
 from middleware.auth import verify_token, require_admin
 
+COUNT_QUERY = Query(None, description="How total_items is computed: exact, estimate, cached or none (has_next only)")
+
 router = APIRouter(prefix="/products", tags=["products"])
 
+def _list_response(request: Request, model: type, products: list, pagination: dict, cache_control: str):
+    # If-Modified-Since is not honoured for lists: a deleted row leaves max(updated_at) unchanged
+    return conditional_response(request, model, {"products": products, "pagination": pagination}, products,
+                                cache_control, extra=pagination, honor_since=False)
+
 @router.get("/", response_model=ProductListResponse)
-async def get_all_products(page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100), category: str = None):
+async def get_all_products(request: Request, page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100), category: str = None,
+                           cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
+                           count: Optional[CountStrategy] = COUNT_QUERY):
     """Get all products with pagination"""
     try:
+        if cursor is not None:
+            after_id = decode_cursor(cursor)["id"] if cursor else None
+            products, has_next = await AsyncProductDB.get_products_after(after_id, limit=limit, category=category)
+            next_cursor = encode_cursor({"id": products[-1]["id"]}) if has_next else None
+            return _list_response(request, ProductListResponse, products,
+                                  get_cursor_pagination_response(limit, next_cursor), CACHE_CONTROL_PRODUCT_LIST)
+
         _, limit, offset = get_pagination_params(page, limit)
-        products, total = ProductDB.get_all_products(limit=limit, offset=offset, category=category)
-        
-        # Ensure all products have required fields
-        processed_products = []
-        for product in products:
-            if product:
-                processed_products.append(product)
+        count = count or COUNT_STRATEGY_PRODUCTS
+        fetch_limit = limit + 1 if count == "none" else limit
+        products, total = await AsyncProductDB.get_all_products(
+            limit=fetch_limit, offset=offset, category=category, count_strategy=count
+        )
+        products, has_next = split_has_next(products, limit)
         
-        return ProductListResponse(
-            products=processed_products,
-            pagination=get_pagination_response(page, limit, total)
+        return _list_response(
+            request, ProductListResponse, products,
+            get_pagination_response(page, limit, total, has_next=has_next, estimated=(count == "estimate" and not category)),
+            CACHE_CONTROL_PRODUCT_LIST
         )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"ERROR in get_all_products: {str(e)}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch products: {str(e)}")
 
-@router.get("/search", response_model=ProductListResponse)
-async def search_products(q: str = Query(...), page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100)):
+@router.get("/search", response_model=ProductSearchResponse)
+async def search_products(request: Request, q: str = Query(...), page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100),
+                          cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
+                          count: Optional[CountStrategy] = COUNT_QUERY):
     """Search products"""
     try:
+        if cursor is not None:
+            after_id = decode_cursor(cursor)["id"] if cursor else None
+            products, has_next = await AsyncProductDB.search_products_after(q, after_id, limit=limit)
+            next_cursor = encode_cursor({"id": products[-1]["id"]}) if has_next else None
+            return _list_response(request, ProductSearchResponse, products,
+                                  get_cursor_pagination_response(limit, next_cursor), CACHE_CONTROL_PRODUCT_SEARCH)
+
         _, limit, offset = get_pagination_params(page, limit)
-        products, total = ProductDB.search_products(q, limit=limit, offset=offset)
+        count = count or COUNT_STRATEGY_SEARCH
+        fetch_limit = limit + 1 if count == "none" else limit
+        products, total = await AsyncProductDB.search_products(q, limit=fetch_limit, offset=offset, count_strategy=count)
+        products, has_next = split_has_next(products, limit)
         
-        return ProductListResponse(
-            products=products,
-            pagination=get_pagination_response(page, limit, total)
-        )
+        return _list_response(request, ProductSearchResponse, products,
+                              get_pagination_response(page, limit, total, has_next=has_next), CACHE_CONTROL_PRODUCT_SEARCH)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Search failed")
 
+def _parse_ids(ids: str) -> list:
+    """Comma-separated ids, duplicates dropped, first occurrence order kept"""
+    product_ids = []
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit() or int(part) < 1:
+            raise ValueError(f"Invalid product id: {part}")
+        product_ids.append(int(part))
+    return list(dict.fromkeys(product_ids))
+
+@router.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(request: Request, ids: str = Query(..., description="Comma-separated product ids")):
+    """Get several products by ID in one request, in the requested order"""
+    try:
+        product_ids = _parse_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not product_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one product id is required")
+    if len(product_ids) > PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {PRODUCT_BATCH_MAX_IDS} product ids per request")
+
+    try:
+        found = await AsyncProductDB.get_products_by_ids(product_ids)
+        products = [found[product_id] for product_id in product_ids if product_id in found]
+        missing = [product_id for product_id in product_ids if product_id not in found]
+        return conditional_response(request, ProductBatchResponse, {"products": products, "missing": missing},
+                                    products, CACHE_CONTROL_PRODUCT_LIST, extra=missing, honor_since=False)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch products")
+
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int):
+async def get_product(request: Request, product_id: int):
     """Get product by ID"""
     try:
-        product = ProductDB.get_product_by_id(product_id)
+        product = await AsyncProductDB.get_product_by_id(product_id)
         if not product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-        return ProductResponse(**product)
+        return conditional_response(request, ProductResponse, product, [product], CACHE_CONTROL_PRODUCT)
     except HTTPException:
         raise
     except Exception as e:
@@ -61,7 +142,7 @@ async def create_product(product: ProductCreate, current_user = Depends(verify_t
     """Create a new product (admin only)"""
     try:
         await require_admin(current_user)
-        new_product = ProductDB.create_product(
+        new_product = await AsyncProductDB.create_product(
             name=product.name,
             description=product.description,
             price=product.price,
@@ -75,16 +156,53 @@ async def create_product(product: ProductCreate, current_user = Depends(verify_t
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create product")
 
+def _blocking_body(request: Request):
+    """Request body chunks for code running in a worker thread, read from the event loop on demand"""
+    stream = request.stream()
+
+    async def next_chunk():
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    while True:
+        chunk = anyio.from_thread.run(next_chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+def _import_format(content_type: str) -> str:
+    return "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+@router.post("/import", response_model=ProductImportResponse)
+async def bulk_import_products(request: Request, fmt: Optional[Literal["csv", "ndjson"]] = Query(
+                                   None, alias="format", description="csv or ndjson; defaults from Content-Type"),
+                               current_user = Depends(verify_token)):
+    """Bulk upsert products by SKU from a streamed CSV or NDJSON body (admin only)"""
+    try:
+        await require_admin(current_user)
+        fmt = fmt or _import_format(request.headers.get("content-type", ""))
+        # The body is parsed and COPYed as it arrives, in a worker thread
+        report = await run_db_call(import_products, iter_text_lines(_blocking_body(request)), fmt)
+        return ProductImportResponse(**report)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to import products")
+
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(product_id: int, product: ProductUpdate, current_user = Depends(verify_token)):
     """Update product (admin only)"""
     try:
         await require_admin(current_user)
-        existing_product = ProductDB.get_product_by_id(product_id)
+        existing_product = await AsyncProductDB.get_product_by_id(product_id)
         if not existing_product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
         
-        updated_product = ProductDB.update_product(product_id, **product.dict(exclude_unset=True))
+        updated_product = await AsyncProductDB.update_product(product_id, **product.dict(exclude_unset=True))
         return ProductResponse(**updated_product)
     except HTTPException:
         raise
@@ -96,11 +214,11 @@ async def delete_product(product_id: int, current_user = Depends(verify_token)):
     """Delete product (admin only)"""
     try:
         await require_admin(current_user)
-        existing_product = ProductDB.get_product_by_id(product_id)
+        existing_product = await AsyncProductDB.get_product_by_id(product_id)
         if not existing_product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
         
-        ProductDB.delete_product(product_id)
+        await AsyncProductDB.delete_product(product_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "tags")
+
+    def __init__(self, value, fresh_until: float, stale_until: float, tags: frozenset):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.tags = tags
+
+class LRUCache:
+    """Bounded LRU cache with TTL, stale-while-revalidate and tag invalidation.
+
+    Entries are fresh for ``ttl`` seconds, then served stale for another
+    ``stale_ttl`` seconds while a background refresh runs. Each entry carries
+    tags (e.g. ("product", 7)) so a write can drop exactly the entries it affects.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float, stale_ttl: float = 0.0, refresh_workers: int = 2):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tag_index = {}           # tag -> set of keys
+        self._generation = 0           # bumped on every invalidation
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix=f"{name}-refresh")
+        self._counters = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0,
+            "expirations": 0, "invalidations": 0, "refreshes": 0, "refresh_errors": 0,
+        }
+
+    def _unlink(self, key, entry: _Entry):
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _store(self, key, value, tags, generation: int):
+        """Insert unless an invalidation ran while the value was being loaded"""
+        now = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._unlink(key, old)
+            entry = _Entry(value, now + self.ttl, now + self.ttl + self.stale_ttl, frozenset(tags))
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._unlink(old_key, old_entry)
+                self._counters["evictions"] += 1
+
+    def _load(self, key, loader, tags, generation: int):
+        value = loader()
+        self._store(key, value, tags(value) if callable(tags) else tags, generation)
+        return value
+
+    def _refresh(self, key, loader, tags, generation: int):
+        try:
+            self._load(key, loader, tags, generation)
+            with self._lock:
+                self._counters["refreshes"] += 1
+        except Exception as e:
+            with self._lock:
+                self._counters["refresh_errors"] += 1
+            print(f"[ERROR] {self.name} cache refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_load(self, key, loader, tags=()):
+        """Return the cached value for key, calling loader() on a miss.
+
+        ``tags`` is an iterable or a function of the loaded value.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+            if entry is not None:
+                if now < entry.fresh_until:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry.value
+                if now < entry.stale_until:
+                    self._entries.move_to_end(key)
+                    self._counters["stale_hits"] += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._refresher.submit(self._refresh, key, loader, tags, generation)
+                    return entry.value
+                self._unlink(key, self._entries.pop(key))
+                self._counters["expirations"] += 1
+            self._counters["misses"] += 1
+
+        return self._load(key, loader, tags, generation)
+
+    def get(self, key, default=None):
+        """Fresh cached value for key without loading, or default"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry.value
+            self._counters["misses"] += 1
+            return default
+
+    def put(self, key, value, tags=()):
+        with self._lock:
+            generation = self._generation
+        self._store(key, value, tags, generation)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._unlink(key, entry)
+                self._counters["invalidations"] += 1
+
+    def invalidate_tags(self, *tags):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._unlink(key, entry)
+                        self._counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tag_index.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                **self._counters,
+                "hit_rate": (self._counters["hits"] + self._counters["stale_hits"]) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,46 @@
+import anyio
+import dns.resolver
+from email_validator import EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+from config.settings import EMAIL_DOMAIN_CACHE_TTL, EMAIL_DNS_TIMEOUT
+from utils.cache import LRUCache
+
+class EmailDomainChecker:
+    """Cached MX/A lookups deciding whether an email domain accepts mail.
+
+    Lookups run in a worker thread and their verdicts are cached per domain,
+    so a signup burst from one provider costs a single DNS query. A lookup
+    that times out or errors lets the address through, and is not cached.
+    """
+
+    def __init__(self, ttl: float, timeout: float, max_entries: int = 10000):
+        self.timeout = timeout
+        self._cache = LRUCache("email-domain", max_entries, ttl, refresh_workers=1)
+        self._resolver = dns.resolver.Resolver()
+        self._resolver.lifetime = timeout
+
+    def _lookup(self, domain: str):
+        """True/False verdict, or None when DNS gave no answer in time"""
+        try:
+            info = validate_email_deliverability(domain, domain, dns_resolver=self._resolver)
+        except EmailUndeliverableError:
+            return False
+        except Exception as e:
+            print(f"[ERROR] Email domain lookup failed for {domain}: {e}")
+            return None
+        return None if "unknown-deliverability" in info else True
+
+    async def is_deliverable(self, email: str) -> bool:
+        domain = email.rsplit("@", 1)[-1].lower()
+        verdict = self._cache.get(domain)
+        if verdict is None:
+            verdict = await anyio.to_thread.run_sync(self._lookup, domain)
+            if verdict is None:
+                return True
+            self._cache.put(domain, verdict)
+        return verdict
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+email_domain_checker = EmailDomainChecker(EMAIL_DOMAIN_CACHE_TTL, EMAIL_DNS_TIMEOUT)
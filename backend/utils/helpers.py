@@ -1,7 +1,11 @@
 from datetime import datetime, timedelta
+import base64
+import codecs
+import json
 import jwt
-from typing import Optional, Dict
-from config.settings import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_DAYS
+from typing import Optional, Dict, Iterable, Iterator
+from config.settings import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_DAYS, TOKEN_CACHE_ENABLED
+from utils.token_cache import token_cache
 
 def create_access_token(user_id: int, role: str) -> str:
     """Create JWT access token"""
@@ -23,6 +27,17 @@ def verify_token(token: str) -> Optional[Dict]:
     except jwt.InvalidTokenError:
         return None
 
+def verify_token_cached(token: str) -> Optional[Dict]:
+    """verify_token, answered from the verified-token cache for tokens seen before"""
+    if not TOKEN_CACHE_ENABLED:
+        return verify_token(token)
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = verify_token(token)
+        if payload:
+            token_cache.put(token, payload)
+    return payload
+
 def get_pagination_params(page: int = 1, limit: int = 10) -> tuple:
     """Calculate pagination offset"""
     page = max(1, page)
@@ -30,12 +45,83 @@ def get_pagination_params(page: int = 1, limit: int = 10) -> tuple:
     offset = (page - 1) * limit
     return page, limit, offset
 
-def get_pagination_response(current_page: int, limit: int, total: int) -> Dict:
-    """Generate pagination metadata"""
+def get_pagination_response(current_page: int, limit: int, total: Optional[int],
+                            has_next: Optional[bool] = None, estimated: bool = False) -> Dict:
+    """Generate pagination metadata (total is None when counting was skipped)"""
+    if total is None:
+        return {
+            "current_page": current_page,
+            "total_pages": None,
+            "total_items": None,
+            "items_per_page": limit,
+            "has_next": bool(has_next)
+        }
+
     total_pages = (total + limit - 1) // limit
-    return {
+    response = {
         "current_page": current_page,
         "total_pages": total_pages,
         "total_items": total,
         "items_per_page": limit
     }
+    if estimated:
+        response["total_is_estimate"] = True
+    return response
+
+def split_has_next(rows: list, limit: int) -> tuple:
+    """Trim a page fetched with limit + 1 rows and report whether more rows exist"""
+    return rows[:limit], len(rows) > limit
+
+def encode_cursor(values: Dict) -> str:
+    """Encode keyset position as an opaque URL-safe cursor"""
+    payload = {k: v.isoformat() if isinstance(v, datetime) else v for k, v in values.items()}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that is malformed or does not hold the expected keyset fields"""
+
+def decode_cursor(cursor: str, fields: tuple = ("id",)) -> Dict:
+    """Decode an opaque cursor back into its keyset position.
+
+    Every name in ``fields`` must be present with the right type ("id" an
+    integer, "created_at" an ISO timestamp), so a tampered cursor is rejected
+    here rather than failing in SQL.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, dict):
+            raise ValueError
+        for field in fields:
+            value = values[field]
+            if field == "created_at":
+                values[field] = datetime.fromisoformat(value)
+            elif not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError
+        return values
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+def get_cursor_pagination_response(limit: int, next_cursor: Optional[str]) -> Dict:
+    """Generate pagination metadata for cursor (keyset) mode"""
+    return {
+        "items_per_page": limit,
+        "has_next": next_cursor is not None,
+        "next_cursor": next_cursor
+    }
+
+def iter_text_lines(chunks: Iterable[bytes], encoding: str = "utf-8-sig") -> Iterator[str]:
+    """Decode a stream of byte chunks into text lines (each ending in "\\n" except possibly the last)"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        if "\n" not in pending:
+            continue
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
@@ -0,0 +1,78 @@
+import functools
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+from utils.serialization import model_response
+
+@functools.lru_cache(maxsize=None)
+def _representation(model: type) -> str:
+    """Changes whenever the response shape does, so old ETags stop matching after a deploy"""
+    return f"{model.__name__}({','.join(model.model_fields)})"
+
+def _as_utc(value: datetime) -> datetime:
+    # updated_at is TIMESTAMP WITHOUT TIME ZONE, written by NOW() in the server's time zone
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def row_validators(request: Request, model: type, rows: list, extra=None) -> tuple:
+    """(strong ETag, Last-Modified) for rows, from their ids and updated_at only.
+
+    Every write to products bumps updated_at, so (id, updated_at) pairs identify
+    the rows' content. The URL (query, page, search terms) and ``extra`` (e.g.
+    pagination totals) cover everything else in the body.
+    """
+    digest = hashlib.sha256(f"{_representation(model)}|{request.url.path}?{request.url.query}|{extra!r}".encode())
+    last_modified = None
+    for row in rows:
+        updated_at = row.get("updated_at")
+        if updated_at is None:
+            # No change marker: fall back to the row's content
+            digest.update(repr(sorted(row.items(), key=lambda item: item[0])).encode())
+            continue
+        digest.update(f"|{row['id']}:{updated_at.isoformat()}".encode())
+        updated_at = _as_utc(updated_at)
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    return f'"{digest.hexdigest()[:32]}"', last_modified
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime], honor_since: bool = True) -> bool:
+    """RFC 9110 conditional GET: If-None-Match wins; If-Modified-Since is only consulted without it.
+
+    Pass honor_since=False for lists, where a deleted row leaves max(updated_at) unchanged.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not honor_since or if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have whole-second precision
+    return last_modified.replace(microsecond=0) <= since
+
+def conditional_response(request: Request, model: type, data: dict, rows: list, cache_control: str,
+                         extra=None, honor_since: bool = True) -> Response:
+    """304 when the client's validators still match, else the serialized body, both with validators.
+
+    The 304 decision needs only the rows' ids and updated_at, never the serialized body.
+    """
+    etag, last_modified = row_validators(request, model, rows, extra)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if is_not_modified(request, etag, last_modified, honor_since):
+        return Response(status_code=304, headers=headers)
+    return model_response(model, data, headers=headers)
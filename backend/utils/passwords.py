@@ -0,0 +1,79 @@
+import math
+import time
+import bcrypt
+from anyio import CapacityLimiter, to_thread
+from config.settings import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT
+
+def hash_password_sync(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+def check_password_sync(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+class PasswordHasherBusy(Exception):
+    """Every hashing worker is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing is saturated")
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """Runs bcrypt in at most ``workers`` threads with at most ``queue_limit`` callers waiting.
+
+    bcrypt releases the GIL while hashing, so threads use every core without
+    stalling the event loop. Callers beyond the queue limit are rejected at once
+    with PasswordHasherBusy instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._limiter = None
+        self._admitted = 0        # running + waiting; only touched on the event loop
+        self._avg_seconds = 0.1   # moving average of one hash, for Retry-After
+        self._counters = {"completed": 0, "rejected": 0}
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_seconds * self._admitted / self.workers))
+
+    async def _run(self, func, *args):
+        if self._admitted >= self.workers + self.queue_limit:
+            self._counters["rejected"] += 1
+            raise PasswordHasherBusy(self._retry_after())
+        if self._limiter is None:
+            self._limiter = CapacityLimiter(self.workers)
+
+        self._admitted += 1
+        try:
+            result = await to_thread.run_sync(self._timed, func, *args, limiter=self._limiter)
+            self._counters["completed"] += 1
+            return result
+        finally:
+            self._admitted -= 1
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._avg_seconds = 0.9 * self._avg_seconds + 0.1 * (time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password)
+
+    async def check(self, password: str, hashed_password: str) -> bool:
+        return await self._run(check_password_sync, password, hashed_password)
+
+    def stats(self) -> dict:
+        running = min(self._admitted, self.workers)
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "rounds": BCRYPT_ROUNDS,
+            "running": running,
+            "waiting": self._admitted - running,
+            "avg_ms": self._avg_seconds * 1000,
+            **self._counters,
+        }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
@@ -0,0 +1,59 @@
+import functools
+import typing
+from decimal import Decimal
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from config.settings import FAST_RESPONSES
+
+def _nested_model(annotation) -> tuple:
+    """(model, many) when a field holds a model or a list of models, else (None, False)"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _nested_model(args[0]) if len(args) == 1 else (None, False)
+    if origin is list:
+        model, _ = _nested_model(typing.get_args(annotation)[0])
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+@functools.lru_cache(maxsize=None)
+def _plan(model: type) -> tuple:
+    """((name, default) for every field, (name, model, many) for fields holding models)"""
+    fields, nested = [], []
+    for name, field in model.model_fields.items():
+        fields.append((name, field.get_default(call_default_factory=True)))
+        inner, many = _nested_model(field.annotation)
+        if inner is not None:
+            nested.append((name, inner, many))
+    return tuple(fields), tuple(nested)
+
+def project(model: type, data) -> dict:
+    """Trusted data (DB rows, dicts) reduced to exactly the fields of model, without validation"""
+    fields, nested = _plan(model)
+    get = data.get
+    out = {name: get(name, default) for name, default in fields}
+    for name, inner, many in nested:
+        value = out[name]
+        if value is not None:
+            out[name] = [project(inner, item) for item in value] if many else project(inner, value)
+    return out
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dump_json(model: type, data) -> bytes:
+    return orjson.dumps(project(model, data), default=json_default)
+
+def model_response(model: type, data: dict, status_code: int = 200, headers: dict = None) -> Response:
+    """JSON response for trusted data shaped like model.
+
+    With FAST_RESPONSES the data goes straight to orjson; otherwise it is
+    validated into the model first.
+    """
+    body = dump_json(model, data) if FAST_RESPONSES else model(**data).model_dump_json().encode()
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+class _Abandoned(Exception):
+    """The leader went away before running the call; waiters start over"""
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the call; everyone arriving while it is in
+    flight gets the same result (or the same exception) instead of running it
+    again. Nothing is kept afterwards: the next call after completion, including
+    after an error, runs afresh. In-flight calls are tracked as
+    concurrent.futures.Future, so DB worker threads (do) and event-loop
+    coroutines (do_async) join the same call, and coroutines wait without
+    holding a worker thread. Results are shared between callers and must be
+    treated as read-only, as with cached values.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}               # key -> Future of the in-flight call
+        self._counters = {"calls": 0, "executions": 0, "collapsed": 0, "errors": 0}
+
+    def _join(self, key) -> tuple:
+        """(future, leader): leader is True when the caller has to run the call"""
+        with self._lock:
+            self._counters["calls"] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self._counters["collapsed"] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._counters["executions"] += 1
+            return future, True
+
+    def _finish(self, key, future: Future, error: BaseException = None):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+            if error is not None and not isinstance(error, _Abandoned):
+                self._counters["errors"] += 1
+
+    def _run(self, key, future: Future, func):
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key, future, e)
+            future.set_exception(e)
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    def do(self, key, func):
+        """func() once per key among concurrent callers (blocking; for worker threads)"""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                return self._run(key, future, func)
+            try:
+                return future.result()
+            except _Abandoned:
+                continue
+
+    async def do_async(self, key, func, run_in_thread):
+        """Like do, from the event loop: the leader runs func via await run_in_thread(call)"""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                try:
+                    return await run_in_thread(self._run, key, future, func)
+                finally:
+                    if not future.done():
+                        # Cancelled before the call reached a worker thread
+                        error = _Abandoned()
+                        self._finish(key, future, error)
+                        future.set_exception(error)
+            try:
+                # Shielded so a cancelled waiter does not cancel the call for the others
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _Abandoned:
+                continue
+
+    def forget(self):
+        """Let later callers start fresh instead of joining calls already in flight (after a write)"""
+        with self._lock:
+            self._calls.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self._counters["calls"]
+            return {
+                **self._counters,
+                "in_flight": len(self._calls),
+                "collapse_rate": self._counters["collapsed"] / calls if calls else 0.0,
+            }
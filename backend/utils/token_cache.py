@@ -0,0 +1,84 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from config.settings import TOKEN_CACHE_MAX_ENTRIES
+
+class TokenCache:
+    """Bounded LRU of verified JWT payloads, keyed by the token's SHA-256 digest.
+
+    An entry lives until the token's ``exp``, so a cached token can never
+    outlive its own expiry. Raw tokens are not stored.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # digest -> (payload, expires_at)
+        self._counters = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0, "revocations": 0}
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if entry[1] <= time.time():
+                del self._entries[digest]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._counters["hits"] += 1
+            return dict(entry[0])
+
+    def put(self, token: str, payload: dict):
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (dict(payload), expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def revoke(self, token: str) -> bool:
+        """Drop a token's cached verification; its next use is verified in full"""
+        with self._lock:
+            removed = self._entries.pop(self._digest(token), None) is not None
+            if removed:
+                self._counters["revocations"] += 1
+            return removed
+
+    def revoke_user(self, user_id: int) -> int:
+        """Drop every cached token of a user (e.g. after a role change)"""
+        with self._lock:
+            digests = [d for d, (payload, _) in self._entries.items() if payload.get("user_id") == user_id]
+            for digest in digests:
+                del self._entries[digest]
+            self._counters["revocations"] += len(digests)
+            return len(digests)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_ENTRIES)
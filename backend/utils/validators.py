@@ -2,9 +2,9 @@ import re
 from email_validator import validate_email, EmailNotValidError
 
 def validate_user_email(email: str) -> bool:
-    """Validate email format"""
+    """Validate email format (syntax only, no DNS lookup)"""
     try:
-        validate_email(email)
+        validate_email(email, check_deliverability=False)
         return True
     except EmailNotValidError:
         return False
@@ -13,6 +13,13 @@ def validate_password(password: str) -> bool:
     """Validate password (min 6 characters)"""
     return len(password) >= 6
 
+def check_new_user(email: str, password: str):
+    """Raise ValueError for an unusable signup; cheap, so it runs before any password hashing"""
+    if not validate_user_email(email):
+        raise ValueError("Invalid email format")
+    if not validate_password(password):
+        raise ValueError("Password must be at least 6 characters")
+
 def validate_phone(phone: str) -> bool:
     """Validate phone number"""
     phone_regex = r"^[0-9]{10,15}$"
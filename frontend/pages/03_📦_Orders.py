@@ -46,6 +46,10 @@ else:
                         with col2:
                             st.write(f"**Address:** {order['shipping_address']}")
                             st.write(f"**Date:** {order.get('created_at', 'N/A')}")
+
+                        for item in order.get("items", []):
+                            name = item.get("product_name") or f"Product #{item['product_id']}"
+                            st.write(f"- {name} × {item['quantity']} @ ${item['price']:.2f}")
         else:
             st.error("Failed to fetch orders")
     
@@ -116,6 +116,46 @@ else:
     with tab2:
         st.subheader("Orders Management")
         
+        with st.expander("Export"):
+            export_what = st.radio("Export", ["Orders", "Products"], horizontal=True, key="export_what")
+            export_format = st.selectbox("Format", ["csv", "ndjson"], key="export_format")
+            export_params = {"format": export_format}
+            if export_what == "Orders":
+                col1, col2 = st.columns(2)
+                with col1:
+                    date_from = st.date_input("From", value=None, key="export_from")
+                with col2:
+                    date_to = st.date_input("To (inclusive)", value=None, key="export_to")
+                statuses = st.multiselect("Status", ["pending", "processing", "shipped", "delivered", "cancelled"], key="export_status")
+                include_items = st.checkbox("Include line items", key="export_items")
+                if date_from:
+                    export_params["created_from"] = date_from.isoformat()
+                if date_to:
+                    export_params["created_to"] = (date_to + pd.Timedelta(days=1)).isoformat()
+                if statuses:
+                    export_params["status"] = statuses
+                export_params["include_items"] = str(include_items).lower()
+
+            if st.button("Prepare Export"):
+                path = "orders" if export_what == "Orders" else "products"
+                try:
+                    # The API streams the export; collect it here for the download button
+                    with requests.get(f"{API_URL}/admin/export/{path}", params=export_params, headers=headers, stream=True) as response:
+                        if response.status_code == 200:
+                            st.session_state.export_file = (
+                                b"".join(response.iter_content(chunk_size=1 << 16)),
+                                f"{path}.{export_format}",
+                                "text/csv" if export_format == "csv" else "application/x-ndjson",
+                            )
+                        else:
+                            st.error(response.json().get("detail", "Export failed"))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+
+            if "export_file" in st.session_state:
+                data, file_name, mime = st.session_state.export_file
+                st.download_button(f"Download {file_name} ({len(data) / 1024:.0f} KB)", data, file_name=file_name, mime=mime)
+        
         page = st.number_input("Page", min_value=1, value=1, key="orders_page")
         
         try:
@@ -158,24 +198,48 @@ else:
         st.subheader("Dashboard")
         
         try:
-            # Get product count
-            prod_response = requests.get(f"{API_URL}/products?limit=1", headers=headers)
-            prod_count = prod_response.json().get("pagination", {}).get("total_items", 0) if prod_response.status_code == 200 else 0
-            
-            # Get order count
-            order_response = requests.get(f"{API_URL}/orders/admin/all?limit=1", params={"limit": 1}, headers=headers)
-            order_count = order_response.json().get("pagination", {}).get("total_items", 0) if order_response.status_code == 200 else 0
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("Total Products", prod_count)
-            
-            with col2:
-                st.metric("Total Orders", order_count)
-            
-            with col3:
-                st.metric("Total Users", "N/A")
+            # All figures come from one aggregate endpoint (cached server-side for a few seconds)
+            response = requests.get(f"{API_URL}/admin/stats", headers=headers)
+            if response.status_code != 200:
+                st.error(response.json().get("detail", "Failed to load statistics"))
+            else:
+                stats = response.json()
+
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    st.metric("Total Products", stats["total_products"])
+                
+                with col2:
+                    st.metric("Total Orders", stats["total_orders"])
+                
+                with col3:
+                    st.metric("Total Users", stats["total_users"])
+
+                with col4:
+                    st.metric("Revenue", f"${stats['revenue']:,.2f}")
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.write("**Orders by Status**")
+                    by_status = stats["orders_by_status"]
+                    if by_status:
+                        df = pd.DataFrame(
+                            [{"status": s, "orders": v["orders"], "revenue": v["revenue"]} for s, v in by_status.items()]
+                        ).set_index("status")
+                        st.bar_chart(df["orders"])
+                        st.dataframe(df, use_container_width=True)
+                    else:
+                        st.info("No orders yet")
+
+                with col2:
+                    st.write(f"**Low Stock** ({stats['low_stock_count']} at or below {stats['low_stock_threshold']})")
+                    if stats["low_stock_products"]:
+                        st.dataframe(pd.DataFrame(stats["low_stock_products"]), use_container_width=True, hide_index=True)
+                    else:
+                        st.info("No low-stock products")
+
+                st.caption(f"As of {stats['generated_at']}")
         except Exception as e:
             st.error(f"Error loading dashboard: {str(e)}")
-
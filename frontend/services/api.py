@@ -1,11 +1,16 @@
 import requests
+from collections import OrderedDict
 from config import API_URL
 from typing import Optional, Dict, List
 
+# Catalog responses remembered for conditional re-fetches (If-None-Match / If-Modified-Since)
+VALIDATOR_CACHE_SIZE = 256
+
 class APIClient:
     def __init__(self):
         self.base_url = API_URL
         self.token = None
+        self._validated = OrderedDict()   # (url, params) -> (ETag, Last-Modified, body)
 
     def set_token(self, token: str):
         """Set JWT token for authenticated requests"""
@@ -18,6 +23,32 @@ class APIClient:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
 
+    def _get_validated(self, url: str, params: Dict = None) -> Dict:
+        """GET that sends back the last ETag / Last-Modified and reuses the body on 304"""
+        key = (url, tuple(sorted((params or {}).items())))
+        cached = self._validated.get(key)
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        response = requests.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            self._validated.move_to_end(key)
+            return cached[2]
+
+        body = response.json()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.ok and (etag or last_modified):
+            self._validated[key] = (etag, last_modified, body)
+            self._validated.move_to_end(key)
+            while len(self._validated) > VALIDATOR_CACHE_SIZE:
+                self._validated.popitem(last=False)
+        return body
+
     # Auth endpoints
     def register(self, name: str, email: str, password: str, phone: str = None) -> Dict:
         """Register new user"""
@@ -37,19 +68,21 @@ class APIClient:
         params = {"page": page, "limit": limit}
         if category:
             params["category"] = category
-        response = requests.get(f"{self.base_url}/products", params=params)
-        return response.json()
+        return self._get_validated(f"{self.base_url}/products", params)
 
     def search_products(self, query: str, page: int = 1, limit: int = 10) -> Dict:
         """Search products"""
         params = {"q": query, "page": page, "limit": limit}
-        response = requests.get(f"{self.base_url}/products/search", params=params)
-        return response.json()
+        return self._get_validated(f"{self.base_url}/products/search", params)
 
     def get_product(self, product_id: int) -> Dict:
         """Get single product"""
-        response = requests.get(f"{self.base_url}/products/{product_id}")
-        return response.json()
+        return self._get_validated(f"{self.base_url}/products/{product_id}")
+
+    def get_products_batch(self, product_ids: List[int]) -> Dict:
+        """Get several products in one request: {"products": [...in id order], "missing": [ids]}"""
+        params = {"ids": ",".join(str(product_id) for product_id in product_ids)}
+        return self._get_validated(f"{self.base_url}/products/batch", params)
 
     def create_product(self, product_data: Dict) -> Dict:
         """Create product (admin only)"""